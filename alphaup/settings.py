@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from decouple import Config, RepositoryEnv
 
@@ -37,7 +38,54 @@ else:
     ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='', cast=lambda v: [s.strip() for s in v.split(',')])
 
 # API Settings
-MEDIASTACK_API_KEY  = config('MEDIASTACK_API_KEY')
+MEDIASTACK_API_KEY  = config('MEDIASTACK_API_KEY', default='')
+MEDIASTACK_URL = config('MEDIASTACK_URL', default='http://api.mediastack.com/v1/news')
+NEWSAPI_API_KEY = config('NEWSAPI_API_KEY', default='')
+NEWSAPI_URL = config('NEWSAPI_URL', default='https://newsapi.org/v2/top-headlines')
+NEWSAPI_COUNTRY = config('NEWSAPI_COUNTRY', default='us')
+
+# News providers fetched by /fetch/ (see news.providers.PROVIDERS)
+NEWS_PROVIDERS = config(
+    'NEWS_PROVIDERS',
+    default='mediastack',
+    cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]
+)
+# Requests per second and burst size allowed per provider, per process
+NEWS_PROVIDER_LIMITS = {
+    'mediastack': {
+        'rate': config('MEDIASTACK_RATE_LIMIT', default=5, cast=float),
+        'burst': config('MEDIASTACK_BURST', default=7, cast=int),
+    },
+    'newsapi': {
+        'rate': config('NEWSAPI_RATE_LIMIT', default=1, cast=float),
+        'burst': config('NEWSAPI_BURST', default=7, cast=int),
+    },
+}
+
+# Ingestion settings
+NEWS_FETCH_CONCURRENCY = config('NEWS_FETCH_CONCURRENCY', default=7, cast=int)
+NEWS_FETCH_DEADLINE = config('NEWS_FETCH_DEADLINE', default=30, cast=float)
+NEWS_FETCH_TIMEOUT = config('NEWS_FETCH_TIMEOUT', default=10, cast=float)
+# Retries of throttled or failed provider requests, with exponential backoff from NEWS_FETCH_BACKOFF seconds
+NEWS_FETCH_RETRIES = config('NEWS_FETCH_RETRIES', default=3, cast=int)
+NEWS_FETCH_BACKOFF = config('NEWS_FETCH_BACKOFF', default=0.5, cast=float)
+# Articles per provider request, and how many pages to follow back to a category's watermark
+NEWS_FETCH_PAGE_SIZE = config('NEWS_FETCH_PAGE_SIZE', default=100, cast=int)
+NEWS_FETCH_MAX_PAGES = config('NEWS_FETCH_MAX_PAGES', default=10, cast=int)
+
+# Near-duplicate stories: 'cluster' keeps copies grouped under one card, 'skip' drops them
+NEWS_DUPLICATES = config('NEWS_DUPLICATES', default='cluster')
+# Estimated word overlap (Jaccard, 0-1) from which stories are duplicates, and how far back to look, in hours
+NEWS_DUPLICATE_SIMILARITY = config('NEWS_DUPLICATE_SIMILARITY', default=0.7, cast=float)
+NEWS_DUPLICATE_WINDOW = config('NEWS_DUPLICATE_WINDOW', default=72, cast=int)
+
+# Articles older than this many days are moved to compressed segments by archive_articles
+NEWS_ARCHIVE_AFTER_DAYS = config('NEWS_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+NEWS_ARCHIVE_DIR = config('NEWS_ARCHIVE_DIR', default=str(BASE_DIR / 'archive'))
+
+# Pre-provisioned NLTK models, never downloaded at runtime
+NLTK_DATA = config('NLTK_DATA', default=str(BASE_DIR / 'nltk_data'))
+NLTK_PUNKT_LANGUAGE = config('NLTK_PUNKT_LANGUAGE', default='english')
 
 LOGGING = {
     'version': 1,
@@ -68,6 +116,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'news.metrics.MetricsMiddleware',
+    'news.routers.PrimaryPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -98,7 +148,8 @@ ROOT_URLCONF = 'alphaup.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, reporting render time to news.metrics
+        'BACKEND': 'news.metrics.TimedDjangoTemplates',
         'DIRS': [
             str(BASE_DIR.joinpath('templates'))
         ],
@@ -120,14 +171,34 @@ WSGI_APPLICATION = 'alphaup.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Connections are kept for CONN_MAX_AGE seconds and checked before reuse.
+# Set it to 0 under ASGI, where each request may run on a new thread.
+CONN_MAX_AGE = config('CONN_MAX_AGE', default=60, cast=int)
+
 # Database settings
 if DEBUG:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
-        }
+            'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        },
+        # Local stand-in for a read replica: a copy of the primary file, e.g.
+        # sqlite3 db.sqlite3 ".backup db-replica.sqlite3". Only read from
+        # when listed in DATABASE_REPLICAS.
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('SQLITE_REPLICA_PATH', default=str(BASE_DIR / 'db-replica.sqlite3')),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        },
     }
+    DATABASE_REPLICAS = config(
+        'DATABASE_REPLICAS',
+        default='',
+        cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]
+    )
 else:
     DATABASES = {
         'default': {
@@ -138,12 +209,69 @@ else:
             'HOST': config('DB_HOST'),
             'PORT': config('DB_PORT', default='3306'),
             'sql-mode': 'STATIC_TRANS_TABLE',
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
             'OPTIONS': {
                 'charset': 'utf8mb4',
                 'collation': 'utf8mb4_unicode_ci',
             },
         }
     }
+    # Read replicas of the primary, with its credentials
+    DB_REPLICA_HOSTS = config(
+        'DB_REPLICA_HOSTS',
+        default='',
+        cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]
+    )
+    for number, host in enumerate(DB_REPLICA_HOSTS):
+        DATABASES[f'replica{number}'] = {
+            **DATABASES['default'],
+            'HOST': host,
+            'TEST': {'MIRROR': 'default'},
+        }
+    DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Reads go to a healthy replica unless the request needs the primary
+DATABASE_ROUTERS = ['news.routers.PrimaryReplicaRouter']
+
+# Seconds between replica health checks, the replication lag (MySQL) past
+# which a replica stops serving reads, and how long a client's reads stay
+# on the primary after it writes
+NEWS_REPLICA_CHECK_INTERVAL = config('NEWS_REPLICA_CHECK_INTERVAL', default=30, cast=float)
+NEWS_REPLICA_MAX_LAG = config('NEWS_REPLICA_MAX_LAG', default=10, cast=float)
+NEWS_REPLICA_PIN_SECONDS = config('NEWS_REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='alphaup'),
+    }
+}
+
+# Category list and page counts are invalidated by ingestion; the timeout
+# bounds staleness in processes that didn't run it when the cache is local
+NEWS_CACHE_TIMEOUT = config('NEWS_CACHE_TIMEOUT', default=300, cast=int)
+
+# 'exact' or 'estimated' (table statistics) total for the unfiltered list
+NEWS_PAGINATION_COUNT = config('NEWS_PAGINATION_COUNT', default='exact')
+
+# Serve the list, detail and comment reads with async views (ASGI only)
+NEWS_ASYNC_VIEWS = config('NEWS_ASYNC_VIEWS', default=False, cast=bool)
+
+# Live comment stream (server-sent events, ASGI only)
+NEWS_SSE_KEEPALIVE = config('NEWS_SSE_KEEPALIVE', default=15, cast=float)
+NEWS_SSE_RETRY_MS = config('NEWS_SSE_RETRY_MS', default=5000, cast=int)
+# Redis URL relaying new comments between worker processes, e.g.
+# redis://localhost:6379/0. Without it a comment only reaches streams held
+# by the process that stored it, so run a single ASGI worker.
+NEWS_BROKER_URL = config('NEWS_BROKER_URL', default='')
+
+# Seconds between batched writes of buffered comment count changes
+# (0 writes each one immediately)
+NEWS_COMMENT_COUNT_FLUSH_INTERVAL = config('NEWS_COMMENT_COUNT_FLUSH_INTERVAL', default=0.25, cast=float)
 
 
 # Password validation
@@ -199,6 +327,30 @@ else:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Test runs don't download images or pages after ingestion unless the
+# environment turns it on
+TESTING = sys.argv[1:2] == ['test']
+
+# Article image thumbnails, written to MEDIA_ROOT/thumbs after ingestion
+NEWS_THUMBNAILS_ON_INGEST = config('NEWS_THUMBNAILS_ON_INGEST', default=not TESTING, cast=bool)
+NEWS_THUMBNAIL_WIDTHS = config('NEWS_THUMBNAIL_WIDTHS', default='320,640,960',
+                               cast=lambda v: [int(s) for s in v.split(',')])
+NEWS_THUMBNAIL_FORMAT = config('NEWS_THUMBNAIL_FORMAT', default='webp')
+NEWS_THUMBNAIL_QUALITY = config('NEWS_THUMBNAIL_QUALITY', default=75, cast=int)
+NEWS_THUMBNAIL_WORKERS = config('NEWS_THUMBNAIL_WORKERS', default=4, cast=int)
+NEWS_THUMBNAIL_CACHE_BYTES = config('NEWS_THUMBNAIL_CACHE_BYTES', default=1024 ** 3, cast=int)
+NEWS_THUMBNAIL_MAX_SOURCE_BYTES = config('NEWS_THUMBNAIL_MAX_SOURCE_BYTES', default=20 * 1024 ** 2, cast=int)
+# Dotted path to the class that downloads source images
+NEWS_THUMBNAIL_FETCHER = config('NEWS_THUMBNAIL_FETCHER', default='news.thumbnails.HttpFetcher')
+
+# Full article text for extended summaries, downloaded after ingestion.
+# Raw pages are cached gzip-compressed under NEWS_EXTRACTION_CACHE_DIR.
+NEWS_EXTRACTION_ON_INGEST = config('NEWS_EXTRACTION_ON_INGEST', default=not TESTING, cast=bool)
+NEWS_EXTRACTION_WORKERS = config('NEWS_EXTRACTION_WORKERS', default=8, cast=int)
+NEWS_EXTRACTION_PER_HOST = config('NEWS_EXTRACTION_PER_HOST', default=2, cast=int)
+NEWS_EXTRACTION_MAX_BYTES = config('NEWS_EXTRACTION_MAX_BYTES', default=5 * 1024 ** 2, cast=int)
+NEWS_EXTRACTION_CACHE_DIR = config('NEWS_EXTRACTION_CACHE_DIR', default=str(BASE_DIR / 'html_cache'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
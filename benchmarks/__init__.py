@@ -0,0 +1,4 @@
+"""Performance benchmarks for the news app.
+
+Run from the project root, e.g. ``python -m benchmarks.import_time``.
+"""
@@ -0,0 +1,138 @@
+"""Synthetic article data for benchmarks.
+
+Titles and summaries are drawn from a fixed vocabulary with a Zipf-like
+distribution, so search terms have realistic selectivity.
+"""
+import itertools
+import random
+from datetime import timedelta
+
+CATEGORIES = [
+    'general', 'business', 'technology', 'science',
+    'health', 'sports', 'entertainment'
+]
+
+SOURCES = ['bbc', 'cnn', 'reuters', 'ap', 'guardian', 'nytimes', 'ft', 'espn', 'wired', 'verge']
+
+KEYWORDS = (
+    "election market rally storm vaccine football league climate court budget "
+    "startup launch merger earnings protest summit research study galaxy robot "
+    "energy oil inflation rates bank crypto chip phone movie album festival award "
+    "health hospital virus outbreak drought flood wildfire minister senate policy "
+    "trade tariff strike union airline travel tourism school university exam "
+    "satellite rocket ocean species fossil museum artist novel streaming series"
+).split()
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'da', 'po', 'gu']
+
+
+def build_vocabulary(size=20000, keyword_spacing=40):
+    """Pseudo-words with real keywords spread across the frequency ranks"""
+    rng = random.Random(0)
+    words = []
+    seen = set(KEYWORDS)
+    while len(words) < size:
+        word = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    for position, keyword in enumerate(KEYWORDS):
+        words.insert(keyword_spacing * (position + 1), keyword)
+    return words
+
+
+VOCABULARY = build_vocabulary()
+
+CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+
+def sentence(rng, words):
+    text = ' '.join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def make_article(rng, index, now):
+    from news.models import Article
+
+    return Article(
+        title=sentence(rng, rng.randint(5, 10))[:200],
+        url=f'https://bench.example.com/{index}',
+        source=rng.choice(SOURCES),
+        category=rng.choice(CATEGORIES),
+        summary=' '.join(sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(2, 5))),
+        published_at=now - timedelta(seconds=index * 37),
+        author='',
+        image='',
+        country='us',
+    )
+
+
+def seed_articles(count, batch_size=5000, seed=42, start=0):
+    """Insert ``count`` synthetic articles, returning the number created"""
+    from django.db import transaction
+    from django.utils import timezone
+    from news.models import Article
+
+    rng = random.Random(seed + start)
+    now = timezone.now()
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        batch = [make_article(rng, start + created + offset, now) for offset in range(size)]
+        with transaction.atomic():
+            Article.objects.bulk_create(batch, batch_size=batch_size)
+        created += size
+    return created
+
+
+def seed_comments(per_article=5, batch_size=5000, seed=42):
+    """Add ``per_article`` comments to every article"""
+    from django.db import transaction
+    from django.db.models import F
+    from news.models import Article, Comment
+
+    rng = random.Random(seed)
+    created = 0
+    batch = []
+    for article_id in Article.objects.values_list('id', flat=True).iterator(chunk_size=batch_size):
+        for _ in range(per_article):
+            batch.append(Comment(article_id=article_id, content=sentence(rng, rng.randint(5, 25)),
+                                 username=rng.choice(['Anonymous', 'reader', 'sam', 'alex'])))
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                Comment.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+            batch = []
+    if batch:
+        with transaction.atomic():
+            Comment.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+    Article.objects.update(comment_count=F('comment_count') + per_article)
+    return created
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from benchmarks import environment
+
+    parser = argparse.ArgumentParser(description='Seed a reusable benchmark database')
+    parser.add_argument('database', help='SQLite file to create or grow')
+    parser.add_argument('--articles', type=int, default=1_000_000)
+    parser.add_argument('--comments-per-article', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    environment.setup(args.database)
+    from news.models import Article
+
+    existing = Article.objects.count()
+    started = time.perf_counter()
+    created = seed_articles(max(0, args.articles - existing), start=existing)
+    comments = seed_comments(args.comments_per_article) if existing == 0 else 0
+    print(f"Added {created:,} articles and {comments:,} comments "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Measure how long a fresh interpreter takes to import ``news.views``.
+
+    python -m benchmarks.import_time --runs 10
+    python -m benchmarks.import_time --compare HEAD~1
+
+``--compare`` exports another git revision to a temporary directory and
+measures it the same way, so the effect of a change can be shown side by
+side. Django setup is excluded from the timing.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import os, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alphaup.settings')
+import django
+django.setup()
+started = time.perf_counter()
+import news.views
+print(time.perf_counter() - started)
+"""
+
+
+def measure(project_dir, runs):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=project_dir,
+            capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def export_revision(revision, target):
+    archive = subprocess.run(
+        ['git', 'archive', revision], cwd=BASE_DIR, capture_output=True, check=True
+    ).stdout
+    subprocess.run(['tar', '-x', '-C', target], input=archive, check=True)
+    env_file = BASE_DIR / 'env-config.env'
+    if env_file.exists():
+        shutil.copy(env_file, target)
+
+
+def report(label, timings):
+    print(f"{label:<12} median {statistics.median(timings) * 1000:8.1f} ms  "
+          f"min {min(timings) * 1000:8.1f} ms  max {max(timings) * 1000:8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--compare', metavar='REVISION',
+                        help='git revision to measure alongside the working tree')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with tempfile.TemporaryDirectory() as target:
+            export_revision(args.compare, target)
+            report(args.compare, measure(target, args.runs))
+    report('working tree', measure(BASE_DIR, args.runs))
+
+
+if __name__ == '__main__':
+    main()
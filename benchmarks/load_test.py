@@ -0,0 +1,141 @@
+"""Compare the sync (WSGI) and async (ASGI) stacks under the same load.
+
+    python -m benchmarks.load_test --workers 2 --concurrency 32 --duration 20
+
+Seeds a temporary SQLite database, then for each stack starts gunicorn with
+the same number of workers (sync workers for ``alphaup.wsgi``, uvicorn
+workers for ``alphaup.asgi`` with ``NEWS_ASYNC_VIEWS``) and drives the list,
+detail and comment read paths with a fixed number of concurrent clients.
+Reports requests/sec and latency percentiles per stack.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from benchmarks import environment
+
+STACKS = {
+    'sync': {
+        'command': ['gunicorn', 'alphaup.wsgi', '--worker-class', 'sync'],
+        'env': {'NEWS_ASYNC_VIEWS': 'False'},
+    },
+    'async': {
+        'command': ['gunicorn', 'alphaup.asgi', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+        'env': {'NEWS_ASYNC_VIEWS': 'True'},
+    },
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def request_paths(article_ids, categories):
+    """Mix of hot read paths, cycled by every client"""
+    paths = ['/']
+    paths += [f'/?category={category}' for category in categories[:3]]
+    paths += [f'/article/{article_id}/' for article_id in article_ids[:20]]
+    paths += [f'/api/comments/?article_id={article_id}' for article_id in article_ids[:20]]
+    return paths
+
+
+def start_server(stack, database, workers, port):
+    env = dict(os.environ, SQLITE_PATH=str(database), **STACKS[stack]['env'])
+    command = STACKS[stack]['command'] + [
+        '--workers', str(workers), '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'
+    ]
+    server = subprocess.Popen(command, cwd=environment.BASE_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f'http://127.0.0.1:{port}/', timeout=1)
+            return server
+        except requests.RequestException:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f'{stack} server did not start')
+
+
+def drive(base_url, paths, concurrency, duration):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(offset):
+        session = requests.Session()
+        local, failed = [], 0
+        index = offset
+        while time.monotonic() < stop_at:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                response = session.get(base_url + path, timeout=30)
+                if response.status_code >= 400:
+                    failed += 1
+            except requests.RequestException:
+                failed += 1
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--articles', type=int, default=20000)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--stacks', nargs='+', choices=sorted(STACKS), default=['sync', 'async'])
+    args = parser.parse_args(argv)
+
+    database = environment.setup()
+    try:
+        from news.models import Article
+
+        from benchmarks.datagen import seed_articles, seed_comments
+
+        seed_articles(args.articles)
+        seed_comments(per_article=3)
+        article_ids = list(Article.objects.order_by('-published_at').values_list('id', flat=True)[:20])
+        categories = sorted(set(Article.objects.values_list('category', flat=True)[:100]))
+        paths = request_paths(article_ids, categories)
+
+        print(f"{args.workers} workers, {args.concurrency} clients, {args.duration:.0f}s per stack")
+        print(f"{'stack':<8} {'requests':>9} {'req/s':>9} {'p50':>9} {'p99':>9} {'errors':>7}")
+        for stack in args.stacks:
+            server = start_server(stack, database, args.workers, args.port)
+            try:
+                latencies, errors = drive(f'http://127.0.0.1:{args.port}', paths,
+                                          args.concurrency, args.duration)
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"{stack:<8} {len(latencies):>9} {len(latencies) / args.duration:>9.1f} "
+                  f"{statistics.median(latencies) * 1000:>6.1f} ms "
+                  f"{percentile(latencies, 0.99) * 1000:>6.1f} ms {errors:>7}", flush=True)
+    finally:
+        os.remove(database)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Run the benchmark scenarios and compare them with the previous run.
+
+    python -m benchmarks.run --articles 100000 --iterations 200
+    python -m benchmarks.run --database /tmp/bench.sqlite3 --scenarios news_list search
+
+Seeds a SQLite database (or reuses ``--database``, see ``benchmarks.datagen``),
+points ingestion at a local MediaStack stub and runs each scenario. Results
+are written to ``benchmarks/results/`` and ``latest.json`` is used as the
+baseline for the next run.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import environment
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+# Metrics where a higher value is an improvement
+HIGHER_IS_BETTER = {'throughput'}
+
+COLUMNS = ['throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'queries']
+
+
+def prepare(articles, comments_per_article):
+    from news.models import Article, Comment
+
+    from benchmarks.datagen import seed_articles, seed_comments
+
+    existing = Article.objects.count()
+    if existing < articles:
+        started = time.perf_counter()
+        seed_articles(articles - existing, start=existing)
+        if not Comment.objects.exists():
+            seed_comments(comments_per_article)
+        print(f"Seeded {articles:,} articles in {time.perf_counter() - started:.1f}s", flush=True)
+
+
+def load_baseline(path):
+    try:
+        return json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return None
+
+
+def change(metric, current, previous):
+    if not previous:
+        return ''
+    delta = (current - previous) / previous * 100
+    worse = delta < 0 if metric in HIGHER_IS_BETTER else delta > 0
+    # Flag regressions beyond run-to-run noise
+    return f"{delta:+.0f}%{'!' if worse and abs(delta) >= 5 else ' '}"
+
+
+def report(results, baseline):
+    previous = (baseline or {}).get('scenarios', {})
+    print(f"\n{'scenario':<14}" + ''.join(f"{column:>18}" for column in COLUMNS) + f"{'errors':>8}")
+    for name, result in results.items():
+        row = f"{name:<14}"
+        for column in COLUMNS:
+            old = previous.get(name, {}).get(column)
+            row += f"{result[column]:>10.1f} {change(column, result[column], old):>7}"
+        print(row + f"{result['errors']:>8}")
+    if baseline:
+        print(f"\nCompared with {baseline['started']} ({baseline.get('revision') or 'unknown revision'})")
+
+
+def git_revision():
+    head = environment.BASE_DIR / '.git' / 'HEAD'
+    try:
+        ref = head.read_text().strip()
+        if ref.startswith('ref: '):
+            return (environment.BASE_DIR / '.git' / ref[5:]).read_text().strip()[:12]
+        return ref[:12]
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=100_000)
+    parser.add_argument('--comments-per-article', type=int, default=2)
+    parser.add_argument('--database', help='Reuse this SQLite file instead of a temporary one')
+    parser.add_argument('--scenarios', nargs='+')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--stub-latency', type=float, default=0.05)
+    parser.add_argument('--stub-error-rate', type=float, default=0.0)
+    parser.add_argument('--baseline', default=RESULTS_DIR / 'latest.json')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args(argv)
+
+    database = environment.setup(args.database)
+    try:
+        from django.conf import settings
+
+        from benchmarks.datagen import CATEGORIES
+        from benchmarks.scenarios import SCENARIOS, Context, measure
+        from benchmarks.stub_server import MediaStackStub
+        from news.models import Article
+
+        prepare(args.articles, args.comments_per_article)
+        names = args.scenarios or list(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+        article_ids = list(Article.objects.order_by('-published_at').values_list('id', flat=True)[:50])
+        with MediaStackStub(latency=args.stub_latency, error_rate=args.stub_error_rate) as stub:
+            settings.MEDIASTACK_URL = stub.url
+            settings.MEDIASTACK_API_KEY = 'benchmark'
+            context = Context(stub, article_ids, CATEGORIES)
+
+            started = datetime.now().isoformat(timespec='seconds')
+            results = {}
+            for name in names:
+                print(f"Running {name}...", flush=True)
+                # Ingestion is bounded by the stub's latency; fewer runs suffice
+                iterations = args.iterations if name != 'fetch_news' else max(1, args.iterations // 20)
+                results[name] = measure(SCENARIOS[name](context), iterations)
+
+        baseline = load_baseline(args.baseline)
+        report(results, baseline)
+
+        if not args.no_save:
+            run = {
+                'started': started,
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'articles': Article.objects.count(),
+                'scenarios': results,
+            }
+            RESULTS_DIR.mkdir(exist_ok=True)
+            stamp = started.replace(':', '').replace('-', '')
+            (RESULTS_DIR / f'{stamp}.json').write_text(json.dumps(run, indent=2))
+            Path(args.baseline).write_text(json.dumps(run, indent=2))
+    finally:
+        if not args.database:
+            os.remove(database)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Repeatable in-process scenarios for the hot paths.
+
+Each scenario is a function taking the shared ``Context`` and returning an
+operation ``op(i)`` that performs one request and returns its response.
+Requests go through the Django test client, so the full middleware, view,
+serializer and template stack is exercised without a network hop; the
+multi-worker comparison lives in ``benchmarks.load_test``.
+"""
+import statistics
+import time
+
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+SCENARIOS = {}
+
+SEARCH_TERMS = ['election', 'vaccine outbreak', 'satellite', 'fossil museum', 'merger']
+
+
+def scenario(name):
+    def register(function):
+        SCENARIOS[name] = function
+        return function
+    return register
+
+
+class Context:
+    """State shared by the scenarios of one run"""
+
+    def __init__(self, stub, article_ids, categories):
+        from django.test import Client
+
+        self.client = Client()
+        self.stub = stub
+        self.article_ids = article_ids
+        self.categories = categories
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(op, iterations, warmup=5):
+    """Run ``op`` and summarise its throughput, latency and query count"""
+    for i in range(warmup):
+        op(i)
+
+    timings, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            begun = time.perf_counter()
+            response = op(warmup + i)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            timings.append(time.perf_counter() - begun)
+        queries.append(len(captured))
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    reset_queries()
+
+    return {
+        'iterations': iterations,
+        'throughput': iterations / elapsed,
+        'p50_ms': percentile(timings, 0.50) * 1000,
+        'p95_ms': percentile(timings, 0.95) * 1000,
+        'p99_ms': percentile(timings, 0.99) * 1000,
+        'queries': statistics.mean(queries),
+        'errors': errors,
+    }
+
+
+@scenario('fetch_news')
+def fetch_news(context):
+    """A full ingestion run against the stub, with new stories each time"""
+    def op(i):
+        for category in context.categories:
+            context.stub.publish(category, 10)
+        return context.client.get('/fetch/')
+    return op
+
+
+@scenario('news_list')
+def news_list(context):
+    """The HTML list, cycling through categories and the first pages"""
+    paths = ['/'] + [f'/?category={category}' for category in context.categories]
+    paths += [f'/?page={page}' for page in range(2, 6)]
+
+    def op(i):
+        return context.client.get(paths[i % len(paths)])
+    return op
+
+
+@scenario('api_articles')
+def api_articles(context):
+    """The article API list, following ``next`` links a few pages deep"""
+    state = {'next': None}
+
+    def op(i):
+        path = state['next'] if i % 5 else '/api/articles/'
+        response = context.client.get(path)
+        state['next'] = response.json()['next'] or '/api/articles/'
+        return response
+    return op
+
+
+@scenario('search')
+def search(context):
+    def op(i):
+        return context.client.get('/api/articles/', {'search': SEARCH_TERMS[i % len(SEARCH_TERMS)]})
+    return op
+
+
+@scenario('post_comment')
+def post_comment(context):
+    def op(i):
+        article_id = context.article_ids[i % len(context.article_ids)]
+        return context.client.post('/api/comments/', {
+            'article_id': article_id, 'content': f'Benchmark comment {i}', 'username': 'bench'
+        })
+    return op
@@ -0,0 +1,74 @@
+"""Compare the old SearchFilter ``icontains`` scan with the full-text index.
+
+    python -m benchmarks.search --sizes 100000 1000000
+
+Each size seeds a fresh SQLite database, then times the first page (30
+rows) of results for a set of search terms through both code paths.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks import environment
+
+TERMS = ['election', 'vaccine outbreak', 'satellite', 'fossil museum', 'merger']
+
+
+def icontains_search(queryset, terms):
+    """What rest_framework.filters.SearchFilter generated before"""
+    from django.db.models import Q
+
+    condition = Q()
+    for term in terms.split():
+        term_condition = Q()
+        for column in ['title', 'summary', 'category', 'source']:
+            term_condition |= Q(**{f'{column}__icontains': term})
+        condition &= term_condition
+    return queryset.filter(condition).order_by('-published_at')
+
+
+def time_query(build, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(build()[:30])
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def run(size, repeat):
+    from news.models import Article
+    from news.search import search_articles
+
+    from benchmarks.datagen import seed_articles
+
+    # Grow the table incrementally from the previous size
+    existing = Article.objects.count()
+    seeded = time.perf_counter()
+    seed_articles(size - existing, start=existing)
+    print(f"\n{size:,} articles (seeded in {time.perf_counter() - seeded:.1f}s)", flush=True)
+    print(f"{'terms':<20} {'icontains':>12} {'full-text':>12} {'speedup':>9}")
+
+    for terms in TERMS:
+        scan = time_query(lambda: icontains_search(Article.objects.all(), terms), repeat)
+        indexed = time_query(lambda: search_articles(Article.objects.all(), terms), repeat)
+        print(f"{terms:<20} {scan * 1000:>9.1f} ms {indexed * 1000:>9.1f} ms {scan / indexed:>8.1f}x", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    database = environment.setup()
+    try:
+        for size in sorted(args.sizes):
+            run(size, args.repeat)
+    finally:
+        os.remove(database)
+
+
+if __name__ == '__main__':
+    main()
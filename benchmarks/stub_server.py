@@ -0,0 +1,216 @@
+"""Local stand-in for ``api.mediastack.com/v1/news``, and NewsAPI's top headlines.
+
+    python -m benchmarks.stub_server --port 8766 --latency 0.2 --error-rate 0.1
+
+Serves the MediaStack response shape (``pagination`` plus ``data``) for the
+``categories``, ``limit``, ``offset`` and ``sort=published_desc`` parameters,
+with configurable latency, per category if need be, and failure injection.
+``peak`` records the most requests served at once. Each category holds
+``per_category`` articles, newest first; ``publish()`` adds newer ones,
+as a live feed would between ingestion runs.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.datagen import CATEGORIES, SOURCES, sentence
+
+
+class MediaStackStub:
+    def __init__(self, host='127.0.0.1', port=0, per_category=300, latency=0.0,
+                 jitter=0.0, error_rate=0.0, api_error_rate=0.0, seed=42, latencies=None):
+        self.per_category = per_category
+        self.latency = latency
+        # Category -> seconds, overriding ``latency``
+        self.latencies = dict(latencies or {})
+        self.active = 0
+        self.peak = 0
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.api_error_rate = api_error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.articles = {category: [] for category in CATEGORIES}
+        for category in CATEGORIES:
+            self.publish(category, per_category)
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/v1/news'
+
+    @property
+    def newsapi_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/v2/top-headlines'
+
+    def make_article(self, category, index, published_at):
+        return {
+            'author': self.rng.choice([None, 'Staff', 'Jane Doe', 'John Roe']),
+            'title': sentence(self.rng, self.rng.randint(5, 12))[:200],
+            'description': ' '.join(sentence(self.rng, self.rng.randint(8, 25)) for _ in range(3)),
+            'url': f'https://stub.example.com/{category}/{index}',
+            'source': self.rng.choice(SOURCES),
+            'image': self.rng.choice([None, f'https://stub.example.com/img/{category}/{index}.jpg']),
+            'category': category,
+            'language': 'en',
+            'country': 'us',
+            'published_at': published_at.isoformat(),
+        }
+
+    def publish(self, category, count):
+        """Add ``count`` articles newer than everything already in ``category``"""
+        with self.lock:
+            articles = self.articles[category]
+            start = len(articles)
+            self.now += timedelta(seconds=count * 60)
+            fresh = [
+                self.make_article(category, start + offset, self.now - timedelta(seconds=offset * 60))
+                for offset in range(count)
+            ]
+            # Newest first, like sort=published_desc
+            self.articles[category] = fresh + articles
+
+    def respond(self, params):
+        """Return (status, payload) for one request"""
+        with self.lock:
+            self.requests.append(params)
+            if self.rng.random() < self.error_rate:
+                return 500, {'error': {'code': 'internal_error', 'message': 'Stub failure'}}
+            if self.rng.random() < self.api_error_rate:
+                return 200, {'error': {'code': 'rate_limit_reached', 'message': 'Stub rate limit'}}
+
+            categories = params.get('categories', ','.join(CATEGORIES)).split(',')
+            limit = min(int(params.get('limit', 25)), 100)
+            offset = int(params.get('offset', 0))
+            articles = [a for category in categories for a in self.articles.get(category, [])]
+            if len(categories) > 1:
+                articles.sort(key=lambda article: article['published_at'], reverse=True)
+            page = articles[offset:offset + limit]
+            return 200, {
+                'pagination': {'limit': limit, 'offset': offset, 'count': len(page), 'total': len(articles)},
+                'data': page,
+            }
+
+    def respond_newsapi(self, params):
+        """Return (status, payload) in NewsAPI's top-headlines shape.
+
+        Serves the same stories as the MediaStack endpoint under other URLs,
+        as a second outlet would.
+        """
+        with self.lock:
+            self.requests.append(params)
+            if self.rng.random() < self.error_rate:
+                return 500, {'status': 'error', 'code': 'unexpectedError', 'message': 'Stub failure'}
+            if self.rng.random() < self.api_error_rate:
+                return 429, {'status': 'error', 'code': 'rateLimited', 'message': 'Stub rate limit'}
+
+            articles = self.articles.get(params.get('category', 'general'), [])
+            size = min(int(params.get('pageSize', 20)), 100)
+            start = (int(params.get('page', 1)) - 1) * size
+            page = [
+                {
+                    'source': {'id': None, 'name': article['source']},
+                    'author': article['author'],
+                    'title': article['title'],
+                    'description': article['description'],
+                    'url': article['url'].replace('stub.example.com', 'newsapi.stub.example.com'),
+                    'urlToImage': article['image'],
+                    'publishedAt': article['published_at'].replace('+00:00', 'Z'),
+                    'content': article['description'][:200] + f" [+{len(article['description'])} chars]",
+                }
+                for article in articles[start:start + size]
+            ]
+            return 200, {'status': 'ok', 'totalResults': len(articles), 'articles': page}
+
+    def delay(self, category):
+        latency = self.latencies.get(category, self.latency)
+        return latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(query.query).items()}
+                with stub.lock:
+                    stub.active += 1
+                    stub.peak = max(stub.peak, stub.active)
+                try:
+                    delay = stub.delay(params.get('categories') or params.get('category'))
+                    if delay:
+                        time.sleep(delay)
+                    self.route(query, params)
+                finally:
+                    with stub.lock:
+                        stub.active -= 1
+
+            def route(self, query, params):
+                if query.path.rstrip('/') == '/v1/news':
+                    self.send_json(*stub.respond(params))
+                elif query.path.rstrip('/') == '/v2/top-headlines':
+                    self.send_json(*stub.respond_newsapi(params))
+                else:
+                    self.send_json(404, {'error': {'code': 'not_found', 'message': 'Unknown endpoint'}})
+
+            def send_json(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--per-category', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    stub = MediaStackStub(args.host, args.port, args.per_category, args.latency,
+                          args.jitter, args.error_rate)
+    print(f"MediaStack stub listening on {stub.url}; set MEDIASTACK_URL to use it")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
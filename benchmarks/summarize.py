@@ -0,0 +1,80 @@
+"""Compare the old leading-sentences summary loop with the batch summarizer.
+
+    python -m benchmarks.summarize --batch-sizes 1 100 500
+
+Articles are synthetic full texts of 20-80 sentences, long enough that
+the 300-500 word budget applies. Rates are articles summarized per second,
+sentence splitting included on both sides.
+"""
+import argparse
+import os
+import random
+import time
+
+from benchmarks import environment
+
+
+def leading_sentences(description, content):
+    """What NewsService.generate_extended_summary did before, one article per call"""
+    from news.nlp import sent_tokenize
+
+    sentences = sent_tokenize(f"{description} {content}")
+    extended_summary = []
+    word_count = 0
+    for sentence in sentences:
+        sentence_words = len(sentence.split())
+        if word_count + sentence_words <= 500:
+            extended_summary.append(sentence)
+            word_count += sentence_words
+        if word_count >= 300:
+            break
+    return ' '.join(extended_summary)
+
+
+def make_texts(count, seed=0):
+    from benchmarks.datagen import sentence
+
+    rng = random.Random(seed)
+    return [
+        (sentence(rng, rng.randint(10, 25)),
+         ' '.join(sentence(rng, rng.randint(8, 30)) for _ in range(rng.randint(20, 80))))
+        for _ in range(count)
+    ]
+
+
+def rate(summarize, texts, batch_size, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for start in range(0, len(texts), batch_size):
+            summarize(texts[start:start + batch_size])
+        best = min(best, time.perf_counter() - started)
+    return len(texts) / best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=2000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 500])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    database = environment.setup(migrate=False)
+    try:
+        from news.nlp import get_sentence_tokenizer
+        from news.views import NewsService
+
+        get_sentence_tokenizer()
+        texts = make_texts(args.articles)
+        loop = rate(lambda batch: [leading_sentences(*text) for text in batch], texts, 1, args.repeat)
+        print(f"{'summarizer':<28} {'articles/s':>12}")
+        print(f"{'leading sentences (before)':<28} {loop:>12,.0f}", flush=True)
+        for batch_size in args.batch_sizes:
+            batched = rate(NewsService.generate_extended_summaries, texts, batch_size, args.repeat)
+            print(f"{f'TextRank, batches of {batch_size}':<28} {batched:>12,.0f}", flush=True)
+    finally:
+        os.remove(database)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Cold storage for old articles.
+
+``archive_articles`` moves articles past ``NEWS_ARCHIVE_AFTER_DAYS`` and
+their comments out of the hot tables into gzip NDJSON segment files under
+``NEWS_ARCHIVE_DIR``, one line per article with its comments nested.
+
+A segment is a series of independent gzip members of ``BLOCK_SIZE`` lines,
+which together still read as one ordinary ``.ndjson.gz`` file. The small
+``ArchivedArticle`` table maps each archived id to its segment and block, so
+serving an old URL decompresses a single block instead of the whole file.
+"""
+import gzip
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedArticle, Article, Comment
+
+BLOCK_SIZE = 64
+
+ARTICLE_FIELDS = ['id', 'title', 'url', 'source', 'category', 'summary', 'published_at',
+                  'created_at', 'author', 'image', 'country', 'extended_summary']
+COMMENT_FIELDS = ['id', 'content', 'username', 'created_at']
+DATE_FIELDS = {'published_at', 'created_at'}
+
+
+def archive_dir():
+    return Path(settings.NEWS_ARCHIVE_DIR)
+
+
+def to_record(article, comments):
+    record = {field: getattr(article, field) for field in ARTICLE_FIELDS}
+    record['comments'] = [{field: getattr(comment, field) for field in COMMENT_FIELDS}
+                          for comment in comments]
+    return record
+
+
+def encode(record):
+    return json.dumps(record, default=lambda value: value.isoformat(), ensure_ascii=False) + '\n'
+
+
+def write_segment(name, records):
+    """Write ``records`` as a segment, returning ``(id, offset, length)`` per record.
+
+    The file appears atomically, so a crash never leaves a partial segment
+    that the lookup table points into.
+    """
+    path = archive_dir() / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'.{name}.tmp')
+    locations = []
+    with open(tmp_path, 'wb') as f:
+        for start in range(0, len(records), BLOCK_SIZE):
+            block = records[start:start + BLOCK_SIZE]
+            data = gzip.compress(''.join(encode(record) for record in block).encode())
+            offset = f.tell()
+            f.write(data)
+            locations.extend((record['id'], offset, len(data)) for record in block)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return locations
+
+
+def read_block(segment, offset, length):
+    with open(archive_dir() / segment, 'rb') as f:
+        f.seek(offset)
+        data = gzip.decompress(f.read(length))
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def archive_batch(articles):
+    """Write one segment for ``articles`` and record where each one went.
+
+    Returns the ``ArchivedArticle`` rows to create; the caller deletes the
+    hot rows in the same transaction.
+    """
+    comments = {}
+    for comment in Comment.objects.filter(article__in=articles).order_by('created_at', 'id'):
+        comments.setdefault(comment.article_id, []).append(comment)
+
+    records = [to_record(article, comments.get(article.id, [])) for article in articles]
+    name = f'articles-{articles[0].id}-{articles[-1].id}.ndjson.gz'
+    locations = write_segment(name, records)
+    by_id = {article.id: article for article in articles}
+    return [
+        ArchivedArticle(
+            id=article_id, url=by_id[article_id].url, published_at=by_id[article_id].published_at,
+            segment=name, offset=offset, length=length
+        )
+        for article_id, offset, length in locations
+    ]
+
+
+def load_archived(article_id):
+    """Return ``(article, comments)`` rebuilt from the archive, or None.
+
+    Both are unsaved model instances, good for rendering only.
+    """
+    entry = ArchivedArticle.objects.filter(id=article_id).first()
+    if entry is None:
+        return None
+    for record in read_block(entry.segment, entry.offset, entry.length):
+        if record['id'] == entry.id:
+            return from_record(record)
+    return None
+
+
+def from_record(record):
+    record = dict(record)
+    comments = [
+        Comment(article_id=record['id'], **parse_dates(comment))
+        for comment in record.pop('comments', [])
+    ]
+    return Article(**parse_dates(record)), comments
+
+
+def parse_dates(values):
+    return {key: parse_datetime(value) if key in DATE_FIELDS and value else value
+            for key, value in values.items()}
@@ -0,0 +1,111 @@
+"""Async variants of the read paths, served through ``alphaup/asgi.py``.
+
+Enabled with ``NEWS_ASYNC_VIEWS``. They render the same templates and JSON as
+their synchronous counterparts but await the database through Django's async
+ORM, so a worker isn't pinned to one request while a query runs.
+"""
+import logging
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.core.paginator import InvalidPage, Page
+from django.http import Http404, JsonResponse
+from django.shortcuts import redirect, render
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.encoders import JSONEncoder
+
+from .archive import load_archived
+from .cache import CachedCountPaginator, aget_article_count, aget_categories
+from .conditional import article_list_validators, article_validators, comment_validators, conditional_view
+from .dedupe import collapse_clusters
+from .models import Article, Comment
+from .pagination import CommentCursorPagination
+from .serializers import CommentSerializer
+from .views import CommentViewSet, NewsListView
+
+logger = logging.getLogger(__name__)
+
+comment_list_sync = CommentViewSet.as_view({'get': 'list', 'post': 'create'})
+
+
+@conditional_view(lambda request: article_list_validators())
+async def news_list(request):
+    """Async counterpart of NewsListView"""
+    category = request.GET.get('category', '')
+    queryset = Article.objects.all()
+    if category:
+        queryset = queryset.filter(category=category)
+    queryset = collapse_clusters(queryset).order_by('-published_at')
+
+    paginator = CachedCountPaginator(queryset, NewsListView.paginate_by, category=category)
+    paginator.count = await aget_article_count(queryset, category)
+    try:
+        number = paginator.validate_number(request.GET.get('page') or 1)
+    except InvalidPage as e:
+        raise Http404(str(e))
+
+    async def get_page(number):
+        bottom = (number - 1) * paginator.per_page
+        return Page([article async for article in queryset[bottom:bottom + paginator.per_page]], number, paginator)
+
+    page = await get_page(number)
+    if paginator.overshot(page):
+        # See CachedCountPaginator
+        paginator.use_count(await aget_article_count(queryset, category, exact=True))
+        page = await get_page(min(number, paginator.num_pages))
+
+    context = {
+        'paginator': paginator,
+        'page_obj': page,
+        'is_paginated': page.has_other_pages(),
+        'articles': page,
+        'object_list': page.object_list,
+        'categories': await aget_categories(),
+        'selected_category': category,
+    }
+    return await sync_to_async(render)(request, NewsListView.template_name, context)
+
+
+@conditional_view(lambda request, article_id: article_validators(article_id))
+async def article_detail(request, article_id):
+    """Async counterpart of views.article_detail"""
+    try:
+        article = await Article.objects.filter(id=article_id).afirst()
+        comments = None
+        if article is None:
+            article, comments = await sync_to_async(load_archived)(article_id) or (None, None)
+        if article is None:
+            raise Http404("No Article matches the given query.")
+    except Exception as e:
+        logger.error(f"Error in article_detail view: {str(e)}")
+        await sync_to_async(messages.error)(request, 'An error occurred while loading the article.')
+        return redirect('news_list')
+    context = {'article': article, 'archived': comments is not None, 'archived_comments': comments}
+    return await sync_to_async(render)(request, 'news/article_detail.html', context)
+
+
+@conditional_view(lambda request: comment_validators(request.GET.get('article_id') or None))
+async def comment_history(request):
+    paginator = CommentCursorPagination()
+    queryset = Comment.objects.order_by('-created_at', '-id')
+    article_id = request.GET.get('article_id')
+    if article_id:
+        queryset = queryset.filter(article_id=article_id)
+
+    comments = await paginator.apaginate_queryset(queryset, request)
+    data = paginator.get_paginated_data(CommentSerializer(comments, many=True).data)
+    return JsonResponse(data, encoder=JSONEncoder)
+
+
+@csrf_exempt
+async def comment_list(request):
+    """Serve comment reads asynchronously; writes and other formats go to DRF"""
+    browsable = 'text/html' in request.headers.get('Accept', '')
+    if request.method == 'GET' and not browsable and 'format' not in request.GET:
+        try:
+            return await comment_history(request)
+        except NotFound:
+            # Invalid cursors get DRF's error response
+            pass
+    return await sync_to_async(comment_list_sync)(request)
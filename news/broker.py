@@ -0,0 +1,183 @@
+"""Publish/subscribe for live updates.
+
+``Broker`` keeps the readers connected to this process and fans messages
+out to them; subclasses decide how ``publish`` reaches every process:
+
+- ``InProcessBroker`` delivers straight to local readers. Only correct when
+  a single process serves both the writes and the streams.
+- ``RedisBroker`` publishes to Redis; a listener thread in each process
+  relays what it receives to its own readers, so a comment posted on one
+  worker reaches streams held open by the others.
+
+``comment_broker`` is a ``RedisBroker`` when ``NEWS_BROKER_URL`` is set.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One reader's queue of events for a channel"""
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, message):
+        """Enqueue on the reader's loop, dropping the oldest event if it lags"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            logger.warning(f"Slow reader on {self.channel}; dropped an event")
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Fan out messages to async readers connected to this process.
+
+    ``deliver`` is thread-safe, so synchronous views and listener threads
+    can call it, and costs nothing when a channel has no readers. Each
+    reader is one asyncio queue on its own event loop; an idle reader holds
+    no database connection and issues no queries.
+
+    Subclasses implement ``publish``, which must end in ``deliver`` being
+    called in every process with readers.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Must be called from the reader's event loop"""
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def deliver(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # The reader's loop has closed; it will never unsubscribe
+                self.unsubscribe(subscription)
+
+
+class InProcessBroker(Broker):
+    """Deliver to the readers of this process only"""
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+
+class RedisBroker(Broker):
+    """Relay messages between processes through Redis pub/sub.
+
+    Every process runs one listener thread, started with its first reader,
+    on a pattern subscription to all channels under ``prefix``. Messages
+    published while Redis is unreachable still reach this process's readers;
+    other processes miss them, and their clients catch up through
+    Last-Event-ID or polling.
+    """
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, url, queue_size=100, prefix='news:'):
+        super().__init__(queue_size)
+        # Deferred so that the app runs without redis
+        import redis
+
+        self.redis = redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, channel):
+        self.start()
+        return super().subscribe(channel)
+
+    def publish(self, channel, message):
+        try:
+            self.client.publish(f'{self.prefix}{channel}', message)
+        except self.redis.RedisError as e:
+            logger.error(f"Error publishing to {channel}: {str(e)}")
+            self.deliver(channel, message)
+
+    def start(self):
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self.listen, name='broker-listener', daemon=True)
+                self._listener.start()
+
+    def listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f'{self.prefix}*')
+                for item in pubsub.listen():
+                    if item['type'] == 'pmessage':
+                        channel = item['channel'].decode()[len(self.prefix):]
+                        self.deliver(channel, item['data'].decode())
+            except self.redis.RedisError as e:
+                logger.error(f"Broker connection lost, reconnecting: {str(e)}")
+                time.sleep(self.RECONNECT_DELAY)
+
+    @staticmethod
+    def enabled():
+        try:
+            import redis  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+
+def build_broker():
+    url = settings.NEWS_BROKER_URL
+    if not url:
+        return InProcessBroker()
+    if not RedisBroker.enabled():
+        logger.warning("redis is not installed; live comments only reach readers on the same process")
+        return InProcessBroker()
+    return RedisBroker(url)
+
+
+comment_broker = build_broker()
+
+
+def comment_channel(article_id):
+    return f'comments:{article_id}'
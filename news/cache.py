@@ -0,0 +1,149 @@
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models import Article
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'news:articles:generation'
+
+
+def generation():
+    """Current article generation; bumping it invalidates every cached value"""
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        cache.add(GENERATION_KEY, 1, None)
+        value = cache.get(GENERATION_KEY, 1)
+    return value
+
+
+def invalidate_articles():
+    """Call after ingestion writes articles"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def cached(name, compute, *parts):
+    """Return a cached value for the current generation, computing it on a miss"""
+    key = ':'.join(['news', str(generation()), name, *map(str, parts)])
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, settings.NEWS_CACHE_TIMEOUT)
+    return value
+
+
+async def ageneration():
+    value = await cache.aget(GENERATION_KEY)
+    if value is None:
+        await cache.aadd(GENERATION_KEY, 1, None)
+        value = await cache.aget(GENERATION_KEY, 1)
+    return value
+
+
+async def acached(name, compute, *parts):
+    """Async variant of ``cached``; ``compute`` is a coroutine function"""
+    key = ':'.join(['news', str(await ageneration()), name, *map(str, parts)])
+    value = await cache.aget(key)
+    if value is None:
+        value = await compute()
+        await cache.aset(key, value, settings.NEWS_CACHE_TIMEOUT)
+    return value
+
+
+def get_categories():
+    """Distinct article categories, recomputed only after ingestion"""
+    return cached('categories', lambda: list(
+        Article.objects.order_by('category').values_list('category', flat=True).distinct()
+    ))
+
+
+async def aget_categories():
+    async def compute():
+        categories = Article.objects.order_by('category').values_list('category', flat=True).distinct()
+        return [category async for category in categories]
+    return await acached('categories', compute)
+
+
+def estimate_article_count():
+    """Row count from table statistics, avoiding a full COUNT(*)"""
+    connection = connections[Article.objects.db]
+    table = Article._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", [table]
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            # Ids are dense apart from deletions, so the span is a close estimate
+            cursor.execute(f'SELECT MAX(id) - MIN(id) + 1 FROM "{table}"')
+        row = cursor.fetchone()
+    return max(int(row[0] or 0), 0) if row else 0
+
+
+def get_article_count(queryset, category='', exact=False):
+    """Article count for the list pages, cached per category.
+
+    With ``NEWS_PAGINATION_COUNT = 'estimated'`` the unfiltered count comes
+    from table statistics instead of ``COUNT(*)``, unless ``exact``.
+    """
+    if not exact and estimated(category):
+        return cached('count:estimated', estimate_article_count)
+    return cached('count', queryset.count, category)
+
+
+async def aget_article_count(queryset, category='', exact=False):
+    if not exact and estimated(category):
+        return await acached('count:estimated', sync_to_async(estimate_article_count))
+    return await acached('count', queryset.acount, category)
+
+
+def estimated(category=''):
+    return not category and settings.NEWS_PAGINATION_COUNT == 'estimated'
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator whose total comes from the article count cache.
+
+    An estimated total counts every copy of a story, while the list shows
+    one card per story, so it runs past the real last page. A request for
+    an empty page beyond the end switches to the exact count and is served
+    the last page instead of a 404.
+    """
+
+    def __init__(self, object_list, per_page, category='', **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.category = category
+
+    @cached_property
+    def count(self):
+        return get_article_count(self.object_list, self.category)
+
+    @property
+    def estimated(self):
+        return estimated(self.category)
+
+    def overshot(self, page):
+        return self.estimated and page.number > 1 and not page.object_list
+
+    def use_count(self, count):
+        self.count = count
+        self.__dict__.pop('num_pages', None)
+
+    def page(self, number):
+        page = super().page(number)
+        if self.overshot(page):
+            self.use_count(get_article_count(self.object_list, self.category, exact=True))
+            page = super().page(min(page.number, self.num_pages))
+        return page
@@ -0,0 +1,187 @@
+import functools
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.db.models.expressions import RawSQL
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache import generation
+from .models import Article, Comment
+
+
+def latest(*timestamps):
+    timestamps = [timestamp for timestamp in timestamps if timestamp]
+    return max(timestamps) if timestamps else None
+
+
+def id_bounds(model):
+    """(newest id, its created_at, oldest id) for ``model``, or None when empty.
+
+    One query of MAX/MIN lookups on the primary key, O(1) at any table size.
+    """
+    table = model._meta.db_table
+    rows = (model.objects.filter(id=RawSQL(f'SELECT MAX(id) FROM {table}', []))
+            .annotate(oldest_id=RawSQL(f'SELECT MIN(id) FROM {table}', []))
+            .order_by().values_list('id', 'created_at', 'oldest_id')[:1])
+    return rows[0] if rows else None
+
+
+def stamp(timestamp):
+    return int(timestamp.timestamp() * 1_000_000) if timestamp else 0
+
+
+def article_list_validators():
+    """ETag and Last-Modified for any article listing.
+
+    The article generation changes whenever articles are added, removed or
+    regrouped, and the newest ``updated_at`` whenever one is written,
+    including comment count flushes and summary rewrites. The latter is a
+    single read from the end of the ``updated_at`` index.
+    """
+    updated_at = Article.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None, None
+    return f"articles-{generation()}-{stamp(updated_at)}", updated_at
+
+
+def comment_validators(article_id=None):
+    """ETag and Last-Modified from the comment watermark, per article if given.
+
+    The newest ``updated_at`` changes when a comment is added or edited.
+    """
+    if article_id is None:
+        bounds = id_bounds(Comment)
+        if bounds is None:
+            return 'comments-all-empty', None
+        newest_id, _, oldest_id = bounds
+        updated_at = Comment.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
+        return f'comments-all-{oldest_id}-{newest_id}-{stamp(updated_at)}', updated_at
+
+    # Covered by the (article, updated_at) index
+    watermark = (Comment.objects.filter(article_id=article_id).order_by()
+                 .aggregate(latest=Max('updated_at'), count=Count('id')))
+    modified = watermark['latest']
+    return f"comments-{article_id}-{watermark['count']}-{stamp(modified)}", modified
+
+
+def article_validators(article_id):
+    """Validators for one article, from its ``updated_at``, and its comments"""
+    updated_at = Article.objects.filter(pk=article_id).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None, None
+    comments_etag, comments_modified = comment_validators(article_id)
+    return f'article-{article_id}-{stamp(updated_at)}-{comments_etag}', latest(updated_at, comments_modified)
+
+
+def check_validators(request, validators, variant=''):
+    """Compute the quoted ETag and Last-Modified timestamp for a request.
+
+    Returns None when the request must not be answered conditionally.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+
+    # Flash messages are rendered into the page once and must not be lost
+    if len(messages.get_messages(request)):
+        return None
+
+    etag, last_modified = validators()
+    if etag is not None:
+        etag = quote_etag(f'{etag}-{variant}' if variant else etag)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return etag, timestamp
+
+
+def add_validators(response, etag, timestamp):
+    if response.status_code in (200, 304):
+        if etag and not response.has_header('ETag'):
+            response.headers['ETag'] = etag
+        if timestamp and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(timestamp)
+        # Let clients and the CDN store the page but always revalidate
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_response(request, validators, respond, variant=''):
+    """Answer 304 when the client's validators match, else call ``respond``.
+
+    Validators are computed from cheap indexed lookups before anything is
+    rendered. ``variant`` distinguishes representations served from the same
+    URL, such as JSON and the browsable API.
+    """
+    checked = check_validators(request, validators, variant)
+    if checked is None:
+        return respond()
+
+    etag, timestamp = checked
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = respond()
+    return add_validators(response, etag, timestamp)
+
+
+async def aconditional_response(request, validators, respond, variant=''):
+    """Async variant of ``conditional_response``; ``respond`` is awaited"""
+    checked = await sync_to_async(check_validators)(request, validators, variant)
+    if checked is None:
+        return await respond()
+
+    etag, timestamp = checked
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = await respond()
+    return add_validators(response, etag, timestamp)
+
+
+def conditional_view(validators_for):
+    """Decorator for views whose validators depend on the request and URL kwargs"""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                return await aconditional_response(
+                    request,
+                    lambda: validators_for(request, *args, **kwargs),
+                    lambda: view(request, *args, **kwargs)
+                )
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return conditional_response(
+                request,
+                lambda: validators_for(request, *args, **kwargs),
+                lambda: view(request, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """Answer 304 Not Modified on list and retrieve for DRF viewsets"""
+
+    def get_list_validators(self):
+        raise NotImplementedError
+
+    def get_object_validators(self):
+        raise NotImplementedError
+
+    def variant(self):
+        return self.request.accepted_renderer.format
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.get_list_validators,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+            variant=self.variant()
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.get_object_validators,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+            variant=self.variant()
+        )
@@ -0,0 +1,107 @@
+"""Write-behind buffer for ``Article.comment_count``.
+
+Posting a comment doesn't touch the article row. The change is added to an
+in-process buffer instead, which a background thread flushes every
+``NEWS_COMMENT_COUNT_FLUSH_INTERVAL`` seconds as a single ``UPDATE`` over all
+articles that changed. A burst of comments on one article costs one row
+update per flush rather than one per comment.
+
+Counts lag by up to one interval. Changes still buffered when a process dies
+are lost; ``reconcile_comment_counts`` recomputes exact counts from the
+comments table. Changes buffered while it runs land on top of its counts, so
+it is best run when comment traffic is low. An interval of 0 writes each
+change immediately.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Article, Comment
+
+logger = logging.getLogger(__name__)
+
+
+def apply_counts(deltas):
+    """Add ``{article_id: delta}`` to the stored counts in one statement"""
+    deltas = {article_id: delta for article_id, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+    return Article.objects.filter(id__in=list(deltas)).update(
+        updated_at=timezone.now(),
+        comment_count=F('comment_count') + Case(
+            *(When(id=article_id, then=Value(delta)) for article_id, delta in deltas.items()),
+            default=Value(0), output_field=IntegerField()
+        )
+    )
+
+
+def reconcile_counts(queryset=None):
+    """Set ``comment_count`` to the exact number of comments; returns rows changed"""
+    queryset = Article.objects.all() if queryset is None else queryset
+    exact = Coalesce(Subquery(
+        Comment.objects.filter(article=OuterRef('pk'))
+        .order_by().values('article').annotate(count=Count('id')).values('count')
+    ), 0)
+    return queryset.annotate(exact=exact).exclude(comment_count=F('exact')).update(comment_count=exact, updated_at=timezone.now())
+
+
+class CommentCounter:
+    """Coalesce comment count changes and flush them in batches"""
+
+    def __init__(self, interval=None):
+        self._interval = interval
+        self.pending = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def interval(self):
+        if self._interval is None:
+            return settings.NEWS_COMMENT_COUNT_FLUSH_INTERVAL
+        return self._interval
+
+    def add(self, article_id, delta=1):
+        if self.interval <= 0:
+            apply_counts({article_id: delta})
+            return
+        with self._lock:
+            self.pending[article_id] += delta
+            if self._thread is None:
+                self.start()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='comment-counts', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def flush(self):
+        """Write every buffered change; returns the number of articles updated"""
+        with self._lock:
+            deltas, self.pending = self.pending, Counter()
+        if not deltas:
+            return 0
+        try:
+            return apply_counts(deltas)
+        except DatabaseError as e:
+            logger.error(f"Error flushing comment counts: {str(e)}")
+            # Keep the changes for the next flush, on a fresh connection
+            with self._lock:
+                self.pending.update(deltas)
+            connection.close()
+            return 0
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+
+comment_counter = CommentCounter()
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.utils.dateparse import parse_datetime
+
+
+def parse_timestamp(value):
+    """Aware datetime of an API timestamp, or None when missing or malformed.
+
+    Providers send ISO 8601, which the C ``fromisoformat`` parses several
+    times faster than Django's regex-based ``parse_datetime``; the latter
+    remains the fallback for anything else. Naive values are taken as UTC,
+    and datetimes pass through, so records normalized by a provider can be
+    parsed again for free.
+    """
+    if isinstance(value, datetime):
+        date = value
+    elif not value:
+        return None
+    else:
+        try:
+            date = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            try:
+                date = parse_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if date is None:
+                return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=dt_timezone.utc)
+    return date
@@ -0,0 +1,171 @@
+"""Near-duplicate story detection with MinHash and LSH banding.
+
+Syndicated wire stories reach us from many outlets under different URLs with
+lightly edited titles and descriptions. Each article gets a MinHash signature
+of the words in its title and summary, whose agreement estimates the Jaccard
+similarity of two word sets. The signature is split into bands; articles
+sharing any band are candidates, found with indexed equality lookups, and
+confirmed by comparing their full signatures.
+
+MinHash is used rather than SimHash because titles and descriptions are
+short: rewording one or two words moves a 64-bit SimHash by more bits than
+banding can tolerate, while the word-set similarity barely changes.
+
+Only fingerprints published within ``NEWS_DUPLICATE_WINDOW`` hours are
+considered, which keeps chance band collisions rare however large the table
+grows.
+"""
+import hashlib
+import random
+import re
+import struct
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Exists, F, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import StoryFingerprint
+
+PERMUTATIONS = 32
+BANDS = 8
+ROWS = PERMUTATIONS // BANDS
+
+# Mersenne prime modulus for the permutations
+PRIME = (1 << 61) - 1
+
+# Fixed seed: stored signatures must stay comparable across processes
+_rng = random.Random(20241018)
+COEFFICIENTS = [(_rng.randrange(1, PRIME), _rng.randrange(PRIME)) for _ in range(PERMUTATIONS)]
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+
+
+def words(text):
+    """Distinct words of ``text``, ignoring case and stopwords"""
+    return {word for word in TOKEN_RE.findall(text.lower()) if word not in STOPWORDS}
+
+
+def article_text(title, summary):
+    return f'{title} {summary}'
+
+
+def token_hash(word):
+    return int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), 'big')
+
+
+def minhash(text):
+    """Signature of ``text``: the minimum of each permutation, truncated to 32 bits.
+
+    None when ``text`` has no words besides stopwords: all such texts would
+    share one signature, so they are never fingerprinted or clustered.
+    """
+    hashes = [token_hash(word) for word in words(text)]
+    if not hashes:
+        return None
+    return tuple(
+        min((a * value + b) % PRIME for value in hashes) & 0xFFFFFFFF
+        for a, b in COEFFICIENTS
+    )
+
+
+def bands(signature):
+    """One non-negative 31-bit key per band of ``ROWS`` signature values"""
+    keys = []
+    for band in range(BANDS):
+        rows = struct.pack(f'<{ROWS}I', *signature[band * ROWS:(band + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(rows, digest_size=4).digest(), 'big') & 0x7FFFFFFF)
+    return keys
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of the word sets behind two signatures"""
+    return sum(a == b for a, b in zip(first, second)) / PERMUTATIONS
+
+
+def pack(signature):
+    return struct.pack(f'<{PERMUTATIONS}I', *signature)
+
+
+def unpack(data):
+    return struct.unpack(f'<{PERMUTATIONS}I', bytes(data))
+
+
+class FingerprintIndex:
+    """Band tables over recent fingerprints and the batch being ingested.
+
+    ``find`` returns the cluster key of the first fingerprint at least
+    ``threshold`` similar, or None. Keys are article ids for stored
+    fingerprints and whatever ``add`` was given for new ones.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = settings.NEWS_DUPLICATE_SIMILARITY if threshold is None else threshold
+        self.tables = [{} for _ in range(BANDS)]
+
+    def add(self, signature, cluster):
+        for table, key in zip(self.tables, bands(signature)):
+            table.setdefault(key, []).append((signature, cluster))
+
+    def find(self, signature):
+        for table, key in zip(self.tables, bands(signature)):
+            for candidate, cluster in table.get(key, ()):
+                if similarity(candidate, signature) >= self.threshold:
+                    return cluster
+        return None
+
+    @classmethod
+    def load(cls, signatures, published_after, threshold=None):
+        """Index the stored fingerprints sharing a band with any of ``signatures``"""
+        index = cls(threshold)
+        if not signatures:
+            return index
+        band_keys = list(zip(*(bands(signature) for signature in signatures)))
+        condition = Q()
+        for band, wanted in enumerate(band_keys):
+            condition |= Q(**{f'band{band}__in': set(wanted)})
+        rows = (StoryFingerprint.objects
+                .filter(condition, published_at__gte=published_after)
+                .values_list('signature', 'cluster_id'))
+        for signature, cluster in rows:
+            index.add(unpack(signature), cluster)
+        return index
+
+
+def window_start(published_at):
+    return published_at - timedelta(hours=settings.NEWS_DUPLICATE_WINDOW)
+
+
+def build_fingerprint(article, signature, cluster_id):
+    return StoryFingerprint(
+        article_id=article.id, signature=pack(signature), cluster_id=cluster_id,
+        published_at=article.published_at,
+        **{f'band{band}': key for band, key in enumerate(bands(signature))}
+    )
+
+
+def collapse_clusters(queryset):
+    """One row per story among ``queryset``, plus articles never fingerprinted.
+
+    A cluster is shown by its head when the head is in ``queryset``, and
+    otherwise by its earliest member that is, so copies filed under another
+    category than their head, or outliving an archived head, stay listed.
+    Rows are annotated with ``cluster_size``, the number of articles
+    covering the same story.
+    """
+    rows = queryset.order_by()
+    head_listed = Exists(rows.filter(id=OuterRef('fingerprint__cluster_id')))
+    first_listed = (rows.filter(fingerprint__cluster_id=OuterRef('fingerprint__cluster_id'))
+                    .values('fingerprint__cluster_id').annotate(first=Min('id')).values('first'))
+    return queryset.filter(
+        Q(fingerprint__isnull=True) | Q(fingerprint__cluster_id=F('id')) |
+        (~head_listed & Q(id=Subquery(first_listed)))
+    ).annotate(cluster_size=Coalesce(Subquery(
+        StoryFingerprint.objects.filter(cluster_id=OuterRef('fingerprint__cluster_id'))
+        .order_by().values('cluster_id').annotate(count=Count('article')).values('count')
+    ), 1))
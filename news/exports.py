@@ -0,0 +1,180 @@
+"""Snapshots of articles and their comments as gzip NDJSON.
+
+One line per article with its comments nested, the same record layout as
+the archive segments, so ``import_articles`` also restores archived
+articles. Both directions run in constant memory: exports read through
+``iterator(chunk_size=...)`` and compress incrementally, imports insert
+chunk by chunk with ``bulk_create``.
+"""
+import gzip
+import io
+import json
+import zlib
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .archive import encode, from_record, to_record
+from .models import Article, Comment
+
+CHUNK_SIZE = 2000
+
+
+def parse_bound(value, end=False):
+    """Parse a date or datetime filter; a bare ``until`` date includes that day"""
+    if not value:
+        return None
+    bound = parse_datetime(value)
+    if bound is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        bound = datetime.combine(day, time.max if end else time.min)
+    if timezone.is_naive(bound):
+        bound = timezone.make_aware(bound, dt_timezone.utc)
+    return bound
+
+
+def export_queryset(categories=None, since=None, until=None, comments=True):
+    """Articles to export, oldest first, with their comments prefetched per chunk"""
+    queryset = Article.objects.order_by('id')
+    if categories:
+        queryset = queryset.filter(category__in=categories)
+    if since:
+        queryset = queryset.filter(published_at__gte=since)
+    if until:
+        queryset = queryset.filter(published_at__lte=until)
+    if comments:
+        queryset = queryset.prefetch_related(
+            Prefetch('comments', queryset=Comment.objects.order_by('created_at', 'id'))
+        )
+    return queryset
+
+
+def iter_lines(queryset, chunk_size=CHUNK_SIZE, comments=True):
+    for article in queryset.iterator(chunk_size=chunk_size):
+        yield encode(to_record(article, article.comments.all() if comments else []))
+
+
+def iter_gzip(lines, flush_bytes=64 * 1024):
+    """Compress ``lines`` into a gzip stream, yielding it in pieces"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = 0
+    for line in lines:
+        data = line.encode()
+        pending += len(data)
+        chunk = compressor.compress(data)
+        if chunk:
+            yield chunk
+        if pending >= flush_bytes:
+            # Keep a slow consumer's download moving
+            yield compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+    yield compressor.flush()
+
+
+def read_records(stream):
+    """Yield records from an NDJSON byte stream, gzip-compressed or not"""
+    stream = io.BufferedReader(stream) if not hasattr(stream, 'peek') else stream
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        stream = gzip.GzipFile(fileobj=stream)
+    for line in io.TextIOWrapper(stream, encoding='utf-8'):
+        if line.strip():
+            yield json.loads(line)
+
+
+def stamped_fields(model):
+    """Fields that ``save`` and ``bulk_create`` set to the insert time"""
+    return [field.attname for field in model._meta.concrete_fields if getattr(field, 'auto_now_add', False)]
+
+
+def imported_timestamps(model, objects):
+    return [[getattr(obj, field) for field in stamped_fields(model)] for obj in objects]
+
+
+def restore_timestamps(model, objects, imported, batch_size=500):
+    """Write back the imported values of fields stamped on insert.
+
+    ``bulk_update`` writes attribute values as they are, without calling
+    ``pre_save``, so the model fields themselves are never changed. Objects
+    must have their ids; ``imported`` holds their original values of
+    ``stamped_fields``, None where the record had none.
+    """
+    fields = stamped_fields(model)
+    changed = []
+    for obj, values in zip(objects, imported):
+        values = [(field, value) for field, value in zip(fields, values) if value is not None]
+        for field, value in values:
+            setattr(obj, field, value)
+        if values:
+            changed.append(obj)
+    if changed:
+        model.objects.bulk_update(changed, fields, batch_size=batch_size)
+
+
+def import_records(records, chunk_size=CHUNK_SIZE):
+    """Insert articles whose URL is new, with their comments.
+
+    Article ids are not kept, since they may already be taken in the
+    target database; comments follow their article by URL. Articles that
+    already exist are skipped along with their comments, so re-running an
+    import is harmless. Returns ``{'articles', 'comments', 'skipped'}``.
+    """
+    stats = {'articles': 0, 'comments': 0, 'skipped': 0}
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            import_chunk(chunk, stats)
+            chunk = []
+    if chunk:
+        import_chunk(chunk, stats)
+    return stats
+
+
+def import_chunk(records, stats):
+    articles = {}
+    comments = {}
+    for record in records:
+        article, article_comments = from_record(record)
+        if article.url in articles:
+            continue
+        article.id = None
+        article.comment_count = len(article_comments)
+        articles[article.url] = article
+        comments[article.url] = article_comments
+
+    with transaction.atomic():
+        existing = set(Article.objects.filter(url__in=list(articles)).values_list('url', flat=True))
+        new = [article for url, article in articles.items() if url not in existing]
+        # bulk_create replaces them with the insert time
+        article_times = imported_timestamps(Article, new)
+        Article.objects.bulk_create(new, batch_size=500, ignore_conflicts=True)
+        ids = dict(Article.objects.filter(url__in=[article.url for article in new]).values_list('url', 'id'))
+        for article in new:
+            article.id = ids[article.url]
+        restore_timestamps(Article, new, article_times)
+
+        rows = []
+        for article in sorted(new, key=lambda article: article.id):
+            for comment in comments[article.url]:
+                comment.id = None
+                comment.article_id = article.id
+                rows.append(comment)
+        comment_times = imported_timestamps(Comment, rows)
+        Comment.objects.bulk_create(rows, batch_size=500)
+        # The articles are new, so all their comments are these rows, in
+        # insertion order; ids are read back since not every backend
+        # returns them from bulk_create
+        stored = (Comment.objects.filter(article_id__in=ids.values())
+                  .order_by('article_id', 'id').values_list('id', flat=True))
+        for comment, comment_id in zip(rows, stored):
+            comment.id = comment_id
+        restore_timestamps(Comment, rows, comment_times)
+
+    stats['articles'] += len(new)
+    stats['comments'] += len(rows)
+    stats['skipped'] += len(records) - len(new)
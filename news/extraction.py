@@ -0,0 +1,224 @@
+"""Full article text for the summarizer.
+
+MediaStack only returns a short description, so after ingestion each new
+article's page is downloaded and its main text extracted with BeautifulSoup.
+The text, together with the description, is summarized into
+``extended_summary``.
+
+Downloads run in a pool of ``NEWS_EXTRACTION_WORKERS`` threads. At most
+``NEWS_EXTRACTION_PER_HOST`` of them fetch from the same host at once, so
+a batch dominated by one outlet doesn't hammer it. Raw HTML is kept
+gzip-compressed under ``NEWS_EXTRACTION_CACHE_DIR``, named after a hash of
+the URL. Re-running extraction or ``generate_extended_summaries`` parses the
+cached page instead of downloading it again.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Article
+from .routers import use_primary
+from .summarizer import summarize_batch
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (compatible; alphaup/1.0)'
+
+# Elements that never hold article text
+BOILERPLATE = ['script', 'style', 'noscript', 'template', 'svg', 'iframe', 'form',
+               'nav', 'header', 'footer', 'aside', 'figure']
+
+# Shorter paragraphs are usually captions, bylines or buttons
+MIN_PARAGRAPH_WORDS = 8
+
+
+class ExtractionError(Exception):
+    pass
+
+
+def cache_path(url):
+    digest = hashlib.sha256(url.encode()).hexdigest()
+    return Path(settings.NEWS_EXTRACTION_CACHE_DIR) / digest[:2] / f'{digest}.html.gz'
+
+
+def read_cached(url):
+    try:
+        return gzip.decompress(cache_path(url).read_bytes())
+    except (OSError, EOFError):
+        return None
+
+
+def write_cached(url, html):
+    path = cache_path(url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'.{path.name}.{threading.get_ident()}.tmp')
+    tmp_path.write_bytes(gzip.compress(html))
+    os.replace(tmp_path, path)
+
+
+def extract_text(html):
+    """Main text of an HTML page: its paragraphs, without navigation and markup"""
+    # Deferred so that the app runs without BeautifulSoup
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup.find_all(BOILERPLATE):
+        element.decompose()
+
+    # Prefer the <article> holding the most paragraphs
+    containers = soup.find_all('article') or [soup.find('main') or soup.body or soup]
+    container = max(containers, key=lambda element: len(element.find_all('p')))
+    paragraphs = []
+    for paragraph in container.find_all('p'):
+        text = ' '.join(paragraph.get_text(' ').split())
+        if len(text.split()) >= MIN_PARAGRAPH_WORDS:
+            paragraphs.append(text)
+    return ' '.join(paragraphs)
+
+
+def cached_text(url):
+    """Text of a page already in the cache, or ''; never downloads"""
+    html = read_cached(url)
+    if html is None:
+        return ''
+    try:
+        return extract_text(html)
+    except Exception as e:
+        logger.error(f"Error parsing cached page for {url}: {str(e)}")
+        return ''
+
+
+class ContentExtractor:
+    """Download and parse article pages with per-host concurrency caps"""
+
+    def __init__(self, workers=None, per_host=None, timeout=None, max_bytes=None, session=None):
+        self.workers = workers or settings.NEWS_EXTRACTION_WORKERS
+        self.per_host = per_host or settings.NEWS_EXTRACTION_PER_HOST
+        self.timeout = timeout or settings.NEWS_FETCH_TIMEOUT
+        self.max_bytes = max_bytes or settings.NEWS_EXTRACTION_MAX_BYTES
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', USER_AGENT)
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def host_slot(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return self._hosts[host]
+
+    def download(self, url):
+        with self.host_slot(url):
+            try:
+                with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                    response.raise_for_status()
+                    data = bytearray()
+                    for chunk in response.iter_content(64 * 1024):
+                        data += chunk
+                        if len(data) > self.max_bytes:
+                            raise ExtractionError(f"{url} is larger than {self.max_bytes} bytes")
+                    return bytes(data)
+            except requests.RequestException as e:
+                raise ExtractionError(f"Could not fetch {url}: {str(e)}")
+
+    def html(self, url):
+        html = read_cached(url)
+        if html is None:
+            html = self.download(url)
+            write_cached(url, html)
+        return html
+
+    def text(self, url):
+        """Extracted text of ``url``, or '' when it can't be fetched or parsed"""
+        try:
+            return extract_text(self.html(url))
+        except ExtractionError as e:
+            logger.warning(str(e))
+        except Exception as e:
+            logger.error(f"Error extracting {url}: {str(e)}")
+        return ''
+
+    def run(self, urls):
+        """Return ``{url: text}`` for every distinct URL"""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='extraction') as executor:
+            return dict(zip(urls, executor.map(self.text, urls)))
+
+    @staticmethod
+    def enabled():
+        try:
+            import bs4  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+
+def summarize_articles(article_ids, extractor=None):
+    """Rewrite the extended summaries of articles whose page text could be extracted.
+
+    Returns the number of articles updated.
+    """
+    extractor = extractor or ContentExtractor()
+    with use_primary():
+        rows = list(Article.objects.filter(id__in=article_ids).values_list('id', 'url', 'summary'))
+        contents = extractor.run([url for _, url, _ in rows])
+        rows = [(article_id, summary, contents.get(url)) for article_id, url, summary in rows
+                if contents.get(url)]
+        if not rows:
+            return 0
+        summaries = summarize_batch([f"{summary} {content}" for _, summary, content in rows])
+        now = timezone.now()
+        with transaction.atomic():
+            Article.objects.bulk_update(
+                [Article(id=article_id, extended_summary=extended_summary, updated_at=now)
+                 for (article_id, _, _), extended_summary in zip(rows, summaries)],
+                ['extended_summary', 'updated_at'], batch_size=500
+            )
+    return len(rows)
+
+
+def summarize_quietly(article_ids):
+    # The worker thread outlives requests; drop a connection the server has
+    # closed or that is past CONN_MAX_AGE, as request handling would
+    close_old_connections()
+    try:
+        updated = summarize_articles(article_ids)
+        logger.info(f"Extraction: {len(article_ids)} articles, {updated} summaries from full text")
+    except Exception as e:
+        logger.error(f"Error extracting article content: {str(e)}")
+    finally:
+        close_old_connections()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def schedule_extraction(article_ids):
+    """Extract and summarize new articles in the background after ingestion.
+
+    Batches run one at a time on a single background thread, each with its
+    own bounded download pool, so ingestion never waits for article pages.
+    """
+    global _executor
+    article_ids = [article_id for article_id in article_ids if article_id]
+    if not article_ids or not settings.NEWS_EXTRACTION_ON_INGEST:
+        return
+    if not ContentExtractor.enabled():
+        logger.warning("BeautifulSoup is not installed; summaries use descriptions only")
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='extraction-batches')
+    _executor.submit(summarize_quietly, article_ids)
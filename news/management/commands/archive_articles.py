@@ -0,0 +1,60 @@
+# news/management/commands/archive_articles.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from news.archive import archive_batch
+from news.cache import invalidate_articles
+from news.models import ArchivedArticle, Article
+from news.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = 'Move old articles and their comments to compressed archive segments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=settings.NEWS_ARCHIVE_AFTER_DAYS,
+            help='Archive articles published more than this many days ago'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of articles per segment file and transaction'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many articles would be archived'
+        )
+
+    @use_primary()
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        articles = Article.objects.filter(published_at__lt=cutoff).order_by('id')
+
+        if options['dry_run']:
+            self.stdout.write(f'{articles.count()} articles published before {cutoff:%Y-%m-%d} would be archived')
+            return
+
+        archived = 0
+        try:
+            while True:
+                batch = list(articles[:options['batch_size']])
+                if not batch:
+                    break
+
+                # The segment is on disk before the rows go, so a failure
+                # here leaves the articles in place to be archived again
+                entries = archive_batch(batch)
+                with transaction.atomic():
+                    ArchivedArticle.objects.bulk_create(entries, ignore_conflicts=True)
+                    Article.objects.filter(id__in=[article.id for article in batch]).delete()
+
+                archived += len(batch)
+                self.stdout.write(f'Archived {archived} articles')
+        finally:
+            if archived:
+                invalidate_articles()
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} articles published before {cutoff:%Y-%m-%d}'))
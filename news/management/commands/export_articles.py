@@ -0,0 +1,54 @@
+# news/management/commands/export_articles.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from news.exports import CHUNK_SIZE, export_queryset, iter_gzip, iter_lines, parse_bound
+
+
+class Command(BaseCommand):
+    help = 'Stream articles and their comments to a gzip NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Destination file, or '-' for stdout")
+        parser.add_argument(
+            '--category', action='append', dest='categories',
+            help='Only this category; repeat for several'
+        )
+        parser.add_argument('--since', help='Only articles published on or after this date or datetime')
+        parser.add_argument('--until', help='Only articles published on or before this date or datetime')
+        parser.add_argument(
+            '--without-comments', action='store_true',
+            help='Leave comments out of the export'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Number of articles read per query'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_bound(options['since'])
+            until = parse_bound(options['until'], end=True)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        comments = not options['without_comments']
+        queryset = export_queryset(options['categories'], since, until, comments=comments)
+
+        exported = 0
+
+        def lines():
+            nonlocal exported
+            for line in iter_lines(queryset, options['chunk_size'], comments=comments):
+                exported += 1
+                yield line
+
+        output = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+        try:
+            for chunk in iter_gzip(lines()):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+
+        self.stderr.write(self.style.SUCCESS(f'Exported {exported} articles'))
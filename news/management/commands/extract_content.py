@@ -0,0 +1,53 @@
+# news/management/commands/extract_content.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from news.extraction import ContentExtractor, summarize_articles
+from news.models import Article
+from news.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = 'Download article pages and rebuild extended summaries from their full text'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category', action='append', dest='categories',
+            help='Only articles in this category (repeatable)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help='Number of articles downloaded and summarized per batch'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.NEWS_EXTRACTION_WORKERS,
+            help='Number of concurrent downloads'
+        )
+        parser.add_argument(
+            '--per-host', type=int, default=settings.NEWS_EXTRACTION_PER_HOST,
+            help='Maximum concurrent downloads from one host'
+        )
+
+    @use_primary()
+    def handle(self, *args, **options):
+        if not ContentExtractor.enabled():
+            raise CommandError('BeautifulSoup is not installed')
+
+        extractor = ContentExtractor(workers=options['workers'], per_host=options['per_host'])
+        articles = Article.objects.order_by('id')
+        if options['categories']:
+            articles = articles.filter(category__in=options['categories'])
+
+        last_id = 0
+        processed = updated = 0
+        while True:
+            ids = list(articles.filter(id__gt=last_id).values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            updated += summarize_articles(ids, extractor)
+            processed += len(ids)
+            last_id = ids[-1]
+            self.stdout.write(f'Processed {processed} articles, {updated} summarized from full text')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Extracted {updated} of {processed} articles; pages are cached in {settings.NEWS_EXTRACTION_CACHE_DIR}'
+        ))
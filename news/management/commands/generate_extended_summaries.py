@@ -0,0 +1,117 @@
+# news/management/commands/generate_extended_summaries.py
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from news.extraction import cached_text
+from news.models import Article
+from news.routers import use_primary
+from news.views import NewsService
+
+
+def summarize(rows):
+    """Run in a worker process; parsing and ranking are CPU-bound"""
+    return NewsService.generate_extended_summaries(
+        # Full text only for pages already downloaded by extract_content
+        [(summary, cached_text(url)) for summary, url in rows]
+    )
+
+
+class Command(BaseCommand):
+    help = 'Generate extended summaries for existing articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of worker processes used for summarization'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of articles read, summarized and written per batch'
+        )
+        parser.add_argument(
+            '--checkpoint', default=os.path.join(settings.BASE_DIR, '.extended_summaries.checkpoint'),
+            help='File recording the last processed article id'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore any existing checkpoint and start from the first article'
+        )
+
+    @use_primary()
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        workers = options['workers']
+        checkpoint = options['checkpoint']
+
+        last_id = 0 if options['restart'] else self.read_checkpoint(checkpoint)
+        articles = Article.objects.filter(extended_summary='').order_by('id')
+        total = articles.filter(id__gt=last_id).count()
+
+        if last_id:
+            self.stdout.write(f'Resuming after article {last_id}')
+        self.stdout.write(f'Generating extended summaries for {total} articles...')
+
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        processed = 0
+        try:
+            while True:
+                # Keyset chunking keeps each query cheap and memory bounded
+                rows = list(
+                    articles.filter(id__gt=last_id).values_list('id', 'summary', 'url')[:batch_size]
+                )
+                if not rows:
+                    break
+
+                summaries = [(summary, url) for _, summary, url in rows]
+                if pool:
+                    # One batch per worker, each ranked in a single pass
+                    size = -(-len(summaries) // workers)
+                    chunks = [summaries[i:i + size] for i in range(0, len(summaries), size)]
+                    results = [result for chunk in pool.map(summarize, chunks) for result in chunk]
+                else:
+                    results = summarize(summaries)
+
+                now = timezone.now()
+                Article.objects.bulk_update(
+                    [Article(id=article_id, extended_summary=extended_summary, updated_at=now)
+                     for (article_id, _, _), extended_summary in zip(rows, results)],
+                    ['extended_summary', 'updated_at'],
+                    batch_size=batch_size
+                )
+
+                last_id = rows[-1][0]
+                self.write_checkpoint(checkpoint, last_id)
+                processed += len(rows)
+                self.stdout.write(f'Processed {processed}/{total} articles')
+        except Exception as e:
+            # The checkpoint stays; fail the run so cron and CI notice
+            raise CommandError(
+                f'Error processing articles after {last_id}: {str(e)}. '
+                f'Re-run the command to resume from article {last_id}'
+            ) from e
+        finally:
+            if pool:
+                pool.shutdown()
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS('Successfully generated extended summaries'))
+
+    @staticmethod
+    def read_checkpoint(path):
+        try:
+            with open(path) as f:
+                return int(json.load(f)['last_id'])
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    @staticmethod
+    def write_checkpoint(path, last_id):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_id': last_id}, f)
+        os.replace(tmp_path, path)
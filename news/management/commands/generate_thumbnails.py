@@ -0,0 +1,56 @@
+# news/management/commands/generate_thumbnails.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from news.models import Article
+from news.thumbnails import ThumbnailPipeline, evict
+
+
+class Command(BaseCommand):
+    help = 'Render missing thumbnails for article images and enforce the cache size'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Only the images of the most recent N articles'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.NEWS_THUMBNAIL_WORKERS,
+            help='Number of images fetched and resized at once'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of images per batch'
+        )
+        parser.add_argument(
+            '--evict-only', action='store_true',
+            help='Only trim the cache to NEWS_THUMBNAIL_CACHE_BYTES'
+        )
+
+    def handle(self, *args, **options):
+        if options['evict_only']:
+            evicted = evict(settings.NEWS_THUMBNAIL_CACHE_BYTES)
+            self.stdout.write(self.style.SUCCESS(f'Evicted {evicted} thumbnails'))
+            return
+
+        if not ThumbnailPipeline.enabled():
+            self.stdout.write(self.style.ERROR('Pillow is required to render thumbnails'))
+            return
+
+        images = (Article.objects.exclude(image='')
+                  .order_by('-published_at', '-id').values_list('image', flat=True))
+        if options['limit']:
+            images = images[:options['limit']]
+
+        pipeline = ThumbnailPipeline(workers=options['workers'])
+        batch_size = options['batch_size']
+        batch = []
+        written = 0
+        for image in images.iterator(chunk_size=batch_size):
+            batch.append(image)
+            if len(batch) >= batch_size:
+                written += pipeline.run(batch)
+                batch = []
+        if batch:
+            written += pipeline.run(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} thumbnail files'))
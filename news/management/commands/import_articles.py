@@ -0,0 +1,36 @@
+# news/management/commands/import_articles.py
+import sys
+
+from django.core.management.base import BaseCommand
+from news.cache import invalidate_articles
+from news.exports import CHUNK_SIZE, import_records, read_records
+from news.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = 'Load articles and their comments from an NDJSON file, gzip-compressed or not'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Export or archive segment to load, or '-' for stdin")
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Number of articles inserted per transaction'
+        )
+
+    @use_primary()
+    def handle(self, *args, **options):
+        source = sys.stdin.buffer if options['input'] == '-' else open(options['input'], 'rb')
+        try:
+            stats = import_records(read_records(source), options['chunk_size'])
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+
+        if stats['articles']:
+            invalidate_articles()
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['articles']} articles and {stats['comments']} comments, "
+            f"skipped {stats['skipped']} already present"
+        ))
+        if stats['articles']:
+            self.stdout.write('Run index_story_fingerprints to group the imported articles into stories')
@@ -0,0 +1,69 @@
+# news/management/commands/index_story_fingerprints.py
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from news.cache import invalidate_articles
+from news.dedupe import FingerprintIndex, article_text, build_fingerprint, minhash, window_start
+from news.models import Article, StoryFingerprint
+from news.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = 'Fingerprint articles stored before near-duplicate detection and cluster them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of articles fingerprinted per batch'
+        )
+
+    @use_primary()
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Oldest first, so the first outlet to run a story heads its cluster
+        articles = (Article.objects.filter(fingerprint__isnull=True)
+                    .order_by('published_at', 'id'))
+        position = None
+        processed = clustered = 0
+
+        try:
+            while True:
+                page = articles
+                if position:
+                    published_at, last_id = position
+                    page = page.filter(Q(published_at__gt=published_at) |
+                                       Q(published_at=published_at, id__gt=last_id))
+                batch = list(page.only('id', 'title', 'summary', 'published_at')[:batch_size])
+                if not batch:
+                    break
+
+                signatures = [minhash(article_text(article.title, article.summary)) for article in batch]
+                index = FingerprintIndex.load([signature for signature in signatures if signature],
+                                              window_start(batch[0].published_at))
+                fingerprints = []
+                members = []
+                for article, signature in zip(batch, signatures):
+                    # No words to compare; stays unfingerprinted and alone
+                    if signature is None:
+                        continue
+                    cluster = index.find(signature)
+                    if cluster is None:
+                        cluster = article.id
+                        index.add(signature, cluster)
+                    else:
+                        members.append(article.id)
+                    fingerprints.append(build_fingerprint(article, signature, cluster))
+                StoryFingerprint.objects.bulk_create(fingerprints, ignore_conflicts=True)
+                # Copies leave the list pages; change its ETag
+                Article.objects.filter(id__in=members).update(updated_at=timezone.now())
+                clustered += len(members)
+
+                position = (batch[-1].published_at, batch[-1].id)
+                processed += len(batch)
+                self.stdout.write(f'Fingerprinted {processed} articles, {clustered} near-duplicates')
+        finally:
+            # Copies folded into clusters change list counts and pages
+            if clustered:
+                invalidate_articles()
+
+        self.stdout.write(self.style.SUCCESS('Story fingerprints are up to date'))
@@ -0,0 +1,31 @@
+# news/management/commands/reconcile_comment_counts.py
+from django.core.management.base import BaseCommand
+from news.counters import reconcile_counts
+from news.models import Article
+from news.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = 'Recompute Article.comment_count from the comments table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of articles checked per statement'
+        )
+
+    @use_primary()
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        ids = Article.objects.order_by('id').values_list('id', flat=True)
+        last_id = 0
+        checked = fixed = 0
+        while True:
+            batch = list(ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            fixed += reconcile_counts(Article.objects.filter(id__gte=batch[0], id__lte=batch[-1]))
+            checked += len(batch)
+            last_id = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} articles, corrected {fixed}'))
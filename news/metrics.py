@@ -0,0 +1,242 @@
+"""Always-on request and ingestion timings.
+
+Each request gets a ``RequestTimings`` in a context variable. SQL queries
+are timed by a wrapper installed on every database connection; template
+rendering, serialization and ingestion record themselves with ``stage()``.
+The totals are sent back in a ``Server-Timing`` header and folded into
+per-route histograms, which ``metrics_view`` exposes in the Prometheus text
+format.
+
+Histograms live in process memory: with several workers, each worker
+reports its own, so scrape them per process or aggregate in Prometheus.
+Recording costs two ``perf_counter`` calls and a dict update per stage, and
+the query wrapper is a single context variable lookup outside requests.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse
+from django.template.backends.django import DjangoTemplates
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+_current = ContextVar('news_request_timings', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self):
+        """Yield the exposition lines for every series"""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            series = {labels: (list(counts), total, count)
+                      for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            base = [f'{name}="{escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                le = ','.join(base + [f'le="{bound}"'])
+                yield f'{self.name}_bucket{{{le}}} {cumulative}'
+            suffix = f'{{{",".join(base)}}}' if base else ''
+            yield f'{self.name}_sum{suffix} {total}'
+            yield f'{self.name}_count{suffix} {count}'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram(
+    'news_request_duration_seconds', 'Time to produce a response', ['route', 'method'])
+REQUEST_QUERIES = Histogram(
+    'news_request_queries', 'SQL queries issued per request', ['route'], buckets=QUERY_BUCKETS)
+REQUEST_STAGE = Histogram(
+    'news_request_stage_seconds', 'Time per request spent in each stage', ['route', 'stage'])
+INGESTION_STAGE = Histogram(
+    'news_ingestion_stage_seconds', 'Time per ingestion batch spent in each stage', ['stage'])
+
+REGISTRY = [REQUEST_DURATION, REQUEST_QUERIES, REQUEST_STAGE, INGESTION_STAGE]
+
+
+class RequestTimings:
+    """Per-request totals by stage, in seconds"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.active = set()
+        self.queries = 0
+
+    def add(self, name, elapsed):
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def add_query(self, elapsed):
+        self.queries += 1
+        self.add('db', elapsed)
+
+    def server_timing(self, total):
+        entries = [f'total;dur={total * 1000:.1f}']
+        for name, elapsed in self.stages.items():
+            entry = f'{name};dur={elapsed * 1000:.1f}'
+            if name == 'db':
+                entry += f';desc="{self.queries} queries"'
+            entries.append(entry)
+        return ', '.join(entries)
+
+
+@contextmanager
+def stage(name, histogram=None):
+    """Time the block into the current request and optionally ``histogram``.
+
+    Nested blocks with the same name, such as a serializer rendering its
+    nested serializers, are only counted once.
+    """
+    timings = _current.get()
+    if timings is not None and name in timings.active:
+        yield
+        return
+
+    if timings is not None:
+        timings.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if timings is not None:
+            timings.active.discard(name)
+            timings.add(name, elapsed)
+        if histogram is not None:
+            histogram.observe(elapsed, name)
+
+
+def ingestion_stage(name):
+    """Time one ingestion stage: fetch, dedupe, summarize or insert"""
+    return stage(name, INGESTION_STAGE)
+
+
+def time_query(execute, sql, params, many, context):
+    """Connection execute wrapper counting the queries of the current request"""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(time.perf_counter() - started)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver; see NewsConfig.ready"""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unmatched'
+
+
+class MetricsMiddleware:
+    """Record query, template and serializer time for every request.
+
+    Belongs first in MIDDLEWARE so the totals cover the other middleware.
+    Streaming responses are measured until their headers are ready; work
+    done while the body streams is not included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        route = route_name(request)
+        REQUEST_DURATION.observe(total, route, request.method)
+        REQUEST_QUERIES.observe(timings.queries, route)
+        for name, elapsed in timings.stages.items():
+            REQUEST_STAGE.observe(elapsed, route, name)
+        response['Server-Timing'] = timings.server_timing(total)
+        return response
+
+
+class TimedTemplate:
+    """Wrap a backend template so rendering is recorded as a stage"""
+
+    def __init__(self, template):
+        self.template = template
+
+    @property
+    def origin(self):
+        return self.template.origin
+
+    def render(self, context=None, request=None):
+        with stage('template'):
+            return self.template.render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend reporting render time to the current request"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def metrics_view(request):
+    """Prometheus text exposition of every histogram in this process"""
+    lines = [line for histogram in REGISTRY for line in histogram.collect()]
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
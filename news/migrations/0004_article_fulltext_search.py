@@ -0,0 +1,62 @@
+from django.db import migrations
+
+FTS_COLUMNS = 'title, summary, category, source'
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE news_article_fts USING fts5(
+        {FTS_COLUMNS}, content='news_article', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER news_article_fts_ai AFTER INSERT ON news_article BEGIN
+        INSERT INTO news_article_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.summary, new.category, new.source);
+    END""",
+    f"""CREATE TRIGGER news_article_fts_ad AFTER DELETE ON news_article BEGIN
+        INSERT INTO news_article_fts(news_article_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.summary, old.category, old.source);
+    END""",
+    f"""CREATE TRIGGER news_article_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON news_article BEGIN
+        INSERT INTO news_article_fts(news_article_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.summary, old.category, old.source);
+        INSERT INTO news_article_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.summary, new.category, new.source);
+    END""",
+    "INSERT INTO news_article_fts(news_article_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS news_article_fts_au",
+    "DROP TRIGGER IF EXISTS news_article_fts_ad",
+    "DROP TRIGGER IF EXISTS news_article_fts_ai",
+    "DROP TABLE IF EXISTS news_article_fts",
+]
+
+MYSQL_FORWARD = [
+    f"CREATE FULLTEXT INDEX news_article_fulltext ON news_article ({FTS_COLUMNS})",
+]
+
+MYSQL_BACKWARD = [
+    "DROP INDEX news_article_fulltext ON news_article",
+]
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements.get(vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_article_extended_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({'sqlite': SQLITE_FORWARD, 'mysql': MYSQL_FORWARD}),
+            run_statements({'sqlite': SQLITE_BACKWARD, 'mysql': MYSQL_BACKWARD}),
+        ),
+    ]
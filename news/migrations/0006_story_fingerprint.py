@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-18 09:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryFingerprint',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='news.article')),
+                ('signature', models.BinaryField()),
+                ('band0', models.IntegerField()),
+                ('band1', models.IntegerField()),
+                ('band2', models.IntegerField()),
+                ('band3', models.IntegerField()),
+                ('band4', models.IntegerField()),
+                ('band5', models.IntegerField()),
+                ('band6', models.IntegerField()),
+                ('band7', models.IntegerField()),
+                ('cluster_id', models.BigIntegerField()),
+                ('published_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band0', 'published_at'], name='news_story_band0_idx'), models.Index(fields=['band1', 'published_at'], name='news_story_band1_idx'), models.Index(fields=['band2', 'published_at'], name='news_story_band2_idx'), models.Index(fields=['band3', 'published_at'], name='news_story_band3_idx'), models.Index(fields=['band4', 'published_at'], name='news_story_band4_idx'), models.Index(fields=['band5', 'published_at'], name='news_story_band5_idx'), models.Index(fields=['band6', 'published_at'], name='news_story_band6_idx'), models.Index(fields=['band7', 'published_at'], name='news_story_band7_idx'), models.Index(fields=['cluster_id'], name='news_story_cluster_idx')],
+            },
+        ),
+    ]
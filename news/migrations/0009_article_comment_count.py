@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Article = apps.get_model('news', 'Article')
+    Comment = apps.get_model('news', 'Comment')
+    Article.objects.using(schema_editor.connection.alias).update(comment_count=Coalesce(Subquery(
+        Comment.objects.filter(article=OuterRef('pk'))
+        .order_by().values('article').annotate(count=Count('id')).values('count')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_archived_article'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
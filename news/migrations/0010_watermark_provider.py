@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_article_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionwatermark',
+            name='provider',
+            field=models.CharField(default='mediastack', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='ingestionwatermark',
+            name='category',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name='ingestionwatermark',
+            constraint=models.UniqueConstraint(fields=('provider', 'category'), name='news_watermark_provider_cat_uniq'),
+        ),
+    ]
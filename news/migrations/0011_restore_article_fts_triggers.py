@@ -0,0 +1,16 @@
+from django.db import migrations
+
+from ._fts import restore_triggers
+
+
+class Migration(migrations.Migration):
+    # SQLite rebuilt news_article to add comment_count (0009), dropping the
+    # FTS5 triggers; recreate them and reindex
+
+    dependencies = [
+        ('news', '0010_watermark_provider'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+from ._fts import restore_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0011_restore_article_fts_triggers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['updated_at'], name='news_article_updated_idx'),
+        ),
+        # Adding the column rebuilds news_article on SQLite
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
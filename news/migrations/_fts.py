@@ -0,0 +1,31 @@
+"""SQLite triggers keeping the FTS5 table from 0004 in sync with news_article.
+
+SQLite rebuilds news_article for most column changes, which drops its
+triggers; migrations that alter the table run ``restore_triggers`` after.
+Not a migration itself: the loader skips modules starting with "_".
+"""
+FTS_COLUMNS = 'title, summary, category, source'
+
+SQLITE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS news_article_fts_ai AFTER INSERT ON news_article BEGIN
+        INSERT INTO news_article_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.summary, new.category, new.source);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS news_article_fts_ad AFTER DELETE ON news_article BEGIN
+        INSERT INTO news_article_fts(news_article_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.summary, old.category, old.source);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS news_article_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON news_article BEGIN
+        INSERT INTO news_article_fts(news_article_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.summary, old.category, old.source);
+        INSERT INTO news_article_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.summary, new.category, new.source);
+    END""",
+    "INSERT INTO news_article_fts(news_article_fts) VALUES ('rebuild')",
+]
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_TRIGGERS:
+            schema_editor.execute(statement)
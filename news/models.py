@@ -17,9 +17,21 @@ class Article(models.Model):
         help_text="A comprehensive summary between 300-500 words",
         blank=True
     )
+    # Maintained by news.counters; may lag new comments by a flush interval
+    comment_count = models.IntegerField(default=0)
+    # Bumped by every write, including queryset updates; drives the ETags
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-published_at']
+        indexes = [
+            # Home page and API list, newest first
+            models.Index(fields=['published_at', 'id'], name='news_article_published_idx'),
+            # Same, filtered by category
+            models.Index(fields=['category', 'published_at', 'id'], name='news_article_cat_pub_idx'),
+            # Content version for conditional GETs
+            models.Index(fields=['updated_at'], name='news_article_updated_idx'),
+        ]
         
     def __str__(self):
         return self.title
@@ -29,9 +41,78 @@ class Comment(models.Model):
     content = models.TextField()
     username = models.CharField(max_length=50, default='Anonymous')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by edits as well as creation; drives the ETags
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Comments of one article, newest first
+            models.Index(fields=['article', 'created_at', 'id'], name='news_comment_art_created_idx'),
+            # Content version for conditional GETs, overall and per article
+            models.Index(fields=['updated_at'], name='news_comment_updated_idx'),
+            models.Index(fields=['article', 'updated_at'], name='news_comment_art_updated_idx'),
+        ]
         
     def __str__(self):
-        return f"Comment by {self.username} on {self.article.title}"
\ No newline at end of file
+        return f"Comment by {self.username} on {self.article.title}"
+
+class StoryFingerprint(models.Model):
+    """MinHash signature of an article's title and summary, banded for near-duplicate lookups"""
+    article = models.OneToOneField(
+        Article, primary_key=True, related_name='fingerprint', on_delete=models.CASCADE
+    )
+    signature = models.BinaryField()
+    band0 = models.IntegerField()
+    band1 = models.IntegerField()
+    band2 = models.IntegerField()
+    band3 = models.IntegerField()
+    band4 = models.IntegerField()
+    band5 = models.IntegerField()
+    band6 = models.IntegerField()
+    band7 = models.IntegerField()
+    # Id of the first article seen for this story; equal to article_id for that one
+    cluster_id = models.BigIntegerField()
+    published_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Candidate lookups by band within the recency window
+            *[models.Index(fields=[f'band{band}', 'published_at'], name=f'news_story_band{band}_idx')
+              for band in range(8)],
+            models.Index(fields=['cluster_id'], name='news_story_cluster_idx'),
+        ]
+
+    def __str__(self):
+        return f"Fingerprint of article {self.article_id} in cluster {self.cluster_id}"
+
+
+class IngestionWatermark(models.Model):
+    """Newest ``published_at`` ingested per provider and category; fetches stop paging there"""
+    provider = models.CharField(max_length=20, default='mediastack')
+    category = models.CharField(max_length=50)
+    last_published_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'category'], name='news_watermark_provider_cat_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.provider}/{self.category} up to {self.last_published_at}"
+
+
+class ArchivedArticle(models.Model):
+    """Where an archived article lives in the cold segment files"""
+    id = models.BigIntegerField(primary_key=True)
+    url = models.URLField(db_index=True)
+    published_at = models.DateTimeField()
+    segment = models.CharField(max_length=255)
+    # Byte range of the gzip block holding the article within the segment
+    offset = models.BigIntegerField()
+    length = models.IntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Article {self.id} in {self.segment}"
@@ -0,0 +1,37 @@
+import functools
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def get_sentence_tokenizer():
+    """Load the Punkt sentence tokenizer once per process.
+
+    The model is read from the pre-provisioned ``NLTK_DATA`` directory and
+    never downloaded at runtime. If it is missing we fall back to an
+    untrained Punkt tokenizer, which still splits on sentence punctuation.
+    """
+    # Deferred so that importing the views doesn't pay for importing nltk
+    import nltk
+    from nltk.tokenize.punkt import PunktSentenceTokenizer, PunktTokenizer
+
+    data_dir = str(settings.NLTK_DATA)
+    if data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+    try:
+        return PunktTokenizer(settings.NLTK_PUNKT_LANGUAGE)
+    except LookupError:
+        logger.warning(
+            f"Punkt model not found in {data_dir}; using an untrained tokenizer. "
+            f"Provision it with: python -m nltk.downloader -d {data_dir} punkt_tab"
+        )
+        return PunktSentenceTokenizer()
+
+
+def sent_tokenize(text):
+    """Split text into sentences with the cached tokenizer"""
+    return get_sentence_tokenizer().tokenize(text)
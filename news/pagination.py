@@ -0,0 +1,198 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination keyed on a (timestamp, id) pair, newest first.
+
+    Unlike DRF's CursorPagination, which keys on the first ordering field and
+    falls back to OFFSET within ties, both columns are part of the cursor, so
+    every page is an index range scan no matter how deep the client goes.
+    """
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    ordering = ('-published_at', '-id')
+
+    @property
+    def field(self):
+        return self.ordering[0].lstrip('-')
+
+    @property
+    def pk_field(self):
+        return self.ordering[1].lstrip('-')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """Async variant for views using the async ORM"""
+        return self.set_page([item async for item in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """The sliced queryset for the requested page, plus one extra row"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size_requested = self.get_page_size(request)
+        field, pk_field = self.field, self.pk_field
+
+        self.cursor = cursor = self.decode_cursor(request)
+        self.reverse = reverse = bool(cursor and cursor[2])
+        if reverse:
+            queryset = queryset.order_by(field, pk_field)
+        else:
+            queryset = queryset.order_by(f'-{field}', f'-{pk_field}')
+
+        if cursor:
+            value, pk, _ = cursor
+            lookup = 'gt' if reverse else 'lt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{lookup}': value}) |
+                Q(**{field: value, f'{pk_field}__{lookup}': pk})
+            )
+        return queryset[:self.page_size_requested + 1]
+
+    def set_page(self, results):
+        page_size = self.page_size_requested
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.page = results
+        return results
+
+    @staticmethod
+    def query_params(request):
+        # Plain Django requests, as seen by the async views, have no query_params
+        return getattr(request, 'query_params', request.GET)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(self.query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        return self.decode_position(self.query_params(request).get(self.cursor_query_param))
+
+    def decode_position(self, encoded):
+        if not encoded:
+            return None
+        try:
+            value, pk, reverse = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            value = parse_datetime(value)
+            if value is None:
+                raise ValueError(encoded)
+            return value, int(pk), bool(reverse)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_position(self, item, reverse=False):
+        position = [getattr(item, self.field).isoformat(), getattr(item, self.pk_field), int(reverse)]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def encode_cursor(self, item, reverse):
+        encoded = self.encode_position(item, reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Walked backwards past the start; the first page has no cursor
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+class ArticleCursorPagination(KeysetPagination):
+    """Keyset pagination on (published_at, id), constant cost at any depth"""
+    ordering = ('-published_at', '-id')
+
+
+class CommentCursorPagination(KeysetPagination):
+    """Comment history, newest first, plus incremental polling.
+
+    Every response carries a ``since`` token for the newest comment the
+    client has seen. Passing it back as ``?since=`` returns only comments
+    posted after it, oldest first, so a poll costs O(new comments).
+    """
+    page_size = 20
+    since_query_param = 'since'
+    ordering = ('-created_at', '-id')
+
+    def page_queryset(self, queryset, request):
+        self.since = self.query_params(request).get(self.since_query_param)
+        if not self.since:
+            return super().page_queryset(queryset, request)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size_requested = self.get_page_size(request)
+        queryset = self.newer_than(queryset, self.decode_position(self.since))
+        return queryset[:self.page_size_requested + 1]
+
+    def set_page(self, results):
+        if not self.since:
+            return super().set_page(results)
+
+        page_size = self.page_size_requested
+        self.has_more = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def newer_than(self, queryset, position):
+        """Items after ``position``, oldest first"""
+        value, pk, _ = position
+        return queryset.filter(
+            Q(**{f'{self.field}__gt': value}) |
+            Q(**{self.field: value, f'{self.pk_field}__gt': pk})
+        ).order_by(self.field, self.pk_field)
+
+    def get_since_token(self):
+        if self.since:
+            # Polling: results are oldest first
+            return self.encode_position(self.page[-1]) if self.page else self.since
+        if self.page and not self.decode_cursor(self.request):
+            # First history page: results are newest first
+            return self.encode_position(self.page[0])
+        return None
+
+    def get_paginated_data(self, data):
+        if self.since:
+            return {
+                'since': self.get_since_token(),
+                'has_more': self.has_more,
+                'results': data,
+            }
+        paginated = super().get_paginated_data(data)
+        paginated['since'] = self.get_since_token()
+        return paginated
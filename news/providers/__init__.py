@@ -0,0 +1,46 @@
+"""News sources for ingestion.
+
+Each provider turns its API's response into the same article ``record``
+and runs behind its own token bucket (``NEWS_PROVIDER_LIMITS``) with
+retries and backoff. ``NEWS_PROVIDERS`` lists the ones ``/fetch/`` uses.
+Adding a source means subclassing ``Provider`` and registering it in
+``PROVIDERS``.
+"""
+import logging
+
+from django.conf import settings
+
+from .base import Provider, ProviderError, RetryableError, record
+from .mediastack import MediaStackProvider
+from .newsapi import NewsAPIProvider
+from .ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = {provider.name: provider for provider in [MediaStackProvider, NewsAPIProvider]}
+
+__all__ = [
+    'PROVIDERS', 'MediaStackProvider', 'NewsAPIProvider', 'Provider', 'ProviderError',
+    'RetryableError', 'TokenBucket', 'configured_providers', 'record',
+]
+
+
+def configured_providers(names=None, **kwargs):
+    """Instances of the providers in ``NEWS_PROVIDERS``.
+
+    A misconfigured provider is logged and left out so the others still
+    run; ValueError is raised only when none is usable.
+    """
+    providers = []
+    errors = []
+    for name in names or settings.NEWS_PROVIDERS:
+        try:
+            if name not in PROVIDERS:
+                raise ValueError(f"Unknown news provider: {name}")
+            providers.append(PROVIDERS[name](**kwargs))
+        except ValueError as e:
+            logger.error(f"Configuration error: {str(e)}")
+            errors.append(str(e))
+    if not providers:
+        raise ValueError(' '.join(errors) or "No news providers are configured.")
+    return providers
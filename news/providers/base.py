@@ -0,0 +1,151 @@
+import logging
+import random
+import time
+
+import requests
+from django.conf import settings
+
+from ..ingestion import CATEGORIES, CategoryResult
+from ..dates import parse_timestamp
+from .ratelimit import bucket
+
+logger = logging.getLogger(__name__)
+
+# Longest Retry-After we are prepared to honour within a run
+MAX_RETRY_AFTER = 60
+
+
+class ProviderError(Exception):
+    pass
+
+
+class RetryableError(ProviderError):
+    """A failure worth retrying: throttling, server errors, network trouble"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def record(title='', url='', description='', content='', source='', author='', image='',
+           country='', published_at=None):
+    """The article shape every provider normalizes to, as read by ingestion"""
+    return {
+        'title': title or '', 'url': url or '', 'description': description or '',
+        'content': content or '', 'source': source or '', 'author': author or '',
+        'image': image or '', 'country': country or '', 'published_at': parse_timestamp(published_at),
+    }
+
+
+class Provider:
+    """A news API fetched category by category, newest first.
+
+    Subclasses set ``name`` and implement ``fetch_page`` and ``normalize``.
+    Every request goes through ``get``, which waits for the provider's token
+    bucket and retries throttled or failed requests with exponential backoff,
+    without sleeping past the run's deadline.
+    """
+    name = None
+    categories = CATEGORIES
+    # Requests per second and burst size, overridden by NEWS_PROVIDER_LIMITS
+    rate = 1.0
+    burst = 1
+
+    def __init__(self, session=None, timeout=None, page_size=None, max_pages=None,
+                 retries=None, backoff=None):
+        self.session = session or requests.Session()
+        self.timeout = timeout or settings.NEWS_FETCH_TIMEOUT
+        self.page_size = page_size or settings.NEWS_FETCH_PAGE_SIZE
+        self.max_pages = max_pages or settings.NEWS_FETCH_MAX_PAGES
+        self.retries = settings.NEWS_FETCH_RETRIES if retries is None else retries
+        self.backoff = settings.NEWS_FETCH_BACKOFF if backoff is None else backoff
+        limits = settings.NEWS_PROVIDER_LIMITS.get(self.name, {})
+        self.limiter = bucket(self.name, limits.get('rate', self.rate), limits.get('burst', self.burst))
+        self.deadline = None
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+    def fetch_page(self, category, page):
+        """Raw articles of ``page`` (0-based) of ``category``, newest first"""
+        raise NotImplementedError
+
+    def normalize(self, article):
+        """One raw article as a ``record``, or None to drop it"""
+        raise NotImplementedError
+
+    def remaining(self):
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def get(self, url, **kwargs):
+        """GET ``url`` within the rate limit, retrying; returns the parsed payload"""
+        for attempt in range(self.retries + 1):
+            if not self.limiter.acquire(timeout=self.remaining()):
+                raise ProviderError(f"{self.name} rate limit leaves no time before the deadline")
+            try:
+                return self.parse(self.session.get(url, timeout=self.timeout, **kwargs))
+            except requests.RequestException as e:
+                error = RetryableError(str(e))
+            except RetryableError as e:
+                error = e
+
+            if attempt == self.retries:
+                raise ProviderError(f"{error} (after {attempt + 1} attempts)")
+            delay = error.retry_after
+            if delay is None or delay > MAX_RETRY_AFTER:
+                delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+            remaining = self.remaining()
+            if remaining is not None and delay >= remaining:
+                raise ProviderError(f"{error} (no time left to retry)")
+            logger.warning(f"{self.name}: {error}; retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+    def parse(self, response):
+        """JSON payload of a response, raising RetryableError when retrying may help"""
+        self.check_status(response)
+        return response.json()
+
+    def check_status(self, response):
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get('Retry-After')
+            raise RetryableError(
+                f"HTTP {response.status_code} from {self.name}",
+                float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            raise ProviderError(str(e))
+
+    def fetch_category(self, category, watermark=None):
+        """Fetch one category down to ``watermark``, never raising.
+
+        Without a watermark only the first page is read. Errors are kept on
+        the result along with the articles of the pages fetched before the
+        failure.
+        """
+        result = CategoryResult(category, self.name)
+        started = time.perf_counter()
+        max_pages = self.max_pages if watermark else 1
+        try:
+            while result.pages < max_pages:
+                page = self.fetch_page(category, result.pages)
+                result.pages += 1
+                articles = [article for article in map(self.normalize, page) if article]
+                # Articles published in the watermark's second may be new;
+                # the url check drops the ones already stored
+                fresh = [article for article in articles
+                         if watermark is None or (article['published_at'] or watermark) >= watermark]
+                result.articles.extend(fresh)
+                if len(fresh) < len(articles) or len(page) < self.page_size:
+                    break
+            else:
+                if watermark:
+                    logger.warning(f"{self.name}/{category}: watermark not reached after "
+                                   f"{result.pages} pages; older articles are skipped")
+        except (ProviderError, ValueError) as e:
+            result.error = str(e)
+            logger.error(f"API request error for {self.name}/{category}: {str(e)}")
+        finally:
+            result.elapsed = time.perf_counter() - started
+        return result
@@ -0,0 +1,51 @@
+from django.conf import settings
+
+from .base import Provider, ProviderError, RetryableError, record
+
+# API error codes worth retrying
+RETRYABLE_ERRORS = {'rate_limit_reached', 'internal_error'}
+
+
+class MediaStackProvider(Provider):
+    """``api.mediastack.com/v1/news``, paged with ``offset``"""
+    name = 'mediastack'
+    rate = 5.0
+    burst = 7
+
+    def __init__(self, api_key=None, base_url=None, **kwargs):
+        self.api_key = api_key or settings.MEDIASTACK_API_KEY
+        if not self.api_key:
+            raise ValueError("MEDIASTACK_API_KEY is not configured.")
+        self.base_url = base_url or settings.MEDIASTACK_URL
+        super().__init__(**kwargs)
+
+    def build_params(self, category, page=0):
+        return {
+            'access_key': self.api_key,
+            'categories': category,
+            'languages': 'en',
+            'limit': self.page_size,
+            'offset': page * self.page_size,
+            'sort': 'published_desc'
+        }
+
+    def fetch_page(self, category, page):
+        return self.get(self.base_url, params=self.build_params(category, page))
+
+    def parse(self, response):
+        news_data = super().parse(response)
+        error = news_data.get('error')
+        if error:
+            message = f"API error: {error.get('message')}"
+            # Throttling may come back as a 200 with an error body
+            if error.get('code') in RETRYABLE_ERRORS:
+                raise RetryableError(message)
+            raise ProviderError(message)
+        return news_data.get('data', [])
+
+    def normalize(self, article):
+        return record(
+            title=article.get('title'), url=article.get('url'), description=article.get('description'),
+            source=article.get('source'), author=article.get('author'), image=article.get('image'),
+            country=article.get('country'), published_at=article.get('published_at'),
+        )
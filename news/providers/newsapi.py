@@ -0,0 +1,65 @@
+import re
+
+from django.conf import settings
+
+from .base import Provider, ProviderError, RetryableError, record
+
+RETRYABLE_ERRORS = {'rateLimited', 'unexpectedError'}
+
+# NewsAPI truncates content to ~200 characters and appends "[+1234 chars]"
+TRUNCATION_RE = re.compile(r'\s*(?:…|\.\.\.)?\s*\[\+\d+ chars\]$')
+
+# Placeholder NewsAPI returns for articles taken down by the publisher
+REMOVED = '[Removed]'
+
+
+class NewsAPIProvider(Provider):
+    """``newsapi.org/v2/top-headlines``, paged with ``page``"""
+    name = 'newsapi'
+    rate = 1.0
+    burst = 7
+
+    def __init__(self, api_key=None, base_url=None, country=None, **kwargs):
+        self.api_key = api_key or settings.NEWSAPI_API_KEY
+        if not self.api_key:
+            raise ValueError("NEWSAPI_API_KEY is not configured.")
+        self.base_url = base_url or settings.NEWSAPI_URL
+        self.country = country or settings.NEWSAPI_COUNTRY
+        super().__init__(**kwargs)
+
+    def build_params(self, category, page=0):
+        return {
+            'category': category,
+            'country': self.country,
+            'pageSize': self.page_size,
+            'page': page + 1,
+        }
+
+    def fetch_page(self, category, page):
+        return self.get(self.base_url, params=self.build_params(category, page),
+                        headers={'X-Api-Key': self.api_key})
+
+    def parse(self, response):
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        if payload.get('status') == 'error' and response.status_code != 429 and response.status_code < 500:
+            message = f"API error: {payload.get('message')}"
+            if payload.get('code') in RETRYABLE_ERRORS:
+                raise RetryableError(message)
+            raise ProviderError(message)
+        self.check_status(response)
+        if 'articles' not in payload:
+            raise ProviderError(f"Unexpected response from {self.name}")
+        return payload['articles']
+
+    def normalize(self, article):
+        if article.get('title') == REMOVED:
+            return None
+        return record(
+            title=article.get('title'), url=article.get('url'), description=article.get('description'),
+            content=TRUNCATION_RE.sub('', article.get('content') or ''),
+            source=(article.get('source') or {}).get('name'), author=article.get('author'),
+            image=article.get('urlToImage'), country=self.country, published_at=article.get('publishedAt'),
+        )
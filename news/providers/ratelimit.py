@@ -0,0 +1,48 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Allow ``rate`` requests per second on average, in bursts of up to ``burst``.
+
+    Shared by every thread fetching from the same provider.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, returning how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, timeout=None):
+        """Wait for a token; False, without taking one, if that takes longer than ``timeout``"""
+        wait = self.reserve()
+        if timeout is not None and wait > timeout:
+            with self._lock:
+                self.tokens += 1
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket(name, rate, burst):
+    """The process-wide bucket of provider ``name``, so quotas hold across runs"""
+    with _buckets_lock:
+        if name not in _buckets or (_buckets[name].rate, _buckets[name].burst) != (rate, max(burst, 1)):
+            _buckets[name] = TokenBucket(rate, burst)
+        return _buckets[name]
@@ -0,0 +1,189 @@
+"""Send reads to replicas and writes, plus reads that must see them, to the primary.
+
+Reads go to a random healthy alias of ``DATABASE_REPLICAS``. A request is
+pinned to the primary when:
+
+- it uses an unsafe method, such as posting a comment;
+- the same client wrote within the last ``NEWS_REPLICA_PIN_SECONDS``, so
+  reloading a page after posting shows the new comment;
+- its view is wrapped in ``use_primary``, as ``fetch_news`` is;
+- it has already written, so ingestion's lookups see its own inserts.
+
+Outside requests, as in management commands and background workers, the
+last rule applies to each thread: once it writes, its own later reads stay
+on the primary, while other threads keep reading from replicas.
+
+Replicas are probed at most every ``NEWS_REPLICA_CHECK_INTERVAL`` seconds.
+A replica that errors, or lags by more than ``NEWS_REPLICA_MAX_LAG`` seconds
+on MySQL, gets no reads until it passes a later probe.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'news_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = ContextVar('news_db_routing', default=None)
+
+
+class _ThreadState(threading.local):
+    """Routing state for code running outside a request, one per thread"""
+
+    def __init__(self):
+        self.routing = {'pinned': False}
+
+
+_thread_state = _ThreadState()
+
+
+def routing_state():
+    return _state.get() or _thread_state.routing
+
+
+def pin_primary():
+    """Keep the rest of the current request, or thread, on the primary"""
+    routing_state()['pinned'] = True
+
+
+class use_primary(ContextDecorator):
+    """Route reads in the block or decorated view to the primary"""
+
+    def __enter__(self):
+        state = routing_state()
+        self.previous = state['pinned']
+        state['pinned'] = True
+        return self
+
+    def __exit__(self, *exc_info):
+        routing_state()['pinned'] = self.previous
+
+
+class ReplicaHealth:
+    """Cached result of the last probe of each replica"""
+
+    def __init__(self):
+        self._status = {}
+        self._lock = threading.Lock()
+
+    def healthy(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            status = self._status.get(alias)
+        if status and now - status[1] < settings.NEWS_REPLICA_CHECK_INTERVAL:
+            return status[0]
+
+        healthy = self.check(alias)
+        with self._lock:
+            self._status[alias] = (healthy, now)
+        if not healthy:
+            logger.warning(f"Replica {alias} failed its health check; reading from the primary")
+        return healthy
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                if connection.vendor == 'mysql':
+                    lag = self.replication_lag(cursor)
+                    return lag is None or lag <= settings.NEWS_REPLICA_MAX_LAG
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            return True
+        except DatabaseError as e:
+            logger.error(f"Replica {alias} is unreachable: {str(e)}")
+            return False
+
+    @staticmethod
+    def replication_lag(cursor):
+        """Seconds behind the source, or None when unknown"""
+        for statement, column in (('SHOW REPLICA STATUS', 'Seconds_Behind_Source'),
+                                  ('SHOW SLAVE STATUS', 'Seconds_Behind_Master')):
+            try:
+                cursor.execute(statement)
+            except DatabaseError:
+                continue
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            columns = [description[0] for description in cursor.description]
+            lag = dict(zip(columns, row)).get(column)
+            # NULL while replication is stopped
+            return float('inf') if lag is None else lag
+        return None
+
+    def reset(self):
+        with self._lock:
+            self._status.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if routing_state()['pinned']:
+            return DEFAULT_DB_ALIAS
+        replicas = [alias for alias in settings.DATABASE_REPLICAS if replica_health.healthy(alias)]
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+
+class PrimaryPinningMiddleware:
+    """Pin writes, and a client's requests shortly after its writes, to the primary"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = self.start(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response)
+
+    @staticmethod
+    def start(request):
+        return {'pinned': request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES}
+
+    @staticmethod
+    def finish(request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.NEWS_REPLICA_PIN_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,99 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.pagination import PageNumberPagination
+
+# Columns covered by the FULLTEXT index (MySQL) and the FTS5 table (SQLite)
+SEARCH_COLUMNS = ['title', 'summary', 'category', 'source']
+
+# Relative weight of each column when ranking SQLite matches with bm25()
+FTS_WEIGHTS = [10.0, 1.0, 2.0, 2.0]
+
+FTS_TABLE = 'news_article_fts'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_tokens(terms):
+    return TOKEN_RE.findall(terms)
+
+
+def fts5_query(tokens):
+    """Quote each word so user input can't inject FTS5 query syntax"""
+    return ' '.join(f'"{token}"' for token in tokens)
+
+
+def boolean_query(tokens):
+    """MySQL boolean-mode query requiring every word"""
+    return ' '.join(f'+{token}' for token in tokens)
+
+
+def search_articles(queryset, terms):
+    """Filter articles matching every word of ``terms``, ranked by relevance then recency.
+
+    Uses the FULLTEXT index on MySQL and the FTS5 table on SQLite. Other
+    backends fall back to the unindexed ``icontains`` scan. All three
+    require every word to match.
+    """
+    table = queryset.model._meta.db_table
+    vendor = connections[queryset.db].vendor
+    tokens = search_tokens(terms)
+    if not tokens:
+        return queryset.none()
+
+    if vendor == 'mysql':
+        columns = ', '.join(f'`{table}`.`{column}`' for column in SEARCH_COLUMNS)
+        # Boolean mode selects rows containing every word; the natural
+        # language score of the same words ranks them
+        matches = RawSQL(f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)", [boolean_query(tokens)])
+        relevance = RawSQL(f"MATCH ({columns}) AGAINST (%s IN NATURAL LANGUAGE MODE)", [' '.join(tokens)])
+        return (queryset.alias(matches=matches)
+                .filter(matches__gt=0)
+                .annotate(relevance=relevance)
+                .order_by('-relevance', '-published_at', '-id'))
+
+    if vendor == 'sqlite':
+        query = fts5_query(tokens)
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        matches = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [query])
+        # bm25() is negative, more negative being a better match; the rowid
+        # constraint makes it a lookup of the one matching row
+        relevance = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = "{table}"."id"', [query]
+        )
+        return (queryset.filter(id__in=matches)
+                .annotate(relevance=relevance)
+                .order_by('-relevance', '-published_at', '-id'))
+
+    condition = Q()
+    for token in tokens:
+        token_condition = Q()
+        for column in SEARCH_COLUMNS:
+            token_condition |= Q(**{f'{column}__icontains': token})
+        condition &= token_condition
+    return queryset.filter(condition).order_by('-published_at', '-id')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Drop-in replacement for SearchFilter backed by the full-text index"""
+    search_param = 'search'
+
+    def get_search_terms(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search_articles(queryset, terms)
+
+
+class SearchResultsPagination(PageNumberPagination):
+    """Page through relevance-ranked results, which have no stable keyset"""
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
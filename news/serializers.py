@@ -1,27 +1,54 @@
 from rest_framework import serializers
+from .metrics import stage
 from .models import Article, Comment
 
-class CommentSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """Report serialization time to the current request's Server-Timing"""
+
+    def to_representation(self, instance):
+        with stage('serialize'):
+            return super().to_representation(instance)
+
+class SparseFieldsetsMixin:
+    """Limit output to the comma separated ``?fields=`` query parameter"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = requested_fields(self.context.get('request'))
+        if requested:
+            unknown = requested - set(self.fields)
+            if unknown:
+                raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+def requested_fields(request):
+    """Return the set of field names asked for with ``?fields=``, if any"""
+    if request is None:
+        return None
+    fields = request.query_params.get('fields', '')
+    return {name.strip() for name in fields.split(',') if name.strip()} or None
+
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'content', 'username', 'created_at']
 
-class ArticleSerializer(serializers.ModelSerializer):
-    comments = CommentSerializer(many=True, read_only=True)
-    
+class ArticleListSerializer(TimedSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
+    """Lean representation for list pages: a comment count, no heavy text"""
+
     class Meta:
         model = Article
-        fields = ['id', 'title', 'url', 'source', 'category', 
-                 'summary', 'published_at', 'author', 'image', 'country', 'comments']
-        from rest_framework import serializers
-from .models import Article
+        fields = ['id', 'title', 'url', 'source', 'category',
+                 'summary', 'published_at', 'author', 'image', 'country', 'comment_count']
+        read_only_fields = ['comment_count']
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(TimedSerializerMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     comments = CommentSerializer(many=True, read_only=True)
-    
+
     class Meta:
         model = Article
-        fields = ['id', 'title', 'url', 'source', 'category', 
-                 'summary', 'extended_summary', 'published_at', 
+        fields = ['id', 'title', 'url', 'source', 'category',
+                 'summary', 'extended_summary', 'published_at',
                  'author', 'image', 'country', 'comments']
         read_only_fields = ['published_at']
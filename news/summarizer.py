@@ -0,0 +1,187 @@
+"""Extractive summaries for whole ingestion batches.
+
+Each text is split into sentences, which are weighted by TF-IDF (treating
+each sentence of the text as a document) and ranked by TextRank: a PageRank
+over the cosine similarity graph between the text's sentences, so sentences
+that share the most vocabulary with the rest of the text score highest. The best sentences are then taken, in their original
+order, until the summary reaches ``MIN_WORDS`` without going over
+``MAX_WORDS``.
+
+Texts that already fit in ``MIN_WORDS`` are kept whole. The rest are ranked
+together: their term weights are computed in one pass over the whole batch,
+and their power iterations run as NumPy computations over stacks of padded
+similarity matrices. Texts are stacked with others of similar sentence
+count, at most ``MAX_CELLS`` matrix entries at a time, and only their first
+``MAX_SENTENCES`` sentences are ranked, so one long page can't inflate the
+memory needed for the whole batch. A text's summary doesn't depend on the
+rest of its batch.
+"""
+import itertools
+import re
+
+from .nlp import sent_tokenize
+
+MIN_WORDS = 300
+MAX_WORDS = 500
+
+# Sentences ranked per text; later ones are never picked
+MAX_SENTENCES = 200
+# Padded similarity entries ranked at once, 8 bytes each
+MAX_CELLS = 4_000_000
+
+DAMPING = 0.85
+ITERATIONS = 50
+TOLERANCE = 1e-6
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have he her his i in is it its "
+    "not of on or said she that the their them they this to was were which who will "
+    "with would you".split()
+)
+
+
+def word_count(sentence):
+    return len(sentence.split())
+
+
+def summarize(text, min_words=MIN_WORDS, max_words=MAX_WORDS):
+    return summarize_batch([text], min_words, max_words)[0]
+
+
+def summarize_batch(texts, min_words=MIN_WORDS, max_words=MAX_WORDS):
+    """Return one extractive summary per text, in order"""
+    documents = [sent_tokenize(text)[:MAX_SENTENCES] for text in texts]
+    lengths = [[word_count(sentence) for sentence in sentences] for sentences in documents]
+    summaries = [' '.join(sentences) for sentences in documents]
+
+    ranked = [i for i, counts in enumerate(lengths) if sum(counts) > min_words]
+    if not ranked:
+        return summaries
+
+    scores = sentence_scores([documents[i] for i in ranked])
+    for i, score in zip(ranked, scores):
+        chosen = select(score, lengths[i], min_words, max_words)
+        summaries[i] = ' '.join(documents[i][j] for j in chosen)
+    return summaries
+
+
+def sentence_scores(documents):
+    """TextRank score of every sentence, one array per document"""
+    # Deferred so that importing the views doesn't load NumPy
+    import numpy as np
+
+    all_words = []
+    sizes = []
+    for sentences in documents:
+        for sentence in sentences:
+            words = TOKEN_RE.findall(sentence.lower())
+            all_words.extend(words)
+            sizes.append(len(words))
+    # Word ids are unique but sparse: the counter advances on every token.
+    # Stopwords hold the first ids.
+    vocabulary = {word: index for index, word in enumerate(STOPWORDS)}
+    ids = np.fromiter(map(vocabulary.setdefault, all_words, itertools.count(len(vocabulary))),
+                      dtype=np.int64, count=len(all_words))
+    sentence_of = np.repeat(np.arange(len(sizes)), sizes)
+    keep = ids >= len(STOPWORDS)
+    ids, sentence_of = ids[keep], sentence_of[keep]
+
+    # (sentence, word) pairs with their term frequency, ordered by sentence
+    width = int(ids.max()) + 1 if len(ids) else 1
+    pairs, tf = np.unique(sentence_of * width + ids, return_counts=True)
+    rows, words = np.divmod(pairs, width)
+
+    # Inverse document frequency of each word among its own text's sentences
+    counts = np.array([len(sentences) for sentences in documents])
+    first = np.concatenate(([0], np.cumsum(counts)))
+    document_of = np.repeat(np.arange(len(documents)), counts)[rows]
+    _, within, df = np.unique(document_of * width + words, return_inverse=True, return_counts=True)
+    weights = tf * (np.log((1 + counts[document_of]) / (1 + df[within])) + 1)
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(sizes)))
+    weights /= norms[rows]
+
+    bounds = np.searchsorted(rows, first)
+    scores = [None] * len(documents)
+    for group in stacks(counts):
+        size = counts[group].max()
+        similarity = np.zeros((len(group), size, size))
+        for slot, d in enumerate(group):
+            start, end = bounds[d], bounds[d + 1]
+            similarity[slot, :counts[d], :counts[d]] = cosine_similarity(
+                rows[start:end] - first[d], words[start:end], weights[start:end], counts[d]
+            )
+        ranked = textrank(similarity, counts[group])
+        for slot, d in enumerate(group):
+            scores[d] = ranked[slot, :counts[d]]
+    return scores
+
+
+def stacks(counts):
+    """Group document indices for ranking, by ascending sentence count.
+
+    A group holds at most ``MAX_CELLS`` padded entries, and no document in
+    it has more than twice the sentences of the first, so padding at most
+    quadruples the entries that are really needed.
+    """
+    group = []
+    for d in sorted(range(len(counts)), key=counts.__getitem__):
+        size = counts[d]
+        if group and (size > 2 * counts[group[0]] or (len(group) + 1) * size * size > MAX_CELLS):
+            yield group
+            group = []
+        group.append(d)
+    if group:
+        yield group
+
+
+def cosine_similarity(rows, words, weights, count):
+    """Pairwise cosine similarity of ``count`` sentences from their normalized TF-IDF entries"""
+    import numpy as np
+
+    local, columns = np.unique(words, return_inverse=True)
+    matrix = np.zeros((count, len(local)))
+    matrix[rows, columns] = weights
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    return similarity
+
+
+def textrank(similarity, counts):
+    """PageRank over a stack of padded similarity matrices.
+
+    ``counts`` is the number of real sentences in each matrix. A sentence
+    sharing no words with the others links to every sentence equally.
+    """
+    import numpy as np
+
+    documents, size, _ = similarity.shape
+    mask = np.arange(size)[None, :] < counts[:, None]
+    uniform = mask / counts[:, None]
+
+    totals = similarity.sum(axis=2, keepdims=True)
+    transition = np.where(totals > 0, similarity / np.where(totals > 0, totals, 1), uniform[:, None, :])
+    transition *= mask[:, :, None]
+
+    scores = uniform
+    for _ in range(ITERATIONS):
+        updated = (1 - DAMPING) * uniform + DAMPING * np.einsum('dij,di->dj', transition, scores)
+        converged = np.abs(updated - scores).max() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def select(scores, lengths, min_words, max_words):
+    """Indices of the best sentences that fit the budget, in text order"""
+    chosen = []
+    total = 0
+    for index in (-scores).argsort(kind='stable'):
+        if total + lengths[index] <= max_words:
+            chosen.append(index)
+            total += lengths[index]
+        if total >= min_words:
+            break
+    return sorted(chosen)
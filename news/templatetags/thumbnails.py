@@ -0,0 +1,21 @@
+from django import template
+
+from news.thumbnails import available_widths, thumbnail_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail(url):
+    """``src`` and ``srcset`` for an article image.
+
+    Falls back to the original URL until its thumbnails have been rendered.
+    """
+    widths = available_widths(url) if url else []
+    if not widths:
+        return {'src': url, 'srcset': ''}
+    return {
+        # Mid-sized fallback for browsers that ignore srcset
+        'src': thumbnail_url(url, widths[len(widths) // 2]),
+        'srcset': ', '.join(f'{thumbnail_url(url, width)} {width}w' for width in widths),
+    }
@@ -1,3 +1,1420 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, router
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from django.utils import timezone
+
+from benchmarks.datagen import sentence
+from benchmarks.stub_server import MediaStackStub
+
+from .counters import CommentCounter, apply_counts
+from .management.commands import generate_extended_summaries
+from .exports import read_records, restore_timestamps
+from .extraction import ContentExtractor, summarize_articles, summarize_quietly
+from . import async_views, routers, summarizer
+from .broker import InProcessBroker, comment_broker, comment_channel
+from .cache import generation
+from .dedupe import build_fingerprint, minhash
+from .ingestion import CATEGORIES, CategoryResult, IngestionEngine
+from .dates import parse_timestamp
+from .models import ArchivedArticle, Article, Comment, IngestionWatermark, StoryFingerprint
+from .providers import MediaStackProvider, NewsAPIProvider, TokenBucket
+from .routers import replica_health, use_primary
+from .summarizer import summarize, summarize_batch
+from .templatetags.thumbnails import thumbnail
+from .thumbnails import (
+    LocalFileFetcher, ThumbnailPipeline, evict, render_batch, thumbnail_path, thumbnail_url
+)
+from .pagination import CommentCursorPagination
+from .serializers import CommentSerializer
+from .views import NewsService, comment_event
+
+
+class QueryPlanTests(TestCase):
+    """Fail when a hot query stops using an index.
+
+    Every SELECT a request issues is run through EXPLAIN. A full table scan
+    or a sort that the index should have made unnecessary (SQLite's temp
+    B-tree, MySQL's filesort) fails the test, so schema or ORM changes can't
+    silently undo the indexes added for these access paths.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.articles = Article.objects.bulk_create([
+            Article(
+                title=f'Election story {i}', url=f'https://example.com/{i}',
+                source='bbc', category=['general', 'business', 'sports'][i % 3],
+                summary='Votes are being counted.', published_at=now - timedelta(minutes=i)
+            )
+            for i in range(100)
+        ])
+        cls.article = Article.objects.order_by('id').first()
+        Comment.objects.bulk_create([
+            Comment(article=cls.article, content=f'Comment {i}') for i in range(5)
+        ])
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return [row[-1] for row in cursor.fetchall()]
+            cursor.execute(f'EXPLAIN {sql}')
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def plan_problems(self, plan, sql, allow_sort=False):
+        # Walking an index is only cheap when a LIMIT stops it early
+        limited = ' LIMIT ' in sql.upper()
+        problems = []
+        for step in plan:
+            if connection.vendor == 'sqlite':
+                if step.startswith('SCAN ') and 'VIRTUAL TABLE' not in step and (
+                        'USING' not in step or not limited):
+                    problems.append(step)
+                if 'USE TEMP B-TREE' in step and not allow_sort:
+                    problems.append(step)
+            elif connection.vendor == 'mysql':
+                if step.get('type') == 'ALL' or (step.get('type') == 'index' and not limited):
+                    problems.append(f"full scan of {step.get('table')}")
+                if 'Using filesort' in (step.get('Extra') or '') and not allow_sort:
+                    problems.append(f"filesort on {step.get('table')}")
+        return problems
+
+    def assert_indexed(self, path, allow_sort=False):
+        # Counts and categories are cached; check the queries of a warm request
+        self.client.get(path)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+            # Drain streamed responses so their queries are captured too
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+
+        selects = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].lstrip().upper().startswith('SELECT')]
+        self.assertTrue(selects, f'{path} issued no queries')
+        for sql in selects:
+            plan = self.explain(sql)
+            problems = self.plan_problems(plan, sql, allow_sort=allow_sort)
+            self.assertFalse(problems, f'{path} query is not indexed:\n{sql}\n{plan}')
+
+    def test_news_list(self):
+        self.assert_indexed('/')
+
+    def test_news_list_by_category(self):
+        self.assert_indexed('/?category=business')
+
+    def test_news_list_deep_page(self):
+        self.assert_indexed('/?page=2&category=general')
+
+    def test_article_api_list(self):
+        self.assert_indexed('/api/articles/')
+
+    def test_article_api_list_by_category(self):
+        self.assert_indexed('/api/articles/?category=sports')
+
+    def test_article_api_next_page(self):
+        first = self.client.get('/api/articles/?page_size=5').json()
+        self.assert_indexed(first['next'])
+
+    def test_article_api_stream(self):
+        self.assert_indexed('/api/articles/?stream=ndjson&category=general')
+
+    def test_article_api_detail(self):
+        self.assert_indexed(f'/api/articles/{self.article.id}/')
+
+    def test_article_api_search(self):
+        # Ranking by relevance needs a sort over the matches
+        self.assert_indexed('/api/articles/?search=election', allow_sort=True)
+
+    def test_article_detail(self):
+        self.assert_indexed(f'/article/{self.article.id}/')
+
+    def test_comments_by_article(self):
+        self.assert_indexed(f'/api/comments/?article_id={self.article.id}')
+
+    def test_comments_since(self):
+        first = self.client.get(f'/api/comments/?article_id={self.article.id}&page_size=2').json()
+        self.assert_indexed(f"/api/comments/?article_id={self.article.id}&since={first['since']}")
+        self.assert_indexed(first['next'])
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.article = Article.objects.create(
+            title='Election story', url='https://example.com/metrics', source='bbc',
+            category='general', summary='Votes are being counted.', published_at=timezone.now()
+        )
+
+    def test_server_timing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/articles/{self.article.id}/')
+        timing = response['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        self.assertIn('serialize;dur=', timing)
+
+    def test_template_timing(self):
+        response = self.client.get('/')
+        self.assertIn('template;dur=', response['Server-Timing'])
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/articles/')
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('# TYPE news_request_duration_seconds histogram', body)
+        self.assertIn('news_request_queries_count{route="article-list"}', body)
+        self.assertIn('news_request_stage_seconds_bucket{route="article-list",stage="db",le="+Inf"}', body)
+
+
+class SparseFieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        Article.objects.bulk_create([
+            Article(title=f'Story {i}', url=f'https://example.com/fields/{i}', source='Wire',
+                    category='general', summary='Summary', extended_summary='Long text. ' * 50,
+                    published_at=now - timedelta(minutes=i))
+            for i in range(12)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_narrows_output(self):
+        response = self.client.get('/api/articles/?fields=title,url')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({tuple(sorted(article)) for article in response.json()['results']}, {('title', 'url')})
+
+    def test_rejects_unknown_fields(self):
+        response = self.client.get('/api/articles/?fields=title,extended_summary,bogus')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('bogus', response.json()['fields'])
+
+    def test_cursor_fields_are_never_deferred(self):
+        # Building the cursors must not load a deferred published_at
+        counts = []
+        for fields in ('', 'title'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f'/api/articles/?fields={fields}&page_size=5')
+            self.assertIsNotNone(response.json()['next'])
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        base = timezone.now()
+        # Three or four rows share each published_at
+        Article.objects.bulk_create([
+            Article(title=f'Tied story {i}', url=f'https://example.com/tied/{i}', source='Wire',
+                    category='general' if i % 4 else 'sports', summary='Summary',
+                    published_at=base - timedelta(minutes=i // 3))
+            for i in range(14)
+        ])
+        cls.expected = list(Article.objects.order_by('-published_at', '-id').values_list('id', flat=True))
+
+    def page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data, [article['id'] for article in data['results']]
+
+    def test_walks_ties_forward_and_back(self):
+        pages = []
+        data, ids = self.page('/api/articles/?page_size=4')
+        self.assertIsNone(data['previous'])
+        pages.append(ids)
+        while data['next']:
+            data, ids = self.page(data['next'])
+            pages.append(ids)
+        self.assertEqual([len(ids) for ids in pages], [4, 4, 4, 2])
+        self.assertEqual([pk for ids in pages for pk in ids], self.expected)
+
+        back = []
+        while data['previous']:
+            data, ids = self.page(data['previous'])
+            back.insert(0, ids)
+        self.assertEqual(back, pages[:-1])
+
+    def test_malformed_cursors_are_not_found(self):
+        bad = base64.urlsafe_b64encode(json.dumps(['yesterday', 1, 0]).encode()).decode()
+        for cursor in ['nonsense', bad, base64.urlsafe_b64encode(b'[1, 2]').decode()]:
+            self.assertEqual(self.client.get('/api/articles/', {'cursor': cursor}).status_code, 404)
+
+    def test_ndjson_stream(self):
+        response = self.client.get('/api/articles/?stream=ndjson&category=general')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.endswith('\n'))
+        lines = body.splitlines()
+        records = [json.loads(line) for line in lines]
+        general = [pk for pk in self.expected if Article.objects.get(id=pk).category == 'general']
+        self.assertEqual([record['id'] for record in records], general)
+        self.assertTrue(all(record['category'] == 'general' and record['title'] for record in records))
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        stories = [
+            ('Harbour bridge reopens', 'Traffic is flowing again.'),
+            ('City council meeting', 'The harbour bridge repairs were discussed.'),
+            ('Harbour festival', 'Boats and music all weekend.'),
+            # Same text as the first, a day older
+            ('Harbour bridge reopens', 'Traffic is flowing again.'),
+        ]
+        Article.objects.bulk_create([
+            Article(title=title, url=f'https://example.com/search/{age}', source='Wire', category='general',
+                    summary=summary, published_at=now - timedelta(days=age))
+            for age, (title, summary) in enumerate(stories)
+        ])
+
+    def search(self, terms):
+        response = self.client.get('/api/articles/', {'search': terms})
+        self.assertEqual(response.status_code, 200)
+        return [int(article['url'].rsplit('/', 1)[1]) for article in response.json()['results']]
+
+    def test_every_word_must_match(self):
+        self.assertEqual(set(self.search('harbour bridge')), {0, 1, 3})
+        self.assertEqual(self.search('harbour weekend'), [2])
+        self.assertEqual(self.search('bridge volcano'), [])
+
+    def test_ranks_title_matches_then_recency(self):
+        self.assertEqual(self.search('harbour bridge'), [0, 3, 1])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('bridge OR "festival'), [])
+        self.assertEqual(self.search('***'), [])
+
+
+class ArticleCountCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.articles = Article.objects.bulk_create([
+            Article(title=f'Story {i}', url=f'https://example.com/counted/{i}', source='Wire',
+                    category='general', summary='Summary', published_at=now - timedelta(days=i * 100))
+            for i in range(45)
+        ])
+
+    def cluster(self, head, copies):
+        StoryFingerprint.objects.bulk_create([
+            build_fingerprint(article, minhash(head.title), head.id) for article in [head, *copies]
+        ])
+
+    @override_settings(NEWS_PAGINATION_COUNT='estimated')
+    def test_estimated_count_past_collapsed_end(self):
+        # 45 rows, 25 stories: the estimate promises two pages, there is one
+        self.cluster(self.articles[0], self.articles[25:])
+        response = self.client.get('/?page=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].number, 1)
+        self.assertEqual(len(response.context['articles']), 25)
+        self.assertEqual(response.context['paginator'].num_pages, 1)
+
+    def test_writes_invalidate_counts(self):
+        def bumps(write):
+            before = generation()
+            with self.captureOnCommitCallbacks(execute=True):
+                write()
+            return generation() > before
+
+        self.assertTrue(bumps(lambda: self.client.delete(f'/api/articles/{self.articles[1].id}/')))
+        self.assertTrue(bumps(lambda: self.client.patch(
+            f'/api/articles/{self.articles[2].id}/', {'category': 'science'}, content_type='application/json'
+        )))
+
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        with override_settings(NEWS_ARCHIVE_DIR=archive_dir):
+            self.assertTrue(bumps(lambda: call_command('archive_articles', '--older-than', '4000',
+                                                       stdout=StringIO())))
+            path = os.path.join(archive_dir, 'export.ndjson.gz')
+            call_command('export_articles', path, stderr=StringIO())
+            Article.objects.filter(category='science').delete()
+            self.assertTrue(bumps(lambda: call_command('import_articles', path, stdout=StringIO())))
+
+        result = CategoryResult('general', 'mediastack')
+        result.articles = [{'url': 'https://example.com/fresh', 'title': 'Fresh', 'description': 'New.'}]
+        with patch('news.views.IngestionEngine.run', return_value=[result]), \
+                override_settings(MEDIASTACK_API_KEY='test'):
+            self.assertTrue(bumps(lambda: self.client.get('/fetch/')))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.articles = Article.objects.bulk_create([
+            Article(title=f'Story {i}', url=f'https://example.com/conditional/{i}', source='Wire',
+                    category='general', summary='Summary', published_at=now - timedelta(minutes=i))
+            for i in range(5)
+        ])
+        self.middle = self.articles[2]
+
+    def assert_revalidates(self, path, write):
+        etag = self.client.get(path)['ETag']
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        write()
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def patch(self, article, **fields):
+        response = self.client.patch(f'/api/articles/{article.id}/', fields, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_changes_with_every_write(self):
+        for path in ['/api/articles/', '/']:
+            self.assert_revalidates(path, lambda: apply_counts({self.middle.id: 1}))
+            self.assert_revalidates(path, lambda: self.patch(self.middle, title='Edited'))
+        self.assert_revalidates('/api/articles/', lambda: self.client.put(
+            f'/api/articles/{self.middle.id}/',
+            {'title': 'Replaced', 'url': self.middle.url, 'source': 'Wire', 'category': 'general',
+             'summary': 'New summary', 'extended_summary': ''},
+            content_type='application/json'
+        ))
+        self.assert_revalidates('/api/articles/', lambda: self.client.delete(f'/api/articles/{self.middle.id}/'))
+
+    def test_detail_changes_with_every_write(self):
+        article = self.articles[1]
+        for path in [f'/api/articles/{article.id}/', f'/article/{article.id}/']:
+            self.assert_revalidates(path, lambda: apply_counts({article.id: 1}))
+            self.assert_revalidates(path, lambda: self.patch(article, summary='Corrected'))
+            self.assert_revalidates(path, lambda: Comment.objects.create(article=article, content='Hi'))
+
+    def test_comment_edits_change_validators(self):
+        article = self.articles[1]
+        comment = Comment.objects.create(article=article, content='Frist')
+        Comment.objects.create(article=self.middle, content='Elsewhere')
+        for number, path in enumerate([f'/api/comments/{comment.id}/', f'/api/comments/?article_id={article.id}',
+                                       '/api/comments/', f'/article/{article.id}/']):
+            self.assert_revalidates(path, lambda: self.assertEqual(self.client.patch(
+                f'/api/comments/{comment.id}/', {'content': f'First, edit {number}'},
+                content_type='application/json'
+            ).status_code, 200))
+        self.assertContains(self.client.get(f'/api/comments/{comment.id}/'), 'First, edit 3')
+
+    def test_summary_rewrites_change_validators(self):
+        class Extractor:
+            def run(self, urls):
+                return {url: ' '.join(f'Full text sentence number {i} of the page.' for i in range(80))
+                        for url in urls}
+
+        article = self.articles[3]
+        self.assert_revalidates('/api/articles/', lambda: summarize_articles([self.middle.id], Extractor()))
+        self.assert_revalidates(f'/api/articles/{article.id}/',
+                                lambda: summarize_articles([article.id], Extractor()))
+
+    def test_unchanged_pages_are_not_resent(self):
+        response = self.client.get('/api/articles/')
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertTrue(response.has_header('Last-Modified'))
+        repeat = self.client.get('/api/articles/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.content, b'')
+
+
+class NearDuplicateTests(TestCase):
+    WIRE = {
+        'title': 'Magnitude 6.1 earthquake strikes off coast of Japan, no tsunami warning issued',
+        'description': 'The quake hit at a depth of 10 km, the meteorological agency said.',
+        'published_at': '2024-10-18T09:00:00+00:00',
+    }
+
+    def setUp(self):
+        # List counts are cached across tests
+        cache.clear()
+
+    def ingest(self, *stories, category='general'):
+        articles = [dict(self.WIRE, **story) for story in stories]
+        return NewsService.bulk_create_articles(articles, category)
+
+    def listed(self, path='/'):
+        return {article.url: article.cluster_size for article in self.client.get(path).context['articles']}
+
+    def test_copies_join_one_cluster(self):
+        self.ingest({'url': 'https://a.example.com/quake'})
+        stats = self.ingest(
+            {'url': 'https://b.example.com/quake', 'title': 'Magnitude 6.1 earthquake strikes off Japan coast; no tsunami warning issued'},
+            {'url': 'https://c.example.com/quake'},
+            {'url': 'https://d.example.com/match', 'title': 'Local team wins championship in overtime',
+             'description': 'Fans celebrated late into the night.'},
+        )
+        self.assertEqual(stats, {'created': 3, 'failed': 0, 'duplicates': 2})
+
+        head = Article.objects.get(url='https://a.example.com/quake')
+        clusters = dict(StoryFingerprint.objects.values_list('article__url', 'cluster_id'))
+        self.assertEqual(clusters['https://b.example.com/quake'], head.id)
+        self.assertEqual(clusters['https://c.example.com/quake'], head.id)
+        self.assertNotEqual(clusters['https://d.example.com/match'], head.id)
+
+        response = self.client.get('/')
+        self.assertEqual({article.url: article.cluster_size for article in response.context['articles']},
+                         {'https://a.example.com/quake': 3, 'https://d.example.com/match': 1})
+
+    def test_copies_in_another_category_stay_listed(self):
+        self.ingest({'url': 'https://a.example.com/quake'})
+        self.ingest({'url': 'https://b.example.com/quake'}, {'url': 'https://c.example.com/quake'},
+                    category='science')
+
+        self.assertEqual(self.listed(), {'https://a.example.com/quake': 3})
+        self.assertEqual(self.listed('/?category=general'), {'https://a.example.com/quake': 3})
+        self.assertEqual(self.listed('/?category=science'), {'https://b.example.com/quake': 3})
+
+    def test_copies_outlive_an_archived_head(self):
+        self.ingest({'url': 'https://a.example.com/quake'})
+        self.ingest({'url': 'https://b.example.com/quake'}, {'url': 'https://c.example.com/quake'})
+        # Archiving deletes the row and, with it, the fingerprint
+        Article.objects.filter(url='https://a.example.com/quake').delete()
+        cache.clear()
+
+        self.assertEqual(self.listed(), {'https://b.example.com/quake': 2})
+
+    @override_settings(NEWS_DUPLICATES='skip')
+    def test_wordless_articles_are_never_clustered(self):
+        self.assertIsNone(minhash(''))
+        self.assertIsNone(minhash('The and of it'))
+        stats = self.ingest({'url': 'https://a.example.com/blank', 'title': '', 'description': ''},
+                            {'url': 'https://b.example.com/blank', 'title': 'The', 'description': 'of the'})
+        self.assertEqual(stats, {'created': 2, 'failed': 0, 'duplicates': 0})
+        self.assertFalse(StoryFingerprint.objects.exists())
+
+        Article.objects.create(title='It is', url='https://c.example.com/blank', source='Wire',
+                               category='general', summary='', published_at=timezone.now())
+        call_command('index_story_fingerprints', stdout=StringIO())
+        self.assertFalse(StoryFingerprint.objects.exists())
+        self.assertEqual(set(self.listed()), {f'https://{host}.example.com/blank' for host in 'abc'})
+
+    def test_backfill_invalidates_list_counts(self):
+        for host in 'abc':
+            Article.objects.create(title=self.WIRE['title'], url=f'https://{host}.example.com/quake',
+                                   source='Wire', category='general', summary=self.WIRE['description'],
+                                   published_at=timezone.now())
+        self.assertEqual(self.client.get('/').context['paginator'].count, 3)
+
+        before = generation()
+        call_command('index_story_fingerprints', stdout=StringIO())
+        self.assertGreater(generation(), before)
+        response = self.client.get('/')
+        self.assertEqual(response.context['paginator'].count, 1)
+        self.assertEqual(len(response.context['articles']), 1)
+
+        # Nothing left to cluster
+        before = generation()
+        call_command('index_story_fingerprints', stdout=StringIO())
+        self.assertEqual(generation(), before)
+
+    @override_settings(NEWS_DUPLICATES='skip')
+    def test_skip_duplicates(self):
+        self.ingest({'url': 'https://a.example.com/quake'})
+        stats = self.ingest({'url': 'https://c.example.com/quake'})
+        self.assertEqual(stats, {'created': 0, 'failed': 0, 'duplicates': 1})
+        self.assertFalse(Article.objects.filter(url='https://c.example.com/quake').exists())
+
+
+class IngestStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def story(self, number, **fields):
+        return {'url': f'https://example.com/ingest/{number}', 'title': f'Unrelated story number {number}',
+                'description': f'Nothing in common with story {number * 7919} at all.', **fields}
+
+    def test_counts_new_rows_only(self):
+        stats = NewsService.bulk_create_articles(
+            [self.story(1), self.story(1), self.story(2), {'title': 'No url'}], 'general'
+        )
+        self.assertEqual(stats, {'created': 2, 'failed': 1, 'duplicates': 0})
+        stats = NewsService.bulk_create_articles([self.story(2), self.story(3)], 'general')
+        self.assertEqual(stats, {'created': 1, 'failed': 0, 'duplicates': 0})
+
+    def test_rows_taken_by_a_concurrent_run_are_not_counted(self):
+        insert_articles = NewsService.insert_articles
+
+        def racing_insert(articles, batch_size):
+            # Another run stores the first URL while this one summarizes
+            Article.objects.create(title='Other run', url=articles[0].url, source='Wire', category='general',
+                                   summary='Summary', published_at=timezone.now())
+            return insert_articles(articles, batch_size)
+
+        with patch.object(NewsService, 'insert_articles', side_effect=racing_insert):
+            stats = NewsService.bulk_create_articles([self.story(1), self.story(2)], 'general')
+        self.assertEqual(stats, {'created': 1, 'failed': 0, 'duplicates': 0})
+        self.assertEqual(Article.objects.get(url=self.story(1)['url']).title, 'Other run')
+        self.assertEqual(StoryFingerprint.objects.count(), 1)
+
+    @patch('news.views.schedule_extraction')
+    @patch('news.views.schedule_thumbnails')
+    def test_background_work_follows_settings(self, schedule_thumbnails, schedule_extraction):
+        # Off by default under the test runner
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            NewsService.bulk_create_articles([self.story(1, image='https://example.com/1.jpg')], 'general')
+        self.assertEqual(callbacks, [])
+
+        with override_settings(NEWS_THUMBNAILS_ON_INGEST=True, NEWS_EXTRACTION_ON_INGEST=True), \
+                self.captureOnCommitCallbacks(execute=True):
+            NewsService.bulk_create_articles([self.story(2, image='https://example.com/2.jpg')], 'general')
+        schedule_thumbnails.assert_called_once_with(['https://example.com/2.jpg'])
+        article = Article.objects.get(url=self.story(2)['url'])
+        schedule_extraction.assert_called_once_with([article.id])
+
+
+class IncrementalIngestionTests(TestCase):
+    """fetch_news against the local MediaStack stub"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = MediaStackStub(per_category=120).start()
+        cls.settings = override_settings(
+            MEDIASTACK_URL=cls.stub.url, MEDIASTACK_API_KEY='test', NEWS_FETCH_PAGE_SIZE=50
+        )
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.stub.stop()
+        super().tearDownClass()
+
+    def fetch(self):
+        self.stub.requests.clear()
+        self.client.get('/fetch/')
+        return [(params['categories'], int(params['offset'])) for params in self.stub.requests]
+
+    def test_pages_back_to_watermark(self):
+        # No watermark yet: one page per category
+        requests = self.fetch()
+        self.assertEqual(len(requests), len(CATEGORIES))
+        self.assertEqual(Article.objects.count(), 50 * len(CATEGORIES))
+        self.assertEqual(IngestionWatermark.objects.count(), len(CATEGORIES))
+
+        # Quiet categories cost one request and insert nothing;
+        # the busy one is followed until its watermark
+        self.stub.publish('business', 70)
+        requests = self.fetch()
+        self.assertEqual(sorted(offset for category, offset in requests if category == 'business'), [0, 50])
+        self.assertEqual(len(requests), len(CATEGORIES) + 1)
+        self.assertEqual(Article.objects.filter(category='business').count(), 50 + 70)
+
+        watermark = IngestionWatermark.objects.get(category='business').last_published_at
+        self.assertEqual(watermark, Article.objects.filter(category='business').latest('published_at').published_at)
+
+
+@override_settings(MEDIASTACK_API_KEY='test', NEWS_FETCH_RETRIES=0,
+                   NEWS_PROVIDER_LIMITS={'mediastack': {'rate': 1000, 'burst': 100}})
+class IngestionEngineTests(TestCase):
+    """Categories are fetched concurrently, within the concurrency bound and the deadline"""
+    LATENCIES = {'general': 0.4, 'business': 0.3, 'technology': 0.2, 'science': 0.2,
+                 'health': 0.2, 'sports': 0.2, 'entertainment': 0.2}
+
+    def fetch(self, latencies, concurrency, deadline=10):
+        stub = MediaStackStub(per_category=5, latencies=latencies).start()
+        self.addCleanup(stub.stop)
+        with override_settings(MEDIASTACK_URL=stub.url):
+            engine = IngestionEngine([MediaStackProvider()], concurrency=concurrency, deadline=deadline)
+        started = time.perf_counter()
+        results = engine.run()
+        return results, time.perf_counter() - started, stub
+
+    def test_run_takes_as_long_as_the_slowest_category(self):
+        results, elapsed, stub = self.fetch(self.LATENCIES, concurrency=7)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual([result.category for result in results], CATEGORIES)
+        self.assertGreaterEqual(elapsed, 0.4)
+        # Sequential fetches would take 1.7s
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(stub.peak, 7)
+
+    def test_concurrency_is_bounded(self):
+        results, elapsed, stub = self.fetch({category: 0.2 for category in CATEGORIES}, concurrency=2)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(stub.peak, 2)
+        # Four waves of two requests
+        self.assertGreaterEqual(elapsed, 0.8)
+
+    def test_pending_categories_fail_at_the_deadline(self):
+        latencies = dict(self.LATENCIES, general=3.0)
+        with self.assertLogs('news.ingestion', 'ERROR'):
+            results, elapsed, _ = self.fetch(latencies, concurrency=7, deadline=0.8)
+        self.assertLess(elapsed, 1.5)
+        failed = {result.category: result.error for result in results if not result.ok}
+        self.assertEqual(failed, {'general': 'Deadline of 0.8s exceeded'})
+        self.assertTrue(all(result.articles for result in results if result.ok))
+
+
+class ProviderTests(TestCase):
+    """Several news APIs behind one ingestion run"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = MediaStackStub(per_category=30).start()
+        cls.settings = override_settings(
+            MEDIASTACK_URL=cls.stub.url, MEDIASTACK_API_KEY='test',
+            NEWSAPI_URL=cls.stub.newsapi_url, NEWSAPI_API_KEY='test',
+            NEWS_PROVIDERS=['mediastack', 'newsapi'], NEWS_FETCH_PAGE_SIZE=20,
+            NEWS_PROVIDER_LIMITS={'mediastack': {'rate': 100, 'burst': 20},
+                                  'newsapi': {'rate': 100, 'burst': 20}},
+        )
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.stub.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.stub.requests.clear()
+        self.stub.error_rate = 0.0
+
+    def test_watermarks_are_kept_per_provider(self):
+        self.client.get('/fetch/')
+        self.assertEqual(IngestionWatermark.objects.count(), 2 * len(CATEGORIES))
+        self.assertEqual(set(IngestionWatermark.objects.values_list('provider', flat=True)),
+                         {'mediastack', 'newsapi'})
+        self.assertTrue(Article.objects.filter(url__startswith='https://newsapi.stub.example.com/').exists())
+        self.assertTrue(Article.objects.filter(url__startswith='https://stub.example.com/').exists())
+
+    def test_failed_requests_are_retried(self):
+        self.stub.error_rate = 1.0
+        provider = NewsAPIProvider(retries=2, backoff=0.01)
+        with self.assertLogs('news.providers', 'WARNING'):
+            result = provider.fetch_category('business')
+        self.assertFalse(result.ok)
+        self.assertIn('after 3 attempts', result.error)
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_missing_key_is_a_configuration_error(self):
+        with override_settings(MEDIASTACK_API_KEY=''), self.assertRaises(ValueError):
+            MediaStackProvider()
+
+    def test_newsapi_records(self):
+        provider = NewsAPIProvider()
+        self.assertIsNone(provider.normalize({'title': '[Removed]', 'url': 'https://removed.invalid'}))
+        article = provider.normalize({
+            'title': 'Rates held', 'url': 'https://example.com/rates', 'source': {'id': None, 'name': 'Reuters'},
+            'urlToImage': 'https://example.com/rates.jpg', 'publishedAt': '2024-05-01T12:30:00Z',
+            'content': 'The central bank kept rates unchanged… [+2140 chars]',
+        })
+        self.assertEqual(article['source'], 'Reuters')
+        self.assertEqual(article['image'], 'https://example.com/rates.jpg')
+        self.assertEqual(article['content'], 'The central bank kept rates unchanged')
+        self.assertEqual(article['published_at'], parse_timestamp('2024-05-01T12:30:00+00:00'))
+
+    def test_timestamps(self):
+        self.assertIsNone(parse_timestamp(''))
+        self.assertIsNone(parse_timestamp('yesterday'))
+        self.assertEqual(parse_timestamp('2024-05-01T12:30:00'), parse_timestamp('2024-05-01T12:30:00Z'))
+        self.assertEqual(parse_timestamp('2024-05-01T14:30:00+02:00'), parse_timestamp('2024-05-01T12:30:00Z'))
+
+    def test_token_bucket(self):
+        limiter = TokenBucket(rate=10, burst=3)
+        started = time.monotonic()
+        for _ in range(3):
+            self.assertTrue(limiter.acquire())
+        self.assertLess(time.monotonic() - started, 0.05)
+        # The burst is spent: the next token is 0.1s away
+        self.assertFalse(limiter.acquire(timeout=0.01))
+        self.assertTrue(limiter.acquire(timeout=0.5))
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+
+@skipUnless(ThumbnailPipeline.enabled(), 'Pillow is not installed')
+class ThumbnailTests(TestCase):
+    SOURCE = 'https://cdn.example.com/photos/storm.jpg'
+
+    def setUp(self):
+        from PIL import Image
+
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(MEDIA_ROOT=self.media_root, NEWS_THUMBNAIL_WIDTHS=[320, 640])
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        source = Path(self.media_root) / 'photos' / 'storm.jpg'
+        source.parent.mkdir()
+        Image.new('RGB', (1600, 900), 'navy').save(source)
+        self.pipeline = ThumbnailPipeline(fetcher=LocalFileFetcher(self.media_root))
+
+    def test_renders_each_width_once(self):
+        from PIL import Image
+
+        self.assertEqual(self.pipeline.run([self.SOURCE, self.SOURCE]), 2)
+        for width in [320, 640]:
+            with Image.open(thumbnail_path(self.SOURCE, width)) as image:
+                self.assertEqual(image.size, (width, width * 9 // 16))
+        self.assertEqual(self.pipeline.run([self.SOURCE]), 0)
+
+    @patch('news.thumbnails.close_old_connections')
+    def test_background_batches_refresh_connections(self, close_old_connections):
+        with patch.object(ThumbnailPipeline, 'run', side_effect=DatabaseError('gone away')), \
+                self.assertLogs('news.thumbnails', 'ERROR'):
+            render_batch([self.SOURCE])
+        self.assertEqual(close_old_connections.call_count, 2)
+
+    def test_srcset(self):
+        self.assertEqual(thumbnail(self.SOURCE), {'src': self.SOURCE, 'srcset': ''})
+        self.pipeline.run([self.SOURCE])
+        self.assertEqual(thumbnail(self.SOURCE)['srcset'],
+                         f'{thumbnail_url(self.SOURCE, 320)} 320w, {thumbnail_url(self.SOURCE, 640)} 640w')
+
+    def test_evicts_least_recently_used(self):
+        other = 'https://cdn.example.com/photos/storm-copy.jpg'
+        shutil.copy(Path(self.media_root) / 'photos' / 'storm.jpg',
+                    Path(self.media_root) / 'photos' / 'storm-copy.jpg')
+        self.pipeline.run([self.SOURCE, other])
+        for width in [320, 640]:
+            os.utime(thumbnail_path(self.SOURCE, width), (0, 0))
+        size = sum(thumbnail_path(other, width).stat().st_size for width in [320, 640])
+
+        evict(size)
+        self.assertFalse(thumbnail_path(self.SOURCE, 320).exists())
+        self.assertTrue(thumbnail_path(other, 640).exists())
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        settings = override_settings(NEWS_ARCHIVE_DIR=self.archive_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        now = timezone.now()
+        self.old = Article.objects.create(
+            title='Old story', url='https://example.com/old', source='bbc', category='general',
+            summary='Long ago.', extended_summary='Long ago, in detail.',
+            published_at=now - timedelta(days=400)
+        )
+        self.recent = Article.objects.create(
+            title='New story', url='https://example.com/new', source='bbc', category='general',
+            summary='Just now.', published_at=now
+        )
+        Comment.objects.create(article=self.old, content='First!', username='sam')
+
+    def test_archive_and_serve(self):
+        call_command('archive_articles', '--older-than', '365', stdout=StringIO())
+
+        self.assertEqual(list(Article.objects.values_list('id', flat=True)), [self.recent.id])
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(ArchivedArticle.objects.filter(id=self.old.id).exists())
+
+        response = self.client.get(f'/article/{self.old.id}/')
+        self.assertContains(response, 'Long ago, in detail.')
+        self.assertContains(response, 'First!')
+        self.assertTrue(response.context['archived'])
+
+    def test_archived_urls_are_not_ingested_again(self):
+        call_command('archive_articles', '--older-than', '365', stdout=StringIO())
+        stats = NewsService.bulk_create_articles([{
+            'url': 'https://example.com/old', 'title': 'Old story', 'description': 'Long ago.',
+        }], 'general')
+        self.assertEqual(stats['created'], 0)
+
+
+class ExportImportTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        base = timezone.now() - timedelta(days=10)
+        for i in range(5):
+            article = Article.objects.create(
+                title=f'Story {i}', url=f'https://example.com/{i}', source='bbc',
+                category='sports' if i % 2 else 'business', summary='Summary.',
+                published_at=base + timedelta(days=i)
+            )
+            Comment.objects.create(article=article, content=f'Comment on {i}')
+
+    def test_round_trip(self):
+        for article in Article.objects.filter(category='sports'):
+            Comment.objects.create(article=article, content=f'Reply on {article.title}')
+        path = os.path.join(self.directory, 'sports.ndjson.gz')
+        call_command('export_articles', path, '--category', 'sports', stderr=StringIO())
+        expected = {
+            article.url: (article.published_at, article.created_at)
+            for article in Article.objects.filter(category='sports')
+        }
+        comment_times = dict(Comment.objects.filter(article__category='sports')
+                             .values_list('content', 'created_at'))
+
+        Article.objects.all().delete()
+        call_command('import_articles', path, stdout=StringIO())
+        self.assertEqual({article.url: (article.published_at, article.created_at)
+                          for article in Article.objects.all()}, expected)
+        self.assertEqual(dict(Comment.objects.values_list('content', 'created_at')), comment_times)
+
+        # Importing again skips what is already there
+        call_command('import_articles', path, stdout=StringIO())
+        self.assertEqual(Article.objects.count(), len(expected))
+        self.assertEqual(Comment.objects.count(), 2 * len(expected))
+
+    def test_import_leaves_other_writes_stamped(self):
+        path = os.path.join(self.directory, 'all.ndjson.gz')
+        call_command('export_articles', path, stderr=StringIO())
+        Article.objects.all().delete()
+        other = Article.objects.create(title='Live story', url='https://example.com/live', source='bbc',
+                                       category='general', summary='Summary.', published_at=timezone.now())
+        before = timezone.now()
+        written = []
+
+        def concurrent_write(model, objects, imported):
+            # A comment posted elsewhere while the import is running
+            written.append(Comment.objects.create(article=other, content='Live'))
+            return restore_timestamps(model, objects, imported)
+
+        with patch('news.exports.restore_timestamps', side_effect=concurrent_write):
+            call_command('import_articles', path, stdout=StringIO())
+        self.assertTrue(written)
+        for comment in written:
+            comment.refresh_from_db()
+            self.assertGreaterEqual(comment.created_at, before)
+
+    def test_http_export(self):
+        since = (timezone.now() - timedelta(days=8)).date().isoformat()
+        response = self.client.get(f'/api/articles/export/?since={since}&category=business')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        records = list(read_records(BytesIO(b''.join(response.streaming_content))))
+        self.assertEqual([record['url'] for record in records],
+                         ['https://example.com/2', 'https://example.com/4'])
+        self.assertEqual(len(records[0]['comments']), 1)
+
+    def test_http_export_rejects_bad_dates(self):
+        self.assertEqual(self.client.get('/api/articles/export/?since=yesterday').status_code, 400)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """The replica is a second SQLite database that never catches up, so a
+    read that reaches it can't see what was written to the primary."""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.article = Article(title='Replicated story', url='https://example.com/replicated',
+                               source='Wire', category='general', summary='Summary', published_at=now)
+        self.article.save(using='default')
+        self.article.save(using='replica', force_insert=True)
+        replica_health.reset()
+        routers._thread_state.routing['pinned'] = False
+
+    def tearDown(self):
+        routers._thread_state.routing['pinned'] = False
+
+    def test_reads_go_to_replica_until_a_write(self):
+        self.assertEqual(Article.objects.all().db, 'replica')
+        with use_primary():
+            self.assertEqual(Article.objects.all().db, 'default')
+        self.assertEqual(Article.objects.all().db, 'replica')
+
+        Comment.objects.create(article=self.article, content='First', username='a')
+        self.assertEqual(Article.objects.all().db, 'default')
+
+    def test_background_writes_pin_only_their_thread(self):
+        reads = []
+
+        def worker():
+            with use_primary():
+                reads.append(Article.objects.all().db)
+            # Routing a write pins; the thread's own connection can't see the test's data
+            router.db_for_write(Comment)
+            reads.append(Article.objects.all().db)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(reads, ['default', 'default'])
+        # The worker's write left this thread's reads on the replica
+        self.assertEqual(Article.objects.all().db, 'replica')
+
+    def test_unhealthy_replica_is_skipped(self):
+        with patch.object(replica_health, 'check', return_value=False):
+            self.assertEqual(Article.objects.all().db, 'default')
+            # The failed check is remembered until the next interval
+            self.assertEqual(Article.objects.all().db, 'default')
+
+    def test_client_reads_its_own_comment(self):
+        url = f'/api/comments/?article_id={self.article.id}'
+        response = self.client.post('/api/comments/', {'article_id': self.article.id, 'content': 'Hello'})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+        self.assertEqual(Comment.objects.using('replica').count(), 0)
+
+        self.assertEqual(len(self.client.get(url).json()['results']), 1)
+        del self.client.cookies[routers.PIN_COOKIE]
+        self.assertEqual(len(self.client.get(url).json()['results']), 0)
+
+
+class BrokerTests(TestCase):
+    async def test_slow_reader_drops_oldest_events(self):
+        broker = InProcessBroker(queue_size=2)
+        async with broker.subscribe('comments:1') as subscription:
+            with self.assertLogs('news.broker', 'WARNING'):
+                for message in ['first', 'second', 'third']:
+                    broker.publish('comments:1', message)
+                await asyncio.sleep(0)
+            self.assertEqual([await subscription.get(), await subscription.get()], ['second', 'third'])
+            self.assertTrue(subscription.queue.empty())
+
+    async def test_unsubscribe_on_exit(self):
+        broker = InProcessBroker()
+        async with broker.subscribe('comments:1'):
+            async with broker.subscribe('comments:1'):
+                self.assertEqual(broker.subscriber_count('comments:1'), 2)
+            self.assertEqual(broker.subscriber_count('comments:1'), 1)
+        self.assertEqual(broker.subscriber_count('comments:1'), 0)
+        self.assertNotIn('comments:1', broker._subscribers)
+        # Publishing to a channel nobody reads is a no-op
+        broker.publish('comments:1', 'unread')
+
+    def test_closed_loop_is_unsubscribed(self):
+        broker = InProcessBroker()
+
+        async def subscribe():
+            return broker.subscribe('comments:1')
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(subscribe())
+        loop.close()
+        broker.publish('comments:1', 'late')
+        self.assertEqual(broker.subscriber_count('comments:1'), 0)
+
+
+@override_settings(NEWS_SSE_KEEPALIVE=0.05)
+class CommentStreamTests(TestCase):
+    def setUp(self):
+        self.article = Article.objects.create(
+            title='Live story', url='https://example.com/live', source='Wire', category='general',
+            summary='Summary', published_at=timezone.now()
+        )
+        self.path = f'/article/{self.article.id}/comments/stream/'
+
+    async def disconnect(self, events):
+        """A client disconnect cancels the response task waiting on the stream"""
+        waiting = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+
+    def test_wsgi_falls_back_to_polling(self):
+        self.assertEqual(self.client.get(self.path).status_code, 204)
+
+    async def test_unknown_article(self):
+        self.assertEqual((await self.async_client.get('/article/999999/comments/stream/')).status_code, 404)
+
+    async def test_pushes_published_comments(self):
+        response = await self.async_client.get(self.path)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        self.assertTrue((await anext(events)).startswith(b'retry:'))
+        channel = comment_channel(self.article.id)
+        self.assertEqual(comment_broker.subscriber_count(channel), 1)
+
+        comment = await Comment.objects.acreate(article=self.article, content='Live!', username='ana')
+        comment_broker.publish(channel, comment_event(comment, CommentSerializer(comment).data))
+        event = (await anext(events)).decode()
+        self.assertIn('event: comment', event)
+        self.assertIn('"content": "Live!"', event)
+
+        # Idle streams send keep-alives
+        self.assertEqual(await anext(events), b': keep-alive\n\n')
+
+        await self.disconnect(events)
+        self.assertEqual(comment_broker.subscriber_count(channel), 0)
+
+    async def test_replays_missed_comments(self):
+        seen = await Comment.objects.acreate(article=self.article, content='Seen', username='ana')
+        await Comment.objects.acreate(article=self.article, content='Missed', username='bo')
+        last_event_id = CommentCursorPagination().encode_position(seen)
+
+        response = await self.async_client.get(self.path, headers={'Last-Event-ID': last_event_id})
+        events = aiter(response.streaming_content)
+        await anext(events)
+        replayed = (await anext(events)).decode()
+        self.assertIn('Missed', replayed)
+        self.assertNotIn('Seen', replayed)
+        await self.disconnect(events)
+
+
+# Routes for AsyncViewTests: the async views ahead of the regular ones
+urlpatterns = [
+    path('', async_views.news_list, name='news_list'),
+    path('article/<int:article_id>/', async_views.article_detail, name='article_detail'),
+    path('api/comments/', async_views.comment_list, name='comment-list'),
+    path('', include('news.urls')),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewTests(TestCase):
+    """The NEWS_ASYNC_VIEWS read paths, run under AsyncClient"""
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.articles = Article.objects.bulk_create([
+            Article(title=f'Async story {i}', url=f'https://example.com/async/{i}', source='Wire',
+                    category='business' if i % 2 else 'general', summary='Summary',
+                    extended_summary='Extended summary.', published_at=now - timedelta(days=i * 200))
+            for i in range(35)
+        ])
+        self.article = self.articles[0]
+        self.comments = [Comment.objects.create(article=self.article, content=f'Comment {i}') for i in range(3)]
+
+    async def test_news_list(self):
+        response = await self.async_client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['articles']), 30)
+        self.assertEqual(response.context['paginator'].num_pages, 2)
+        self.assertEqual(response.context['categories'], ['business', 'general'])
+
+        response = await self.async_client.get('/?category=business&page=1')
+        self.assertEqual({article.category for article in response.context['articles']}, {'business'})
+        self.assertEqual((await self.async_client.get('/?page=99')).status_code, 404)
+
+    async def test_news_list_revalidates(self):
+        etag = (await self.async_client.get('/'))['ETag']
+        self.assertEqual((await self.async_client.get('/', headers={'If-None-Match': etag})).status_code, 304)
+
+    async def test_article_detail(self):
+        response = await self.async_client.get(f'/article/{self.article.id}/')
+        self.assertContains(response, 'Extended summary.')
+        self.assertFalse(response.context['archived'])
+        # Missing articles redirect to the list, as in the sync view
+        self.assertEqual((await self.async_client.get('/article/999999/')).status_code, 302)
+
+    async def test_archived_article_detail(self):
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        with override_settings(NEWS_ARCHIVE_DIR=archive_dir):
+            await sync_to_async(call_command)('archive_articles', '--older-than', '365', stdout=StringIO())
+            archived = self.articles[2]
+            self.assertFalse(await Article.objects.filter(id=archived.id).aexists())
+            response = await self.async_client.get(f'/article/{archived.id}/')
+        self.assertContains(response, 'Async story 2')
+        self.assertTrue(response.context['archived'])
+
+    async def test_comments(self):
+        response = await self.async_client.get('/api/comments/', {'article_id': self.article.id, 'page_size': 2})
+        data = response.json()
+        self.assertEqual([comment['content'] for comment in data['results']], ['Comment 2', 'Comment 1'])
+        self.assertIsNotNone(data['next'])
+
+        await Comment.objects.acreate(article=self.article, content='Newer')
+        newer = (await self.async_client.get('/api/comments/', {'article_id': self.article.id,
+                                                                'since': data['since']})).json()
+        self.assertEqual([comment['content'] for comment in newer['results']], ['Newer'])
+
+        # Invalid cursors and writes are handled by the DRF viewset
+        invalid = await self.async_client.get('/api/comments/', {'cursor': 'nonsense'})
+        self.assertEqual(invalid.status_code, 404)
+        created = await self.async_client.post('/api/comments/', {'article_id': self.article.id, 'content': 'Hi'})
+        self.assertEqual(created.status_code, 201)
+
+
+class CommentCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.first, self.second = Article.objects.bulk_create([
+            Article(title=f'Story {i}', url=f'https://example.com/count/{i}', source='Wire',
+                    category='general', summary='Summary', published_at=now - timedelta(minutes=i))
+            for i in range(2)
+        ])
+
+    def test_changes_are_coalesced_into_one_update(self):
+        counter = CommentCounter(interval=1)
+        with patch.object(CommentCounter, 'start'):
+            for _ in range(3):
+                counter.add(self.first.id)
+            counter.add(self.second.id)
+            counter.add(self.second.id, -1)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.comment_count, 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(counter.flush(), 1)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(dict(Article.objects.values_list('url', 'comment_count')), {
+            self.first.url: 3, self.second.url: 0,
+        })
+        self.assertEqual(counter.flush(), 0)
+
+    @override_settings(NEWS_COMMENT_COUNT_FLUSH_INTERVAL=0)
+    def test_api_counts_comments(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/comments/', {'article_id': self.first.id, 'content': 'Hi'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.client.post('/api/comments/', {'article_id': 'x', 'content': 'Hi'}).status_code, 404)
+
+        counts = {article['id']: article['comment_count']
+                  for article in self.client.get('/api/articles/').json()['results']}
+        self.assertEqual(counts, {self.first.id: 1, self.second.id: 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/comments/{response.json()['id']}/")
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.comment_count, 0)
+
+    def test_reconcile(self):
+        Comment.objects.create(article=self.first, content='Missed', username='a')
+        Article.objects.filter(id=self.second.id).update(comment_count=5)
+        out = StringIO()
+        call_command('reconcile_comment_counts', '--batch-size', '1', stdout=out)
+        self.assertIn('corrected 2', out.getvalue())
+        self.assertEqual(dict(Article.objects.values_list('url', 'comment_count')), {
+            self.first.url: 1, self.second.url: 0,
+        })
+
+
+class LazyImportTests(TestCase):
+    def test_views_do_not_import_nltk_or_numpy(self):
+        # A fresh interpreter, since this one has loaded both already
+        code = ('import django, sys; django.setup(); import news.views, news.async_views; '
+                'print(sorted(name for name in ("nltk", "numpy") if name in sys.modules))')
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True, check=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'alphaup.settings'}
+        ).stdout
+        self.assertEqual(output.strip(), '[]')
+
+
+class SummarizerTests(TestCase):
+    def test_keeps_central_sentences_in_order(self):
+        filler = [f'Unrelated note number {i} mentions quartz bicycles and opera tickets.' for i in range(30)]
+        story = [f'The harbour bridge reopened after storm repairs, officials said on day {i}.' for i in range(40)]
+        sentences = filler[:15] + story + filler[15:]
+        summary = summarize(' '.join(sentences))
+
+        kept = [sentence for sentence in sentences if sentence in summary]
+        self.assertEqual(' '.join(kept), summary)
+        self.assertTrue(300 <= len(summary.split()) <= 500)
+        self.assertTrue(all(sentence in story for sentence in kept))
+
+    def test_short_texts_are_kept_whole(self):
+        self.assertEqual(summarize('Short description. With two sentences.'),
+                         'Short description. With two sentences.')
+        self.assertEqual(summarize(''), '')
+
+    def test_batch_matches_single_texts(self):
+        rng = random.Random(3)
+        texts = [' '.join(sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(2, 60)))
+                 for _ in range(8)]
+        self.assertEqual(summarize_batch(texts), [summarize(text) for text in texts])
+
+
+    def test_long_texts_are_capped_and_stacked_apart(self):
+        rng = random.Random(5)
+        texts = [' '.join(sentence(rng, 12) for _ in range(40)) for _ in range(20)]
+        sentences = [f'Page sentence {i} says the harbour bridge reopened.' for i in range(1500)]
+        texts.append(' '.join(sentences))
+
+        summaries = summarize_batch(texts)
+        self.assertEqual(summaries[:20], [summarize(text) for text in texts[:20]])
+        kept = [i for i, text in enumerate(sentences) if text in summaries[-1]]
+        self.assertTrue(kept)
+        self.assertLess(max(kept), summarizer.MAX_SENTENCES)
+
+        counts = np.array([40] * 20 + [summarizer.MAX_SENTENCES, 3])
+        groups = list(summarizer.stacks(counts))
+        self.assertEqual(sorted(d for group in groups for d in group), list(range(len(counts))))
+        for group in groups:
+            self.assertLessEqual(max(counts[group]), 2 * min(counts[group]))
+            self.assertLessEqual(len(group) * max(counts[group]) ** 2, summarizer.MAX_CELLS)
+
+class ExtendedSummaryBackfillTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.checkpoint = os.path.join(directory, 'summaries.checkpoint')
+        now = timezone.now()
+        self.articles = Article.objects.bulk_create([
+            Article(title=f'Story {i}', url=f'https://example.com/backfill/{i}', source='Wire',
+                    category='general', summary=f'Description of story {i}.', published_at=now)
+            for i in range(5)
+        ])
+        self.ids = sorted(article.id for article in self.articles)
+
+    def backfill(self):
+        out = StringIO()
+        call_command('generate_extended_summaries', '--workers', '1', '--batch-size', '2',
+                     '--checkpoint', self.checkpoint, stdout=out)
+        return out.getvalue()
+
+    def test_resumes_from_checkpoint(self):
+        summarize_rows = generate_extended_summaries.summarize
+        calls = []
+
+        def interrupted(rows):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError('worker killed')
+            return summarize_rows(rows)
+
+        with patch.object(generate_extended_summaries, 'summarize', side_effect=interrupted), \
+                self.assertRaisesMessage(CommandError, f'resume from article {self.ids[1]}'):
+            self.backfill()
+        self.assertEqual(calls, [2, 2])
+        self.assertEqual(generate_extended_summaries.Command.read_checkpoint(self.checkpoint), self.ids[1])
+        self.assertEqual(Article.objects.exclude(extended_summary='').count(), 2)
+
+        output = self.backfill()
+        self.assertIn(f'Resuming after article {self.ids[1]}', output)
+        self.assertIn('Processed 3/3 articles', output)
+        self.assertFalse(Article.objects.filter(extended_summary='').exists())
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+
+class StaticPageHandler(SimpleHTTPRequestHandler):
+    """Serves the test pages slowly, recording concurrent requests per Host header"""
+    active = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        host = self.headers['Host']
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        try:
+            time.sleep(0.02)
+            super().do_GET()
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@skipUnless(ContentExtractor.enabled(), 'BeautifulSoup is not installed')
+class ExtractionTests(TestCase):
+    STORY = ('The harbour bridge reopened on Monday after three weeks of storm repairs, '
+             'the city transport office said in a statement.')
+
+    def setUp(self):
+        self.pages = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pages)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        settings = override_settings(NEWS_EXTRACTION_CACHE_DIR=cache_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        body = ''.join(f'<p>{self.STORY} Update {i} follows below.</p>' for i in range(40))
+        for i in range(6):
+            Path(self.pages, f'story-{i}.html').write_text(
+                f'<html><head><script>var tracking = 1;</script></head><body>'
+                f'<nav><p>Home World Business Sport Culture Travel Opinion Video Podcasts</p></nav>'
+                f'<article><h1>Bridge reopens</h1><p>Share</p>{body}</article>'
+                f'<footer><p>Copyright notice for every page on the whole website here</p></footer>'
+                f'</body></html>'
+            )
+
+        StaticPageHandler.active.clear()
+        StaticPageHandler.peak.clear()
+        self.server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), partial(StaticPageHandler, directory=self.pages)
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = f'http://127.0.0.1:{self.server.server_port}'
+
+    def test_extracts_main_text_and_caches_pages(self):
+        url = f'{self.base}/story-0.html'
+        text = ContentExtractor().text(url)
+        self.assertTrue(text.startswith(self.STORY))
+        self.assertNotIn('tracking', text)
+        self.assertNotIn('Copyright', text)
+        self.assertNotIn('Podcasts', text)
+
+        # Served from the cache once the server is gone
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertEqual(ContentExtractor().text(url), text)
+        with self.assertLogs('news.extraction', 'WARNING'):
+            self.assertEqual(ContentExtractor().text(f'{self.base}/story-1.html'), '')
+
+    def test_limits_concurrency_per_host(self):
+        urls = [f'{self.base}/story-{i}.html' for i in range(6)]
+        texts = ContentExtractor(workers=6, per_host=2).run(urls)
+        self.assertTrue(all(texts[url] for url in urls))
+        self.assertEqual(StaticPageHandler.peak, {f'127.0.0.1:{self.server.server_port}': 2})
+
+    @patch('news.extraction.close_old_connections')
+    def test_background_batches_refresh_connections(self, close_old_connections):
+        with patch('news.extraction.summarize_articles', side_effect=DatabaseError('gone away')), \
+                self.assertLogs('news.extraction', 'ERROR'):
+            summarize_quietly([1])
+        # Before the batch, so a dropped connection is replaced, and after it
+        self.assertEqual(close_old_connections.call_count, 2)
+
+    def test_article_page_escapes_summaries(self):
+        # Summaries are built from third-party pages and feeds
+        article = Article.objects.create(
+            title='Bridge reopens', url=f'{self.base}/story-3.html', source='Wire', category='general',
+            summary='<img src=x onerror=alert(1)>', published_at=timezone.now(),
+            extended_summary='<script>alert(1)</script>\n\nThe bridge is open again.'
+        )
+        response = self.client.get(f'/article/{article.id}/')
+        self.assertNotContains(response, '<script>alert(1)</script>')
+        self.assertContains(response, '<p>&lt;script&gt;alert(1)&lt;/script&gt;</p>', html=True)
+        self.assertContains(response, '<p>The bridge is open again.</p>', html=True)
+
+        Article.objects.filter(id=article.id).update(extended_summary='')
+        cache.clear()
+        self.assertNotContains(self.client.get(f'/article/{article.id}/'), '<img src=x')
+
+    def test_summaries_use_full_text(self):
+        article = Article.objects.create(
+            title='Bridge reopens', url=f'{self.base}/story-2.html', source='Wire',
+            category='general', summary='The bridge is open again.', published_at=timezone.now(),
+            extended_summary='The bridge is open again.'
+        )
+        missing = Article.objects.create(
+            title='Gone', url=f'{self.base}/missing.html', source='Wire', category='general',
+            summary='Missing page.', published_at=timezone.now(), extended_summary='Missing page.'
+        )
+        with self.assertLogs('news.extraction', 'WARNING'):
+            call_command('extract_content', stdout=StringIO())
+
+        article.refresh_from_db()
+        self.assertIn(self.STORY, article.extended_summary)
+        self.assertTrue(300 <= len(article.extended_summary.split()) <= 500)
+        missing.refresh_from_db()
+        self.assertEqual(missing.extended_summary, 'Missing page.')
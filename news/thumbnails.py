@@ -0,0 +1,248 @@
+"""Resized local copies of article images.
+
+Each source image is fetched once and written to ``MEDIA_ROOT/thumbs`` in
+every width of ``NEWS_THUMBNAIL_WIDTHS``, so list pages can serve a ``srcset``
+of small compressed files instead of hotlinking the original. Files are named
+after a hash of the source URL, which also shares them between wire copies
+that reuse an image.
+
+The cache is bounded by ``NEWS_THUMBNAIL_CACHE_BYTES``. A file's mtime is its
+last use: it is set when written and refreshed, at most daily, when a page
+links to it. Eviction removes the least recently used images first.
+
+Pillow is optional; without it images keep being hotlinked.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# How stale a file's mtime may get before a page view refreshes it
+TOUCH_INTERVAL = 24 * 60 * 60
+
+# Evict down to this fraction of the cap, so eviction doesn't run every batch
+EVICT_TO = 0.9
+
+
+class ThumbnailError(Exception):
+    pass
+
+
+class HttpFetcher:
+    """Download source images, refusing anything larger than ``max_bytes``"""
+
+    def __init__(self, timeout=None, max_bytes=None, session=None):
+        self.timeout = timeout or settings.NEWS_FETCH_TIMEOUT
+        self.max_bytes = max_bytes or settings.NEWS_THUMBNAIL_MAX_SOURCE_BYTES
+        self.session = session or requests.Session()
+
+    def fetch(self, url):
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                data = bytearray()
+                for chunk in response.iter_content(64 * 1024):
+                    data += chunk
+                    if len(data) > self.max_bytes:
+                        raise ThumbnailError(f"{url} is larger than {self.max_bytes} bytes")
+                return bytes(data)
+        except requests.RequestException as e:
+            raise ThumbnailError(f"Could not fetch {url}: {str(e)}")
+
+
+class LocalFileFetcher:
+    """Read source images from disk: ``file://`` URLs, or URL paths under ``root``"""
+
+    def __init__(self, root=None):
+        self.root = Path(root or settings.MEDIA_ROOT)
+
+    def fetch(self, url):
+        parsed = urlparse(url)
+        path = Path(parsed.path) if parsed.scheme == 'file' else self.root / parsed.path.lstrip('/')
+        try:
+            return path.read_bytes()
+        except OSError as e:
+            raise ThumbnailError(f"Could not read {url}: {str(e)}")
+
+
+def thumbnail_root():
+    return Path(settings.MEDIA_ROOT) / 'thumbs'
+
+
+def thumbnail_name(url, width):
+    digest = hashlib.sha256(url.encode()).hexdigest()
+    return f"{digest[:2]}/{digest}-{width}.{settings.NEWS_THUMBNAIL_FORMAT}"
+
+
+def thumbnail_path(url, width):
+    return thumbnail_root() / thumbnail_name(url, width)
+
+
+def thumbnail_url(url, width):
+    return f"{settings.MEDIA_URL}thumbs/{thumbnail_name(url, width)}"
+
+
+def available_widths(url):
+    """Widths already on disk for ``url``, refreshing their last use"""
+    widths = []
+    now = time.time()
+    for width in settings.NEWS_THUMBNAIL_WIDTHS:
+        path = thumbnail_path(url, width)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            continue
+        if now - mtime > TOUCH_INTERVAL:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        widths.append(width)
+    return widths
+
+
+class ThumbnailPipeline:
+    """Fetch and resize images in a bounded pool of worker threads"""
+
+    def __init__(self, fetcher=None, widths=None, workers=None, cache_bytes=None):
+        self.fetcher = fetcher or import_string(settings.NEWS_THUMBNAIL_FETCHER)()
+        self.widths = sorted(widths or settings.NEWS_THUMBNAIL_WIDTHS)
+        self.workers = workers or settings.NEWS_THUMBNAIL_WORKERS
+        self.cache_bytes = cache_bytes or settings.NEWS_THUMBNAIL_CACHE_BYTES
+
+    def render(self, url):
+        """Write every width for ``url``; returns the number of files written"""
+        if all(thumbnail_path(url, width).exists() for width in self.widths):
+            return 0
+
+        # Deferred so that the app runs without Pillow
+        from PIL import Image, UnidentifiedImageError
+
+        data = self.fetcher.fetch(url)
+        try:
+            with Image.open(BytesIO(data)) as image:
+                # Let the JPEG decoder downscale while decoding
+                image.draft('RGB', (self.widths[-1], self.widths[-1]))
+                image = image.convert('RGB')
+                written = 0
+                for width in self.widths:
+                    size = (width, round(image.height * width / image.width))
+                    if width > image.width:
+                        size = image.size
+                    resized = image.resize(size, Image.Resampling.LANCZOS)
+                    self.save(resized, thumbnail_path(url, width))
+                    written += 1
+                return written
+        except (UnidentifiedImageError, OSError, ValueError) as e:
+            raise ThumbnailError(f"Could not decode {url}: {str(e)}")
+
+    @staticmethod
+    def save(image, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'.{path.name}.{threading.get_ident()}.tmp')
+        image.save(tmp_path, format=settings.NEWS_THUMBNAIL_FORMAT.upper(),
+                   quality=settings.NEWS_THUMBNAIL_QUALITY)
+        os.replace(tmp_path, path)
+
+    def render_quietly(self, url):
+        try:
+            return self.render(url)
+        except ThumbnailError as e:
+            logger.warning(str(e))
+        except Exception as e:
+            logger.error(f"Error creating thumbnails for {url}: {str(e)}")
+        return 0
+
+    def run(self, urls):
+        """Render every distinct URL, then enforce the cache size"""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='thumbnails') as executor:
+            written = sum(executor.map(self.render_quietly, urls))
+        evicted = evict(self.cache_bytes)
+        logger.info(f"Thumbnails: {len(urls)} images, {written} files written, {evicted} evicted")
+        return written
+
+    @staticmethod
+    def enabled():
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+
+def evict(cache_bytes):
+    """Delete least recently used thumbnails until the cache fits ``cache_bytes``"""
+    files = []
+    total = 0
+    for directory, _, names in os.walk(thumbnail_root()):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    if total <= cache_bytes:
+        return 0
+
+    evicted = 0
+    target = cache_bytes * EVICT_TO
+    for _, size, path in sorted(files):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        evicted += 1
+    return evicted
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def schedule_thumbnails(urls):
+    """Render thumbnails in the background after ingestion.
+
+    Batches run one at a time on a single background thread, each with its
+    own bounded pool, so ingestion never waits for images.
+    """
+    global _executor
+    urls = [url for url in urls if url]
+    if not urls or not settings.NEWS_THUMBNAILS_ON_INGEST:
+        return
+    if not ThumbnailPipeline.enabled():
+        logger.warning("Pillow is not installed; article images are hotlinked")
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='thumbnail-batches')
+    _executor.submit(render_batch, urls)
+
+
+def render_batch(urls):
+    # The worker thread outlives requests; drop a connection the server has
+    # closed or that is past CONN_MAX_AGE, as request handling would
+    close_old_connections()
+    try:
+        ThumbnailPipeline().run(urls)
+    except Exception as e:
+        logger.error(f"Error rendering thumbnails: {str(e)}")
+    finally:
+        close_old_connections()
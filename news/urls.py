@@ -1,15 +1,30 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
+from .metrics import metrics_view
 from .views import NewsListView
 
 router = DefaultRouter()
 router.register(r'articles', views.ArticleViewSet)
 router.register(r'comments', views.CommentViewSet)
 
-urlpatterns = [
+if settings.NEWS_ASYNC_VIEWS:
+    # Async read paths for ASGI deployments; see README
+    from . import async_views
+    read_urlpatterns = [
+        path('', async_views.news_list, name='news_list'),
+        path('article/<int:article_id>/', async_views.article_detail, name='article_detail'),
+        path('api/comments/', async_views.comment_list, name='comment-list'),
+    ]
+else:
+    read_urlpatterns = []
+
+urlpatterns = read_urlpatterns + [
      path('', NewsListView.as_view(), name='news_list'),
     path('article/<int:article_id>/', views.article_detail, name='article_detail'),
+    path('article/<int:article_id>/comments/stream/', views.comment_stream, name='comment_stream'),
     path('api/', include(router.urls)),
     path('fetch/', views.fetch_news, name='fetch_news'),
+    path('metrics', metrics_view, name='metrics'),
 ]
\ No newline at end of file
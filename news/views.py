@@ -1,27 +1,130 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.contrib import messages
-from rest_framework import viewsets, status, filters
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import viewsets, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
-from datetime import datetime
-from .models import Article, Comment
-from .serializers import ArticleSerializer, CommentSerializer
-import requests
+from rest_framework.decorators import action, api_view
+from .models import ArchivedArticle, Article, Comment, StoryFingerprint
+from .serializers import (
+    ArticleListSerializer, ArticleSerializer, CommentSerializer, requested_fields
+)
+from .ingestion import IngestionEngine, CATEGORIES, advance_watermark, load_watermarks
+from .providers import configured_providers
+from .dates import parse_timestamp
+from .pagination import ArticleCursorPagination, CommentCursorPagination
+from .search import FullTextSearchFilter, SearchResultsPagination
+from .summarizer import summarize_batch
+from .cache import CachedCountPaginator, get_categories, invalidate_articles
+from .broker import comment_broker, comment_channel
+from .counters import comment_counter
+from .metrics import ingestion_stage
+from .thumbnails import schedule_thumbnails
+from .extraction import schedule_extraction
+from .archive import load_archived
+from .exports import export_queryset, iter_gzip, iter_lines, parse_bound
+from .routers import use_primary
+from .dedupe import (
+    FingerprintIndex, article_text, build_fingerprint, collapse_clusters, minhash, window_start
+)
+from .conditional import (
+    ConditionalGetMixin, article_list_validators, article_validators,
+    comment_validators, conditional_view
+)
+import asyncio
+import json
 import logging
-import nltk
-from nltk.tokenize import sent_tokenize
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-class ArticleViewSet(viewsets.ModelViewSet):
+class ArticleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for handling article operations"""
     queryset = Article.objects.all().order_by('-published_at')
     serializer_class = ArticleSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title', 'summary', 'category', 'source']
+    filter_backends = [FullTextSearchFilter]
+    pagination_class = ArticleCursorPagination
+    stream_chunk_size = 2000
+    
+    @property
+    def is_search(self):
+        return bool(self.request.query_params.get(FullTextSearchFilter.search_param, '').strip())
+    
+    @property
+    def paginator(self):
+        """Relevance-ranked search results can't use the keyset paginator"""
+        if not hasattr(self, '_paginator'):
+            self._paginator = SearchResultsPagination() if self.is_search else self.pagination_class()
+        return self._paginator
+    
+    def list(self, request, *args, **kwargs):
+        """Paginated list, or a full NDJSON export with ?stream=ndjson"""
+        if request.query_params.get('stream') == 'ndjson':
+            queryset = self.filter_queryset(self.get_queryset())
+            if not self.is_search:
+                queryset = queryset.order_by(*self.pagination_class.ordering)
+            return self.stream_ndjson(queryset)
+        return super().list(request, *args, **kwargs)
+    
+    def stream_ndjson(self, queryset):
+        """Stream one JSON document per line in constant memory"""
+        serializer = self.get_serializer()
+        
+        def rows():
+            for article in queryset.iterator(chunk_size=self.stream_chunk_size):
+                yield json.dumps(serializer.to_representation(article), cls=JSONEncoder) + '\n'
+        
+        return StreamingHttpResponse(rows(), content_type='application/x-ndjson')
+    
+    @action(detail=False, url_path='export')
+    def export(self, request):
+        """Stream a gzip NDJSON snapshot in the ``export_articles`` format.
+
+        Filters: ``category`` (repeatable), ``since`` and ``until``.
+        """
+        try:
+            since = parse_bound(request.query_params.get('since'))
+            until = parse_bound(request.query_params.get('until'), end=True)
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+        
+        queryset = export_queryset(request.query_params.getlist('category'), since, until)
+        response = StreamingHttpResponse(
+            iter_gzip(iter_lines(queryset, self.stream_chunk_size)), content_type='application/gzip'
+        )
+        response['Content-Disposition'] = 'attachment; filename="articles.ndjson.gz"'
+        return response
+    
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        transaction.on_commit(invalidate_articles)
+    
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        transaction.on_commit(invalidate_articles)
+    
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        transaction.on_commit(invalidate_articles)
+    
+    def get_list_validators(self):
+        return article_list_validators()
+    
+    def get_object_validators(self):
+        return article_validators(self.kwargs[self.lookup_field])
+    
+    def get_serializer_class(self):
+        """Use the lean representation for list pages"""
+        if self.action == 'list':
+            return ArticleListSerializer
+        return ArticleSerializer
     
     def get_queryset(self):
         """Custom queryset to support filtering"""
@@ -29,94 +132,271 @@ class ArticleViewSet(viewsets.ModelViewSet):
         category = self.request.query_params.get('category', None)
         if category:
             queryset = queryset.filter(category=category)
+        
+        if self.action == 'list':
+            fields = set(ArticleListSerializer.Meta.fields)
+            requested = requested_fields(self.request)
+            if requested:
+                fields &= requested
+            # Skip heavy text columns such as extended_summary. The ordering
+            # columns are always loaded: the paginator reads them from the
+            # last row to build the next cursor.
+            ordering = [field.lstrip('-') for field in self.pagination_class.ordering]
+            queryset = queryset.only(*ordering, *fields)
+        elif self.action == 'retrieve':
+            queryset = queryset.prefetch_related('comments')
         return queryset
 
-try:
-    nltk.download('punkt', quiet=True)
-except:
-    pass
-
 class NewsService:
     """Service class to handle news-related operations"""
     
     @staticmethod
     def generate_extended_summary(description, content):
         """Generate an extended summary between 300-500 words"""
+        return NewsService.generate_extended_summaries([(description, content)])[0]
+
+    @staticmethod
+    def generate_extended_summaries(texts):
+        """Summarize a batch of ``(description, content)`` pairs at once"""
         try:
-            # Combine description and content
-            full_text = f"{description} {content}"
-            
-            # Tokenize into sentences
-            sentences = sent_tokenize(full_text)
-            
-            # Initialize summary
-            extended_summary = []
-            word_count = 0
-            
-            # Add sentences until we reach desired length
-            for sentence in sentences:
-                sentence_words = len(sentence.split())
-                if word_count + sentence_words <= 500:
-                    extended_summary.append(sentence)
-                    word_count += sentence_words
-                if word_count >= 300:
-                    break
-            
-            return ' '.join(extended_summary)
+            return summarize_batch([f"{description} {content}" for description, content in texts])
         except Exception as e:
-            logging.error(f"Error generating extended summary: {str(e)}")
-            return description  # Fallback to original description
+            logging.error(f"Error generating extended summaries: {str(e)}")
+            return [description for description, _ in texts]  # Fallback to original descriptions
+
+    @staticmethod
+    def parse_published_date(value):
+        """Parse an API timestamp, falling back to now when missing or malformed"""
+        return parse_timestamp(value) or timezone.now()
+
+    @staticmethod
+    def build_article(article_data, category, extended_summary=None):
+        """Build an unsaved article from API data with extended summary"""
+        description = article_data.get('description') or ''
+        if extended_summary is None:
+            content = article_data.get('content') or ''  # Some APIs provide full content
+            extended_summary = NewsService.generate_extended_summary(description, content)
+        
+        return Article(
+            title=article_data.get('title') or '',
+            url=article_data.get('url') or '',
+            source=article_data.get('source') or 'Unknown',
+            category=category,
+            summary=description,  # Keep original summary
+            extended_summary=extended_summary,  # Add extended summary
+            published_at=NewsService.parse_published_date(article_data.get('published_at')),
+            author=article_data.get('author') or '',
+            image=article_data.get('image') or '',
+            country=article_data.get('country') or ''
+        )
 
     @staticmethod
     def create_article_from_data(article_data, category):
         """Create article from API data with extended summary"""
         try:
-            # Generate extended summary
-            description = article_data.get('description', '')
-            content = article_data.get('content', '')  # Some APIs provide full content
-            extended_summary = NewsService.generate_extended_summary(description, content)
-            
-            return Article.objects.create(
-                title=article_data.get('title', ''),
-                url=article_data.get('url', ''),
-                source=article_data.get('source', 'Unknown'),
-                category=category,
-                summary=description,  # Keep original summary
-                extended_summary=extended_summary,  # Add extended summary
-                published_at=NewsService.parse_published_date(article_data.get('published_at')),
-                author=article_data.get('author', ''),
-                image=article_data.get('image', ''),
-                country=article_data.get('country', '')
-            )
+            article = NewsService.build_article(article_data, category)
+            article.save()
+            return article
         except Exception as e:
             logger.error(f"Error creating article: {str(e)}")
             raise
 
+    @staticmethod
+    def bulk_create_articles(articles_data, category, batch_size=500):
+        """Insert a whole API response at once, skipping known URLs.
+
+        Existing URLs are looked up with a single ``url__in`` query and
+        duplicates within the batch are dropped before ``bulk_create``.
+        Rows inserted concurrently by another run are ignored by the
+        ``url`` unique constraint instead of failing the batch.
+
+        Near-duplicates of recent stories (see news.dedupe) are grouped into
+        the existing story's cluster, or dropped when ``NEWS_DUPLICATES`` is
+        ``'skip'``, and counted in ``duplicates``.
+        """
+        stats = {'created': 0, 'failed': 0, 'duplicates': 0}
+        
+        with ingestion_stage('dedupe'):
+            # Drop duplicates within the batch, keeping the first occurrence
+            batch = {}
+            for article_data in articles_data:
+                url = article_data.get('url')
+                if not url:
+                    stats['failed'] += 1
+                    logger.error("Error processing article: missing url")
+                    continue
+                batch.setdefault(url, article_data)
+            
+            if not batch:
+                return stats
+            
+            existing = set(
+                Article.objects.filter(url__in=list(batch)).values_list('url', flat=True)
+            )
+            existing.update(
+                ArchivedArticle.objects.filter(url__in=list(batch)).values_list('url', flat=True)
+            )
+            batch = {url: data for url, data in batch.items() if url not in existing}
+            fingerprints, clusters = NewsService.cluster_stories(batch)
+            duplicates = {url for url, cluster in clusters.items() if cluster != url}
+            stats['duplicates'] = len(duplicates)
+            if settings.NEWS_DUPLICATES == 'skip':
+                batch = {url: data for url, data in batch.items() if url not in duplicates}
+        
+        articles = []
+        with ingestion_stage('summarize'):
+            summaries = NewsService.generate_extended_summaries([
+                (article_data.get('description') or '', article_data.get('content') or '')
+                for article_data in batch.values()
+            ])
+            for article_data, extended_summary in zip(batch.values(), summaries):
+                try:
+                    articles.append(NewsService.build_article(article_data, category, extended_summary))
+                except Exception as e:
+                    stats['failed'] += 1
+                    logger.error(f"Error processing article: {str(e)}")
+        
+        if not articles:
+            return stats
+        
+        try:
+            with ingestion_stage('insert'):
+                inserted = NewsService.insert_articles(articles, batch_size)
+        except DatabaseError as e:
+            # One bad row fails the whole statement; retry row by row so
+            # only the offending articles are counted as failed
+            logger.warning(f"Bulk insert for {category} failed, retrying per row: {str(e)}")
+            inserted = []
+            for article in articles:
+                try:
+                    inserted.extend(NewsService.insert_articles([article], batch_size))
+                except DatabaseError as e:
+                    stats['failed'] += 1
+                    logger.error(f"Error creating article: {str(e)}")
+        
+        # Rows another run stored first were skipped by the constraint and
+        # are neither counted nor post-processed here
+        stats['created'] += len(inserted)
+        articles = inserted
+        
+        with ingestion_stage('insert'):
+            NewsService.store_fingerprints(articles, fingerprints, clusters)
+        
+        # Resize the new images and summarize the full pages in the
+        # background once the rows are visible
+        if settings.NEWS_THUMBNAILS_ON_INGEST:
+            images = [article.image for article in articles if article.id and article.image]
+            transaction.on_commit(lambda: schedule_thumbnails(images))
+        if settings.NEWS_EXTRACTION_ON_INGEST:
+            article_ids = [article.id for article in articles if article.id]
+            transaction.on_commit(lambda: schedule_extraction(article_ids))
+        return stats
+
+    @staticmethod
+    def insert_articles(articles, batch_size=500):
+        """Insert ``articles``, skipping URLs already stored; returns the ones inserted.
+
+        ``ignore_conflicts`` doesn't report which rows it skipped, so the
+        URLs present before and after the insert are compared within the
+        same transaction.
+        """
+        urls = [article.url for article in articles]
+        with use_primary(), transaction.atomic():
+            existing = set(Article.objects.filter(url__in=urls).values_list('url', flat=True))
+            Article.objects.bulk_create(articles, batch_size=batch_size, ignore_conflicts=True)
+            inserted = set(Article.objects.filter(url__in=urls).values_list('url', flat=True)) - existing
+        return [article for article in articles if article.url in inserted]
+
+    @staticmethod
+    def cluster_stories(batch):
+        """Fingerprint new articles and find the story each belongs to.
+
+        Returns ``(fingerprints, clusters)`` keyed by URL. A cluster is the
+        id of a stored article, or the URL of an article in this batch;
+        articles starting a new story are their own cluster. Articles with
+        no signature are left out of both.
+        """
+        fingerprints = {
+            url: minhash(article_text(data.get('title') or '', data.get('description') or ''))
+            for url, data in batch.items()
+        }
+        # Articles without words to compare stay out of every cluster
+        fingerprints = {url: signature for url, signature in fingerprints.items() if signature}
+        if not fingerprints:
+            return fingerprints, {}
+        
+        oldest = min(NewsService.parse_published_date(batch[url].get('published_at')) for url in fingerprints)
+        index = FingerprintIndex.load(list(fingerprints.values()), window_start(oldest))
+        clusters = {}
+        for url, signature in fingerprints.items():
+            cluster = index.find(signature)
+            if cluster is None:
+                cluster = url
+                index.add(signature, cluster)
+            clusters[url] = cluster
+        return fingerprints, clusters
+
+    @staticmethod
+    def store_fingerprints(articles, fingerprints, clusters):
+        """Save fingerprints for the articles that made it into the table"""
+        if not articles:
+            return
+        ids = dict(
+            Article.objects.filter(url__in=[article.url for article in articles]).values_list('url', 'id')
+        )
+        rows = []
+        for article in articles:
+            article.id = ids.get(article.url)
+            if article.id is None or article.url not in fingerprints:
+                continue
+            cluster = clusters[article.url]
+            cluster_id = ids.get(cluster, article.id) if isinstance(cluster, str) else cluster
+            rows.append(build_fingerprint(article, fingerprints[article.url], cluster_id))
+        StoryFingerprint.objects.bulk_create(rows, ignore_conflicts=True)
+
+@method_decorator(conditional_view(lambda request: article_list_validators()), name='get')
 class NewsListView(ListView):
     model = Article
     template_name = 'news/news_list.html'
     context_object_name = 'articles'
     paginate_by = 30
+    paginator_class = CachedCountPaginator
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+            category=self.request.GET.get('category', ''), **kwargs
+        )
 
     def get_queryset(self):
         queryset = super().get_queryset()
         category = self.request.GET.get('category', '')
         if category:
             queryset = queryset.filter(category=category)
-        return queryset.order_by('-published_at')
+        # One card per story; copies from other outlets are counted on it
+        return collapse_clusters(queryset).order_by('-published_at')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Article.objects.values_list('category', flat=True).distinct()
+        context['categories'] = get_categories()
         context['selected_category'] = self.request.GET.get('category', '')
         return context
 
+@conditional_view(lambda request, article_id: article_validators(article_id))
 def article_detail(request, article_id):
     """View to display article details and handle comments"""
     try:
-        article = get_object_or_404(Article, id=article_id)
+        article = Article.objects.filter(id=article_id).first()
+        comments = None
+        if article is None:
+            # Articles past the retention window are served from the archive
+            article, comments = load_archived(article_id) or (None, None)
+        if article is None:
+            raise Http404("No Article matches the given query.")
         context = {
             'article': article,
+            'archived': comments is not None,
+            'archived_comments': comments,
         }
         return render(request, 'news/article_detail.html', context)
     except Exception as e:
@@ -125,59 +405,44 @@ def article_detail(request, article_id):
         return redirect('news_list')
 
 @api_view(['GET'])
+@use_primary()
 def fetch_news(request):
-    """View to fetch news from MediaStack API"""
+    """View to fetch news from the configured providers"""
     try:
-        # Get API key
-        api_key = NewsService.get_mediastack_api_key()
+        # Raises ValueError when no provider is configured
+        providers = configured_providers(session=IngestionEngine.build_session())
         
-        # MediaStack API configuration
-        base_url = "http://api.mediastack.com/v1/news"
-        categories = [
-            'general', 'business', 'technology', 'science', 
-            'health', 'sports', 'entertainment'
-        ]
+        # Fetch all categories from all providers concurrently
+        # Page back only as far as what each category already has
+        engine = IngestionEngine(providers)
+        watermarks = load_watermarks([provider.name for provider in providers], CATEGORIES)
+        with ingestion_stage('fetch'):
+            results = engine.run(CATEGORIES, watermarks)
         
-        stats = {'created': 0, 'failed': 0}
+        stats = {'created': 0, 'failed': 0, 'duplicates': 0}
         
-        for category in categories:
-            try:
-                # Prepare API parameters
-                params = {
-                    'access_key': api_key,
-                    'categories': category,
-                    'languages': 'en',
-                    'limit': 100,
-                    'sort': 'published_desc'
-                }
-                
-                # Make API request
-                response = requests.get(base_url, params=params, timeout=10)
-                response.raise_for_status()
-                
-                news_data = response.json()
-                
-                if news_data.get('error'):
-                    raise ValueError(f"API error: {news_data['error']['message']}")
-                
-                # Process articles
-                for article_data in news_data.get('data', []):
-                    try:
-                        # Skip if article already exists
-                        if not Article.objects.filter(url=article_data['url']).exists():
-                            NewsService.create_article_from_data(article_data, category)
-                            stats['created'] += 1
-                    except Exception as e:
-                        stats['failed'] += 1
-                        logger.error(f"Error processing article: {str(e)}")
-                
-            except requests.RequestException as e:
-                logger.error(f"API request error for {category}: {str(e)}")
-                messages.warning(request, f"Error fetching {category} news: {str(e)}")
-                continue
+        for result in results:
+            if not result.ok:
+                messages.warning(request, f"Error fetching {result.category} news from {result.provider}: {result.error}")
+            
+            # Store everything fetched for the category in one batch, including
+            # the pages read before an error
+            batch_stats = NewsService.bulk_create_articles(result.articles, result.category)
+            stats['created'] += batch_stats['created']
+            stats['failed'] += batch_stats['failed']
+            stats['duplicates'] += batch_stats['duplicates']
+            
+            # After an error the pages between these and the watermark are
+            # missing, so keep the watermark where it is and retry them next run
+            if result.ok:
+                advance_watermark(result.provider, result.category, result.newest)
+        
+        if stats['created'] > 0:
+            invalidate_articles()
         
         # Log statistics
-        logger.info(f"Articles created: {stats['created']}, failed: {stats['failed']}")
+        logger.info(f"Articles created: {stats['created']}, failed: {stats['failed']}, "
+                    f"near-duplicates: {stats['duplicates']}")
         
         if stats['created'] > 0:
             messages.success(request, f"Successfully fetched {stats['created']} new articles.")
@@ -196,10 +461,11 @@ def fetch_news(request):
         messages.error(request, 'An unexpected error occurred while fetching news.')
         return redirect('news_list')
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for handling article comments"""
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    pagination_class = CommentCursorPagination
     
     def get_queryset(self):
         """Filter comments by article_id if provided"""
@@ -207,7 +473,18 @@ class CommentViewSet(viewsets.ModelViewSet):
         article_id = self.request.query_params.get('article_id')
         if article_id:
             queryset = queryset.filter(article_id=article_id)
-        return queryset.order_by('-created_at')
+        return queryset.order_by('-created_at', '-id')
+    
+    def get_list_validators(self):
+        return comment_validators(self.request.query_params.get('article_id') or None)
+    
+    def get_object_validators(self):
+        return comment_validators()
+    
+    def perform_destroy(self, instance):
+        article_id = instance.article_id
+        instance.delete()
+        transaction.on_commit(lambda: comment_counter.add(article_id, -1))
     
     def create(self, request, *args, **kwargs):
         """Create a new comment"""
@@ -223,23 +500,29 @@ class CommentViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Get article
+            # Create comment; the foreign key rejects unknown articles, so
+            # the article row is never read or locked here
             try:
-                article = Article.objects.get(id=article_id)
-            except Article.DoesNotExist:
+                with transaction.atomic():
+                    comment = Comment.objects.create(
+                        article_id=int(article_id),
+                        content=content,
+                        username=username
+                    )
+            except (IntegrityError, TypeError, ValueError):
                 return Response(
                     {'error': 'Article not found'},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Create comment
-            comment = Comment.objects.create(
-                article=article,
-                content=content,
-                username=username
-            )
-            
             serializer = self.get_serializer(comment)
+            
+            # Push to live readers and count the comment once it is visible
+            event = comment_event(comment, serializer.data)
+            transaction.on_commit(
+                lambda: comment_broker.publish(comment_channel(comment.article_id), event)
+            )
+            transaction.on_commit(lambda: comment_counter.add(comment.article_id))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -247,4 +530,56 @@ class CommentViewSet(viewsets.ModelViewSet):
             return Response(
                 {'error': 'An error occurred while creating the comment'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+def comment_event(comment, data):
+    """Server-sent event for a comment; its id is the polling since token"""
+    since = CommentCursorPagination().encode_position(comment)
+    return f"id: {since}\nevent: comment\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n"
+
+async def comment_stream(request, article_id):
+    """Push new comments on an article as server-sent events.
+
+    Each connected reader is one async task waiting on the broker. A
+    reconnecting client sends Last-Event-ID and first receives the comments
+    it missed. Requires the ASGI entry point.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI this would pin a worker thread per reader; 204 tells
+        # EventSource not to reconnect so the page keeps polling instead
+        return HttpResponse(status=204)
+    
+    if not await Article.objects.filter(id=article_id).aexists():
+        raise Http404('Article not found')
+    
+    last_event_id = request.headers.get('Last-Event-ID')
+    keepalive = settings.NEWS_SSE_KEEPALIVE
+    
+    async def events():
+        async with comment_broker.subscribe(comment_channel(article_id)) as subscription:
+            yield f"retry: {settings.NEWS_SSE_RETRY_MS}\n\n"
+            
+            if last_event_id:
+                # Replay what was posted while the client was disconnected
+                paginator = CommentCursorPagination()
+                try:
+                    position = paginator.decode_position(last_event_id)
+                except NotFound:
+                    position = None
+                if position:
+                    missed = paginator.newer_than(
+                        Comment.objects.filter(article_id=article_id), position
+                    )[:paginator.max_page_size]
+                    async for comment in missed:
+                        yield comment_event(comment, CommentSerializer(comment).data)
+            
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response